@@ -1,21 +1,181 @@
 # ai.py
-import os, textwrap
-from typing import Dict, Any, Optional
+import os, hashlib, importlib.util, textwrap, threading, time
+from typing import Dict, Any, Optional, Tuple, Callable, Iterator, List
 
-try:
-    from openai import OpenAI
-    _HAS_OPENAI = True
-except Exception:
-    _HAS_OPENAI = False
+# openai takes ~0.5 s to import: only check it is installed here and import
+# it when the first client is built (AIService.client).
+_HAS_OPENAI = importlib.util.find_spec("openai") is not None
 
-from db import DB
+from db import open_db
+from ai_cache import get_cache, make_key
+from policy_index import get_index, count_tokens
+from scorer import score_checkpoint, heuristic_suggestion
+from tracing import record, span, traced
+
+POLICY_NOTES_PATH = "policy_notes.txt"
+
+# Latency budget per API call (seconds) and the circuit breaker guarding it:
+# after BREAKER_FAILURES consecutive failed or slow (> SLOW_MS) calls, the
+# breaker opens and suggestions come from the offline stub, tagged "fallback",
+# until a single half-open probe after BREAKER_RESET seconds succeeds.
+AI_TIMEOUT = float(os.environ.get("FAIRSIGHT_AI_TIMEOUT", 20))
+SLOW_MS = float(os.environ.get("FAIRSIGHT_AI_SLOW_MS", 10000))
+BREAKER_FAILURES = int(os.environ.get("FAIRSIGHT_AI_BREAKER_FAILURES", 3))
+BREAKER_RESET = float(os.environ.get("FAIRSIGHT_AI_BREAKER_RESET", 30))
+
+_POLICY_LOCK = threading.Lock()
+_POLICY: Dict[str, Any] = {"stat": None, "text": "", "version": ""}
+
+def _policy_notes_versioned() -> Tuple[str, str]:
+    """(text, sha256) of policy_notes.txt, re-read only when its mtime/size change."""
+    try:
+        st = os.stat(POLICY_NOTES_PATH)
+        stat = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        stat = None
+    with _POLICY_LOCK:
+        if stat != _POLICY["stat"]:
+            text = ""
+            if stat is not None:
+                with open(POLICY_NOTES_PATH, "r", encoding="utf-8") as f:
+                    text = f.read()
+            _POLICY.update(stat=stat, text=text, version=hashlib.sha256(text.encode("utf-8")).hexdigest())
+        return _POLICY["text"], _POLICY["version"]
 
 def _policy_notes():
-    path = "policy_notes.txt"
-    if not os.path.exists(path):
-        return ""
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    return _policy_notes_versioned()[0]
+
+# How each result source is shown to reviewers
+SOURCE_LABELS = {
+    "llm": "model",
+    "cache": "cache",
+    "heuristic": "heuristic scorer",
+    "stub": "heuristic scorer (no API key)",
+    "fallback": "fallback (heuristic scorer)",
+}
+
+# Batch callers (prereview, ai_queue) pass fallback=False: where an
+# interactive call returns an offline suggestion (the stub without an API key,
+# the fallback when a call fails or the breaker refuses it), they get an
+# exception instead and store nothing. A stored suggestion always comes from
+# the model or the triage scorer.
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+class ModelUnavailableError(RuntimeError):
+    """Raised instead of returning the offline stub when no API key (or openai) is configured."""
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. Open: calls are refused until reset_after has
+    passed. Half-open: exactly one probe call is let through; its success
+    closes the breaker, its failure re-opens it for another reset_after.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_after: float = BREAKER_RESET,
+                 slow_ms: float = SLOW_MS):
+        self.failures = max(1, failures)
+        self.reset_after = reset_after
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._streak = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.last_error = ""
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_after:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency_ms: float = 0.0, error: str = ""):
+        """Outcome of an allowed call; a success slower than slow_ms counts as a failure."""
+        if ok and latency_ms > self.slow_ms:
+            ok, error = False, f"slow response ({latency_ms:.0f} ms)"
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._state, self._streak = "closed", 0
+                return
+            self._streak += 1
+            self.last_error = error
+            if self._state == "half_open" or self._streak >= self.failures:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Give up an allowed call without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_after:
+                return "half_open"
+            return self._state
+
+class AIService:
+    """
+    Process-wide AI plumbing shared by every suggestion: one DB handle,
+    settings re-read only when db.generation() moves, one keep-alive
+    OpenAI client that is rebuilt only when the key or base URL changes, and
+    the circuit breaker every API call goes through.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or open_db()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._settings: Dict[str, Any] = {}
+        self._key = ""
+        self._client = None
+        self._client_id = None
+        self.breaker = CircuitBreaker()
+
+    def config(self) -> Tuple[str, str, Optional[str]]:
+        """(api key, model, base URL or None) from the current settings."""
+        gen = self.db.generation()
+        if gen != self._generation:
+            with self._lock:
+                if gen != self._generation:
+                    self._settings = dict(self.db.get_settings())
+                    self._key = self.db.get_openapi_key()
+                    self._generation = gen
+        s = self._settings
+        return self._key, s.get("openapi_model", "gpt-4o-mini"), s.get("openapi_base_url") or None
+
+    def client(self, max_retries: Optional[int] = None, timeout: Optional[float] = None):
+        key, _, base_url = self.config()
+        ident = (key, base_url)
+        if self._client is None or self._client_id != ident:
+            with self._lock:
+                if self._client is None or self._client_id != ident:
+                    from openai import OpenAI
+                    # The old client may still be serving another thread; let it be collected.
+                    self._client = OpenAI(api_key=key, base_url=base_url)
+                    self._client_id = ident
+        client = self._client
+        # with_options() shares the underlying HTTP connection pool
+        opts = {k: v for k, v in (("max_retries", max_retries), ("timeout", timeout)) if v is not None}
+        return client.with_options(**opts) if opts else client
+
+_SERVICE: Optional[AIService] = None
+_SERVICE_LOCK = threading.Lock()
+
+def get_service() -> AIService:
+    global _SERVICE
+    if _SERVICE is None:
+        with _SERVICE_LOCK:
+            if _SERVICE is None:
+                _SERVICE = AIService()
+    return _SERVICE
 
 def _format_checkpoint_ctx(project: Dict[str,Any], gate: Dict[str,Any], checkpoint: Dict[str,Any]) -> str:
     return textwrap.dedent(f"""
@@ -26,6 +186,33 @@ def _format_checkpoint_ctx(project: Dict[str,Any], gate: Dict[str,Any], checkpoi
     Reviewer role: {checkpoint.get('reviewed_by_role','')}
     """).strip()
 
+def parse_decision(suggestion: str, has_artifact: bool) -> str:
+    """Decision named in a suggestion's markdown; never Approve without an artifact."""
+    parsed = (
+        "Approve" if ("Suggested decision:** Approve" in suggestion and has_artifact)
+        else "Reject" if "Suggested decision:** Reject" in suggestion
+        else "ReScope" if "Suggested decision:** ReScope" in suggestion
+        else "Pending"
+    )
+    if (parsed == "Approve") and (not has_artifact):
+        parsed = "Pending"
+    return parsed
+
+def suggestion_record(result: Dict[str,Any], has_artifact: bool, user: str) -> Dict[str,Any]:
+    """What db.save_ai_suggestion stores for a suggest/stream result."""
+    return {
+        "text": result["text"],
+        "decision": parse_decision(result["text"], has_artifact),
+        "source": result["source"],
+        "model": result["model"],
+        "input_key": result.get("input_key"),
+        "latency_ms": result.get("latency_ms"),
+        "usage": result.get("usage"),
+        "score": result.get("score"),
+        "by": user,
+        "at": time.time(),
+    }
+
 def recommend_for_checkpoint(
     project: Dict[str,Any],
     gate: Dict[str,Any],
@@ -41,20 +228,35 @@ def recommend_for_checkpoint(
 
     Constraint: if has_artifact is False, do NOT suggest Approve.
     """
-    db = DB()
-    key = db.get_openapi_key()
-    model = db.get_settings().get("openapi_model", "gpt-4o-mini")
+    return suggest_for_checkpoint(project, gate, checkpoint, has_artifact, payload)["text"]
+
+_SYSTEM_PROMPT = "You are a pragmatic AI governance reviewer."
+_DECISION_MARK = "**Suggested decision:**"
 
+def _checkpoint_prompt(
+    project: Dict[str,Any], gate: Dict[str,Any], checkpoint: Dict[str,Any], has_artifact: bool, payload
+) -> Tuple[str, str, Dict[str,int]]:
+    """
+    (prompt, policy notes version, token stats) for one checkpoint. Only the
+    policy passages most relevant to the checkpoint are included; the stats
+    give the prompt's token count with retrieval and with the full notes.
+    """
     rules = ("If no artifact evidence is present, you must NOT recommend Approve. "
              "Prefer Reject or ReScope with rationale.")
     payload_txt = f"Artifact payload keys: {list(payload.keys())}" if payload else "No artifact payload."
+    notes, policy_version = _policy_notes_versioned()
+    index = get_index(notes, policy_version)
+    policy_text = index.context(" ".join(str(v) for v in (
+        gate.get("gate_name"), checkpoint.get("checkpoint"), checkpoint.get("artifact"),
+        checkpoint.get("submitted_by_role"), checkpoint.get("reviewed_by_role"),
+    ) if v))
 
     prompt = textwrap.dedent(f"""
     You are an AI Governance reviewer assistant. Based on the checkpoint and artifacts, recommend a decision
     (**Approve**, **Reject**, or **ReScope**) and provide a short rationale. Be concise and actionable.
 
     Policy notes:
-    {_policy_notes()}
+    {policy_text}
 
     Constraint:
     - {rules if not has_artifact else "Artifact is present; you may recommend any status as appropriate."}
@@ -68,57 +270,286 @@ def recommend_for_checkpoint(
     - **Rationale:** (3 bullets)
     - **Evidence to verify next**
     """).strip()
+    tokens = count_tokens(prompt)
+    stats = {"prompt_tokens": tokens,
+             "prompt_tokens_full": tokens - count_tokens(policy_text) + index.full_tokens(notes)}
+    return prompt, policy_version, stats
 
-    # Offline stub honors the constraint
-    if not _HAS_OPENAI or not key:
-        if not has_artifact:
-            return textwrap.dedent("""
-            - **Suggested decision:** ReScope
-            - **Rationale:**
-              - Required artifact is missing; evidence not provided.
-              - Risks cannot be validated against governance criteria.
-              - Scope clarification or artifact creation is needed.
-            - **Evidence to verify next**: Provide the missing artifact and traceability notes.
-            """).strip()
-        else:
-            return textwrap.dedent("""
-            - **Suggested decision:** Approve
-            - **Rationale:**
-              - Required artifacts appear complete.
-              - Risks addressed and residual risks documented.
-              - Stakeholders acknowledged per roles.
-            - **Evidence to verify next**: Confirm data lineage and bias checks are attached.
-            """).strip()
-
-    client = OpenAI(api_key=key)
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "You are a pragmatic AI governance reviewer."},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2,
-    )
-    text = resp.choices[0].message.content.strip()
+def _stub_suggestion(gate: Dict[str,Any], checkpoint: Dict[str,Any], has_artifact: bool, payload=None) -> str:
+    # Offline suggestion from the heuristic scorer; honors the constraint
+    return _clamp(heuristic_suggestion(score_checkpoint(gate.get("gate_id", ""), checkpoint, payload)), has_artifact)
 
+def _clamp(text: str, has_artifact: bool) -> str:
     # Safety clamp: if the model returned Approve without artifact, downshift to ReScope
-    if (not has_artifact) and ("**Suggested decision:** Approve" in text):
-        text = text.replace("**Suggested decision:** Approve", "**Suggested decision:** ReScope")
-
+    if (not has_artifact) and (f"{_DECISION_MARK} Approve" in text):
+        text = text.replace(f"{_DECISION_MARK} Approve", f"{_DECISION_MARK} ReScope")
     return text
 
+def _usage(resp) -> Optional[Dict[str,int]]:
+    u = getattr(resp, "usage", None)
+    if u is None:
+        return None
+    return {"prompt_tokens": u.prompt_tokens, "completion_tokens": u.completion_tokens, "total_tokens": u.total_tokens}
+
+def checkpoint_input_key(
+    project: Dict[str,Any], gate: Dict[str,Any], checkpoint: Dict[str,Any], has_artifact: bool, payload=None
+) -> Optional[str]:
+    """
+    Key identifying the inputs of a real (non-stub) suggestion: equal keys mean
+    the same model, prompt, payload and policy notes. None while offline.
+    """
+    key, model, base_url = get_service().config()
+    if not _HAS_OPENAI or not key:
+        return None
+    prompt, policy_version, prompt_stats = _checkpoint_prompt(project, gate, checkpoint, has_artifact, payload)
+    return _cache_key(model, base_url, prompt, payload, policy_version)
+
+def _cache_key(model: str, base_url: Optional[str], prompt: str, payload, policy_version: str) -> str:
+    return make_key(f"{model}@{base_url}" if base_url else model, prompt, payload, policy_version)
+
+@traced("ai.suggest")
+def suggest_for_checkpoint(
+    project: Dict[str,Any],
+    gate: Dict[str,Any],
+    checkpoint: Dict[str,Any],
+    has_artifact: bool,
+    payload: Optional[dict] = None,
+    before_call: Optional[Callable[[], None]] = None,
+    max_retries: Optional[int] = None,
+    fallback: bool = True,
+    timeout: Optional[float] = None,
+    triage: bool = False,
+) -> Dict[str,Any]:
+    """
+    recommend_for_checkpoint() plus metadata: {"text", "source", "model",
+    "input_key", "usage", "latency_ms"}, where source is "llm", "cache",
+    "heuristic" (see triage), "stub" (no API key) or "fallback" (offline
+    stub used because the call failed, timed out or the circuit breaker is
+    open; the reason is in "error"). usage (token counts) is set for "llm"
+    only. Non-stub results also carry prompt_tokens / prompt_tokens_full
+    (with and without policy retrieval).
+
+    The API call is bounded by timeout (default AI_TIMEOUT seconds) and, with
+    fallback, not retried, so the caller waits at most that long. Batch callers
+    that retry on their own pass fallback=False to get the exception instead
+    (CircuitOpenError while the breaker is open, ModelUnavailableError without
+    an API key), so an offline suggestion is never mistaken for a computed
+    one. before_call runs right before a real API request (not for cache hits
+    or the stub), which is where callers hook in rate limiting; max_retries
+    overrides the client's own.
+
+    With triage, the heuristic scorer answers first and the model is only
+    called for borderline checkpoints; confident ones come back with source
+    "heuristic" and the score in "score".
+    """
+    started = time.perf_counter()
+    service = get_service()
+    key, model, base_url = service.config()
+
+    cache_key, prompt_stats = None, {}
+
+    def result(text: str, source: str, usage: Optional[Dict[str,int]] = None, error: str = "") -> Dict[str,Any]:
+        return {"text": text, "source": source, "model": model, "input_key": cache_key, "usage": usage,
+                **prompt_stats, **({"error": error} if error else {}),
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    if not _HAS_OPENAI or not key:
+        if not fallback:
+            raise ModelUnavailableError("no API key configured" if _HAS_OPENAI else "openai is not installed")
+        return result(_stub_suggestion(gate, checkpoint, has_artifact, payload), "stub")
+
+    # Reruns and reopened modals for unchanged inputs are served from the cache
+    prompt, policy_version, prompt_stats = _checkpoint_prompt(project, gate, checkpoint, has_artifact, payload)
+    cache = get_cache()
+    cache_key = _cache_key(model, base_url, prompt, payload, policy_version)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return result(cached, "cache")
+
+    if triage:
+        scored = score_checkpoint(gate.get("gate_id", ""), checkpoint, payload)
+        if not scored["borderline"]:
+            return {**result(_clamp(heuristic_suggestion(scored), has_artifact), "heuristic"),
+                    "score": scored["score"]}
+
+    breaker = service.breaker
+    if not breaker.allow():
+        error = f"circuit open after: {breaker.last_error}"
+        if not fallback:
+            raise CircuitOpenError(error)
+        cache_key = None
+        return result(_stub_suggestion(gate, checkpoint, has_artifact, payload), "fallback", error=error)
+
+    if before_call is not None:
+        before_call()
+    if max_retries is None and fallback:
+        max_retries = 0
+    called = time.perf_counter()
+    try:
+        with span("ai.call", model=model):
+            resp = service.client(max_retries, timeout or AI_TIMEOUT).chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+            )
+        text = _clamp(resp.choices[0].message.content.strip(), has_artifact)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        breaker.record(False, error=error)
+        if not fallback:
+            raise
+        cache_key = None
+        return result(_stub_suggestion(gate, checkpoint, has_artifact, payload), "fallback", error=error)
+    breaker.record(True, (time.perf_counter() - called) * 1000)
+
+    cache.put(cache_key, text)
+    return result(text, "llm", _usage(resp))
+
+class SuggestionStream:
+    """
+    Iterate to receive suggestion text as it is generated (e.g. with
+    st.write_stream). Without an artifact, output is held back until the
+    suggested decision is known (or, if the model never states one, until the
+    stream ends) and then clamped, so an Approve is never shown, even briefly.
+    Once exhausted, .result has the clamped final text and the same metadata as
+    suggest_for_checkpoint plus ttft_ms (time to first token). Like
+    suggest_for_checkpoint it falls back to the offline stub when the breaker
+    is open or the stream fails or overruns AI_TIMEOUT; the stub is then
+    yielded after whatever had already been streamed.
+    """
+
+    def __init__(self, project, gate, checkpoint, has_artifact: bool, payload: Optional[dict] = None):
+        self.has_artifact = has_artifact
+        self.result: Optional[Dict[str,Any]] = None
+        self._args = (project, gate, checkpoint, has_artifact, payload)
+
+    def __iter__(self) -> Iterator[str]:
+        project, gate, checkpoint, has_artifact, payload = self._args
+        started = time.perf_counter()
+        service = get_service()
+        key, model, base_url = service.config()
+
+        cache_key, prompt_stats = None, {}
+
+        def finish(text: str, source: str, ttft: Optional[float], usage: Optional[Dict[str,int]] = None,
+                   error: str = ""):
+            now = time.perf_counter()
+            self.result = {"text": text, "source": source, "model": model, "input_key": cache_key, "usage": usage,
+                           **prompt_stats, **({"error": error} if error else {}),
+                           "latency_ms": round((now - started) * 1000, 1),
+                           "ttft_ms": round(((ttft or now) - started) * 1000, 1)}
+            record("ai.stream", self.result["latency_ms"], source=source, ttft_ms=self.result["ttft_ms"])
+
+        if not _HAS_OPENAI or not key:
+            text = _stub_suggestion(gate, checkpoint, has_artifact, payload)
+            finish(text, "stub", None)
+            yield text
+            return
+
+        prompt, policy_version, prompt_stats = _checkpoint_prompt(project, gate, checkpoint, has_artifact, payload)
+        cache = get_cache()
+        cache_key = _cache_key(model, base_url, prompt, payload, policy_version)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            finish(cached, "cache", None)
+            yield cached
+            return
+
+        breaker = service.breaker
+        if not breaker.allow():
+            text = _stub_suggestion(gate, checkpoint, has_artifact, payload)
+            cache_key = None
+            finish(text, "fallback", None, error=f"circuit open after: {breaker.last_error}")
+            yield text
+            return
+
+        parts: List[str] = []
+        held, decided, ttft, usage = "", has_artifact, None, None
+        called = time.perf_counter()
+        settled = False
+        try:
+            stream = service.client(0, AI_TIMEOUT).chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": _SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.2,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            for chunk in stream:
+                if time.perf_counter() - called > AI_TIMEOUT:
+                    raise TimeoutError(f"no complete response within {AI_TIMEOUT:g} s")
+                if getattr(chunk, "usage", None):
+                    usage = _usage(chunk)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter()
+                parts.append(delta)
+                if decided:
+                    yield delta
+                    continue
+                held += delta
+                i = held.find(_DECISION_MARK)
+                if i >= 0 and len(held) - i - len(_DECISION_MARK) >= len(" Approve"):
+                    decided = True
+                    yield _clamp(held, has_artifact)
+            breaker.record(True, ((ttft or time.perf_counter()) - called) * 1000)
+            settled = True
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            breaker.record(False, error=error)
+            settled = True
+            text = _stub_suggestion(gate, checkpoint, has_artifact, payload)
+            cache_key = None
+            finish(text, "fallback", ttft, error=error)
+            yield ("\n\n---\n" if parts and decided else "") + text
+            return
+        finally:
+            if not settled:
+                # Consumer stopped iterating: no verdict, but free a half-open probe
+                breaker.release()
+        if not decided and held:
+            yield _clamp(held, has_artifact)
+
+        text = _clamp("".join(parts).strip(), has_artifact)
+        cache.put(cache_key, text)
+        finish(text, "llm", ttft, usage)
+
+def stream_for_checkpoint(
+    project: Dict[str,Any],
+    gate: Dict[str,Any],
+    checkpoint: Dict[str,Any],
+    has_artifact: bool,
+    payload: Optional[dict] = None,
+) -> SuggestionStream:
+    """Streaming variant of suggest_for_checkpoint; see SuggestionStream."""
+    return SuggestionStream(project, gate, checkpoint, has_artifact, payload)
+
 def recommend_for_project(project: Dict[str,Any]) -> str:
-    db = DB()
-    key = db.get_openapi_key()
-    model = db.get_settings().get("openapi_model","gpt-4o-mini")
+    service = get_service()
+    key, model, _ = service.config()
     prompt = "Provide high-level governance recommendations for this project focusing on risks and next steps."
-    if not _HAS_OPENAI or not key:
-        return "- Ensure required artifacts are complete.\n- Schedule cross-functional review.\n- Document monitoring KPIs."
-    client = OpenAI(api_key=key)
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[{"role":"system","content":"You are an AI governance coach."},
-                  {"role":"user","content": prompt}],
-        temperature=0.2,
-    )
+    stub = "- Ensure required artifacts are complete.\n- Schedule cross-functional review.\n- Document monitoring KPIs."
+    if not _HAS_OPENAI or not key or not service.breaker.allow():
+        return stub
+    called = time.perf_counter()
+    try:
+        with span("ai.call", model=model):
+            resp = service.client(0, AI_TIMEOUT).chat.completions.create(
+                model=model,
+                messages=[{"role":"system","content":"You are an AI governance coach."},
+                          {"role":"user","content": prompt}],
+                temperature=0.2,
+            )
+    except Exception as e:
+        service.breaker.record(False, error=f"{type(e).__name__}: {e}")
+        return stub
+    service.breaker.record(True, (time.perf_counter() - called) * 1000)
     return resp.choices[0].message.content.strip()
@@ -0,0 +1,136 @@
+# ai_cache.py
+import hashlib, json, os, sqlite3, threading, time
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Content-addressed cache for AI suggestions. The key is a sha256 over
+# (model, prompt, payload, policy notes version), so any change to the
+# artifact payload or policy_notes.txt yields a new key and the stale entry
+# simply ages out. Entries live in a small SQLite file (shared by every
+# process and surviving restarts) behind an in-process LRU, so repeated
+# lookups during Streamlit reruns never leave memory.
+
+CACHE_PATH = Path(os.environ.get("FAIRSIGHT_AI_CACHE_PATH", "ai_cache.db"))
+CACHE_TTL = float(os.environ.get("FAIRSIGHT_AI_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get("FAIRSIGHT_AI_CACHE_MAX_ENTRIES", 5000))
+MEMORY_MAX_ENTRIES = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suggestions (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_suggestions_accessed ON suggestions (accessed_at);
+"""
+
+def _plain(obj):
+    # frozen DB views are MappingProxyType; hash them like the dicts they mirror
+    return dict(obj) if isinstance(obj, Mapping) else str(obj)
+
+def make_key(model: str, prompt: str, payload: Any = None, policy_version: str = "") -> str:
+    blob = json.dumps([model, prompt, payload, policy_version], sort_keys=True, default=_plain)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class SuggestionCache:
+    def __init__(self, path: Path | str | None = None, ttl: float = CACHE_TTL,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = Path(path) if path else CACHE_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, created_at)
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat: str, n: int = 1):
+        with self._lock:
+            self._stats[stat] += n
+
+    def _remember(self, key: str, value: str, created_at: float):
+        with self._lock:
+            self._memory[key] = (value, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_MAX_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None and now - hit[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                return hit[0]
+        conn = self._conn()
+        row = conn.execute("SELECT value, created_at FROM suggestions WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] >= self.ttl:
+            self._count("misses")
+            return None
+        with conn:
+            conn.execute("UPDATE suggestions SET accessed_at = ? WHERE key = ?", (now, key))
+        self._remember(key, row[0], row[1])
+        self._count("hits")
+        return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO suggestions (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                (key, value, now, now),
+            )
+            evicted = conn.execute("DELETE FROM suggestions WHERE created_at <= ?", (now - self.ttl,)).rowcount
+            overflow = conn.execute("SELECT COUNT(*) FROM suggestions").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                evicted += conn.execute(
+                    "DELETE FROM suggestions WHERE key IN "
+                    "(SELECT key FROM suggestions ORDER BY accessed_at LIMIT ?)", (overflow,)
+                ).rowcount
+        self._remember(key, value, now)
+        self._count("stores")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM suggestions")
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Process-local hit/miss/store/eviction counters plus the current on-disk size."""
+        with self._lock:
+            out = dict(self._stats)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+        out["entries"] = self._conn().execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+        return out
+
+_CACHE: Optional[SuggestionCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> SuggestionCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = SuggestionCache()
+    return _CACHE
@@ -0,0 +1,264 @@
+# ai_queue.py
+import json, os, socket, sqlite3, sys, threading, time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Durable queue for background AI pre-screening. Each (project, gate,
+# checkpoint) is one row, so enqueueing is idempotent: an item that is already
+# queued or running is left alone, and a finished one is re-armed. Workers
+# claim a job by taking a time-limited lease; if a worker dies, its lease
+# expires and another worker picks the job up, so a crashed run resumes where
+# it stopped. Jobs are triaged by the heuristic scorer first, so only
+# borderline checkpoints cost an API call. Jobs the model cannot answer (see
+# ai.CircuitOpenError) are handed back without charging an attempt, and
+# without an API key a --once run stops. Results are stored with
+# db.save_ai_suggestion, which is what the swimlane shows instead of calling
+# the model inline.
+
+QUEUE_PATH = Path(os.environ.get("FAIRSIGHT_AI_QUEUE_PATH", "ai_queue.db"))
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid TEXT NOT NULL,
+    gate_id TEXT NOT NULL,
+    artifact_key TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    enqueued_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    latency_ms REAL,
+    usage TEXT,
+    error TEXT,
+    UNIQUE (pid, gate_id, artifact_key)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_until);
+"""
+
+STATUSES = ["queued", "running", "done", "failed"]
+
+class JobQueue:
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path else QUEUE_PATH
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # autocommit; claim() opens its own IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, items: List[tuple]) -> int:
+        """Queue (pid, gate_id, artifact_key) items; returns how many were newly queued or re-armed."""
+        now = time.time()
+        conn = self._conn()
+        before = conn.total_changes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO jobs (pid, gate_id, artifact_key, enqueued_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (pid, gate_id, artifact_key) DO UPDATE SET "
+                "status = 'queued', attempts = 0, worker = NULL, lease_until = NULL, error = NULL, "
+                "enqueued_at = excluded.enqueued_at WHERE jobs.status IN ('done', 'failed')",
+                [(pid, gid, akey, now) for pid, gid, akey in items],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return conn.total_changes - before
+
+    def claim(self, worker: str, lease: float = LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Lease the oldest runnable job (queued, or running with an expired lease)."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A job whose worker died on its last allowed attempt is not retried
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_until = NULL, error = 'lease expired' "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def complete(self, job_id: int, latency_ms: float | None = None, usage: Dict[str, int] | None = None):
+        self._conn().execute(
+            "UPDATE jobs SET status = 'done', lease_until = NULL, finished_at = ?, latency_ms = ?, usage = ?, "
+            "error = NULL WHERE id = ?",
+            (time.time(), latency_ms, json.dumps(usage) if usage else None, job_id),
+        )
+
+    def fail(self, job_id: int, error: str, attempts: int, max_attempts: int = MAX_ATTEMPTS):
+        """Record an error; the job goes back to the queue until it has used max_attempts."""
+        status = "failed" if attempts >= max_attempts else "queued"
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, lease_until = NULL, finished_at = ?, error = ? WHERE id = ?",
+            (status, time.time(), error, job_id),
+        )
+
+    def release(self, job_id: int):
+        """Put a claimed job back in the queue without charging it an attempt."""
+        self._conn().execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL, attempts = attempts - 1 "
+            "WHERE id = ? AND status = 'running'",
+            (job_id,),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {**dict.fromkeys(STATUSES, 0), **{r["status"]: r["n"] for r in rows}}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts per status plus latency and token totals over completed jobs."""
+        row = self._conn().execute(
+            "SELECT COUNT(*) AS n, AVG(latency_ms) AS avg_ms, "
+            "SUM(json_extract(usage, '$.total_tokens')) AS tokens FROM jobs WHERE status = 'done'"
+        ).fetchone()
+        return {**self.counts(), "avg_latency_ms": row["avg_ms"] or 0.0, "total_tokens": row["tokens"] or 0}
+
+# ---- Producer ----
+
+def pending_items(db, gates) -> List[tuple]:
+    """(pid, gate_id, artifact_key) of every undecided checkpoint of every ONGOING project."""
+    items = []
+    for p in db.list_projects():
+        if (p.get("status", "ONGOING") or "ONGOING").upper() != "ONGOING":
+            continue
+        for gate in gates:
+            gs = p.get("gates", {}).get(gate["gate_id"], {})
+            if gs.get("overridden"):
+                continue
+            cps = gs.get("checkpoints", {})
+            for cp in gate.get("checkpoints", ()):
+                if cps.get(cp["artifact_key"], {}).get("decision", "Pending") == "Pending":
+                    items.append((p["id"], gate["gate_id"], cp["artifact_key"]))
+    return items
+
+# ---- Worker ----
+
+def run_job(db, cfg, job: Dict[str, Any], before_call=None) -> Dict[str, Any] | None:
+    """Compute and store one suggestion; None when the item no longer needs one."""
+    from ai import suggest_for_checkpoint, suggestion_record
+    project = db.get_project(job["pid"])
+    gate = cfg.gate(job["gate_id"])
+    cp = cfg.checkpoint(job["gate_id"], job["artifact_key"])
+    if project is None or cp is None:
+        return None
+    decided = project.get("gates", {}).get(job["gate_id"], {}).get("checkpoints", {}).get(job["artifact_key"], {})
+    if decided.get("decision", "Pending") != "Pending":
+        return None
+    payload = db.get_artifact_payload(job["pid"], job["artifact_key"]) or {}
+    res = suggest_for_checkpoint(project, gate, cp, has_artifact=bool(payload), payload=payload,
+                                 before_call=before_call, max_retries=0, fallback=False, triage=True)
+    db.save_ai_suggestion(job["pid"], job["gate_id"], job["artifact_key"],
+                          suggestion_record(res, bool(payload), "ai-queue"))
+    return res
+
+def work(queue: JobQueue, db, cfg, concurrency: int = 2, once: bool = False, rate: float | None = None,
+         stop: threading.Event | None = None) -> int:
+    """
+    Run concurrency worker threads until stopped (or, with once, until the
+    queue has nothing runnable). Returns the number of jobs processed.
+    """
+    from prereview import TokenBucket, RATE_PER_SEC, BURST
+    from ai import CircuitOpenError, ModelUnavailableError, get_service
+    bucket = TokenBucket(rate or RATE_PER_SEC, BURST)
+    stop = stop or threading.Event()
+    host = f"{socket.gethostname()}:{os.getpid()}"
+    done = [0]
+    done_lock = threading.Lock()
+
+    def loop(n: int):
+        name = f"{host}/{n}"
+        while not stop.is_set():
+            job = queue.claim(name)
+            if job is None:
+                if once:
+                    return
+                stop.wait(POLL_SECONDS)
+                continue
+            try:
+                res = run_job(db, cfg, job, before_call=bucket.acquire)
+            except (CircuitOpenError, ModelUnavailableError) as e:
+                # The API is failing or not configured; wait instead of burning attempts
+                queue.release(job["id"])
+                if once and isinstance(e, ModelUnavailableError):
+                    return
+                stop.wait(get_service().breaker.reset_after)
+                continue
+            except Exception as e:
+                queue.fail(job["id"], f"{type(e).__name__}: {e}", job["attempts"])
+            else:
+                queue.complete(job["id"], res and res["latency_ms"], res and res.get("usage"))
+            with done_lock:
+                done[0] += 1
+
+    threads = [threading.Thread(target=loop, args=(i,), daemon=True, name=f"ai-queue-{i}")
+               for i in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
+    return done[0]
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    opts = dict(a[2:].split("=", 1) for a in sys.argv[2:] if a.startswith("--") and "=" in a)
+    queue = JobQueue(opts.get("queue"))
+    if cmd == "enqueue":
+        from config_loader import load_config
+        from db import open_db
+        items = pending_items(open_db(), load_config("governance_config.json").gates)
+        print(f"Queued {queue.enqueue(items)} of {len(items)} pending checkpoints.")
+    elif cmd == "work":
+        from config_loader import load_config
+        from db import open_db
+        n = work(queue, open_db(), load_config("governance_config.json"),
+                 concurrency=int(opts.get("concurrency", 2)), once="--once" in sys.argv[2:],
+                 rate=float(opts["rate"]) if "rate" in opts else None)
+        print(f"Processed {n} jobs. {queue.stats()}")
+    elif cmd == "status":
+        print(json.dumps(queue.stats(), indent=2))
+    else:
+        print("Usage: python ai_queue.py enqueue | work [--once] [--concurrency=N] [--rate=R] | status "
+              "[--queue=path]")
+        sys.exit(1)
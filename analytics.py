@@ -0,0 +1,160 @@
+# analytics.py
+import threading, time
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from gate_rules import evaluate_gates
+from tracing import traced
+
+# Columnar view of the portfolio for dashboards and exports. Projects, gate
+# states and checkpoints are flattened once per DB generation into pandas
+# frames with categorical columns; every query after that is vectorized.
+# Gate rows carry both the stored gate_status (the override value) and the
+# effective status the storage layer maintains; gates stored without one are
+# evaluated with the decision_rules engine (gate_rules) in one batch per gate.
+
+AGE_BINS = [-np.inf, 30, 90, 180, np.inf]
+AGE_LABELS = ["<30d", "30-90d", "90-180d", ">180d"]
+
+_LOCK = threading.Lock()
+_CACHE: Dict[str, Any] = {"key": None, "frames": None}
+
+class Frame:
+    """A thin, chainable query wrapper around one DataFrame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def where(self, **equals) -> "Frame":
+        """Keep rows whose column equals the value (or is in it, for lists/tuples/sets). None is ignored."""
+        mask = np.ones(len(self.df), dtype=bool)
+        for col, val in equals.items():
+            if val is None:
+                continue
+            if isinstance(val, (list, tuple, set)):
+                mask &= self.df[col].isin(list(val)).to_numpy()
+            else:
+                mask &= (self.df[col] == val).to_numpy()
+        return Frame(self.df[mask])
+
+    def count(self) -> int:
+        return len(self.df)
+
+    def group_count(self, *by: str) -> pd.Series:
+        """Row counts per group, including empty categories, sorted by index."""
+        return self.df.groupby(list(by), observed=False).size().sort_index()
+
+    def time_bucket(self, col: str, freq: str = "W") -> pd.Series:
+        """Row counts per period of a datetime column (e.g. freq 'D', 'W', 'M')."""
+        ts = self.df[col].dropna()
+        if ts.empty:
+            return pd.Series(dtype="int64")
+        return ts.dt.to_period(freq).value_counts().sort_index()
+
+class PortfolioFrames:
+    def __init__(self, projects: pd.DataFrame, gates: pd.DataFrame, checkpoints: pd.DataFrame):
+        self.projects = Frame(projects)
+        self.gates = Frame(gates)
+        self.checkpoints = Frame(checkpoints)
+
+def _categorical(df: pd.DataFrame, cols: List[str]) -> pd.DataFrame:
+    for c in cols:
+        df[c] = df[c].astype("category")
+    return df
+
+def _to_datetime(values) -> pd.Series:
+    return pd.to_datetime(pd.Series(values, dtype="float64"), unit="s")
+
+@traced("analytics.build_frames")
+def build_frames(projects, now: float | None = None) -> PortfolioFrames:
+    """Flatten projects -> gates -> checkpoints into columnar frames."""
+    now = time.time() if now is None else now
+    p_cols: Dict[str, list] = {k: [] for k in ["pid", "name", "owner", "status", "current_gate_id",
+                                               "latest_gate_id", "created_at"]}
+    g_cols: Dict[str, list] = {k: [] for k in ["pid", "owner", "project_status", "gate_id", "gate_status",
+                                               "overridden", "last_ts", "effective_status"]}
+    gate_decisions: List[tuple] = []
+    c_cols: Dict[str, list] = {k: [] for k in ["pid", "owner", "gate_id", "artifact_key", "decision",
+                                               "decided_at", "has_payload"]}
+    for p in projects:
+        pid, owner = p["id"], p.get("owner", "") or ""
+        pst = (p.get("status", "ONGOING") or "ONGOING").upper()
+        p_cols["pid"].append(pid)
+        p_cols["name"].append(p.get("name", ""))
+        p_cols["owner"].append(owner)
+        p_cols["status"].append(pst)
+        p_cols["current_gate_id"].append(p.get("current_gate_id", ""))
+        p_cols["latest_gate_id"].append((p.get("latest_gate") or {}).get("gate_id"))
+        p_cols["created_at"].append(p.get("created_at") or np.nan)
+        shared = p.get("artifact_payloads", {})
+        for gid, gs in p.get("gates", {}).items():
+            summary = gs.get("audit_summary") or {}
+            g_cols["pid"].append(pid)
+            g_cols["owner"].append(owner)
+            g_cols["project_status"].append(pst)
+            g_cols["gate_id"].append(gid)
+            g_cols["gate_status"].append(gs.get("gate_status", "Pending"))
+            g_cols["overridden"].append(bool(gs.get("overridden")))
+            g_cols["last_ts"].append(summary.get("last_ts") or np.nan)
+            decided: Dict[str, str] = {}
+            g_cols["effective_status"].append(gs.get("effective_status"))
+            gate_decisions.append((gid, decided))
+            for akey, cp in gs.get("checkpoints", {}).items():
+                decided[akey] = cp.get("decision", "Pending")
+                c_cols["pid"].append(pid)
+                c_cols["owner"].append(owner)
+                c_cols["gate_id"].append(gid)
+                c_cols["artifact_key"].append(akey)
+                c_cols["decision"].append(cp.get("decision", "Pending"))
+                c_cols["decided_at"].append(cp.get("decided_at") or np.nan)
+                c_cols["has_payload"].append("payload" in cp or akey in shared)
+
+    pdf = pd.DataFrame(p_cols)
+    pdf["created_at"] = _to_datetime(p_cols["created_at"])
+    age_days = (now - pd.Series(p_cols["created_at"], dtype="float64")) / 86400.0
+    pdf["age_days"] = age_days.to_numpy()
+    pdf["age_bucket"] = pd.cut(age_days, bins=AGE_BINS, labels=AGE_LABELS).to_numpy()
+    gdf = pd.DataFrame(g_cols)
+    gdf["last_ts"] = _to_datetime(g_cols["last_ts"])
+    missing = [i for i, e in enumerate(g_cols["effective_status"]) if e is None]
+    if missing:
+        # CAIO overrides win over the rule-evaluated status
+        ruled = evaluate_gates([gate_decisions[i] for i in missing])
+        for i, r in zip(missing, ruled):
+            gdf.at[i, "effective_status"] = g_cols["gate_status"][i] if g_cols["overridden"][i] else r
+    cdf = pd.DataFrame(c_cols)
+    cdf["decided_at"] = _to_datetime(c_cols["decided_at"])
+    return PortfolioFrames(
+        _categorical(pdf, ["owner", "status", "current_gate_id"]),
+        _categorical(gdf, ["owner", "project_status", "gate_id", "gate_status", "effective_status"]),
+        _categorical(cdf, ["owner", "gate_id", "artifact_key", "decision"]),
+    )
+
+def latest_activity(frames: PortfolioFrames) -> pd.DataFrame:
+    """Per-project table of the most recently touched gate and its status."""
+    pdf = frames.projects.df
+    gdf = frames.gates.df[["pid", "gate_id", "effective_status"]].astype({"gate_id": str, "effective_status": str})
+    out = pdf[["pid", "name", "current_gate_id", "latest_gate_id", "owner"]].astype(
+        {"current_gate_id": str, "owner": str}
+    ).merge(gdf, how="left", left_on=["pid", "latest_gate_id"], right_on=["pid", "gate_id"])
+    return pd.DataFrame({
+        "Project": out["name"],
+        "Current Gate": out["current_gate_id"],
+        "Latest Gate Touched": out["latest_gate_id"].fillna(out["current_gate_id"]),
+        "Latest Gate Status": out["effective_status"].fillna("Pending"),
+        "Owner": out["owner"],
+    })
+
+def portfolio_frames(db) -> PortfolioFrames:
+    """Frames for db's current contents; rebuilt only when db.generation() changes."""
+    key = (type(db).__module__, str(getattr(db, "path", "")), db.generation())
+    frames = _CACHE["frames"]
+    if frames is not None and _CACHE["key"] == key:
+        return frames
+    with _LOCK:
+        if _CACHE["frames"] is None or _CACHE["key"] != key:
+            _CACHE["frames"] = build_frames(db.list_projects())
+            _CACHE["key"] = key
+        return _CACHE["frames"]
@@ -1,11 +1,10 @@
 # app.py
-import os
-import time
 import streamlit as st
 
-from config_loader import load_config, get_gates, get_gate_by_id
+from config_loader import get_gates, get_gate_by_id
 from auth import ensure_default_users, login, logout
-from db import DB
+from startup import config, css, database, logo_uri
+from tracing import span
 from ui_components import (
     render_topbar, render_footer, render_gate_tabs, render_swimlane_table,
     render_cxo_dashboard, render_add_project_form, render_help_page,
@@ -14,36 +13,17 @@ from ui_components import (
 
 st.set_page_config(page_title="Fair Sight AI Governance", page_icon="🛡️", layout="wide")
 
-# Load styles
-if os.path.exists("styles.css"):
-    with open("styles.css", "r", encoding="utf-8") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Styles, config and the DB handle are process-level resources (see startup.py):
+# built once, then only looked up on each rerun.
+styles = css()
+if styles:
+    st.markdown(styles, unsafe_allow_html=True)
 
-CONFIG = load_config("governance_config.json")
+CONFIG = config()
 ensure_default_users()
 
-# persistent DB
-db = DB()
-
-# ---- Seed default projects if none ----
-try:
-    if not db.list_projects():
-        first_gate = get_gates()[0]["gate_id"] if get_gates() else ""
-        demo_now = time.time()
-        for name in ["AI Risk Scoring Pilot", "Customer Chatbot Revamp", "Forecast Model V2"]:
-            db.create_project({
-                "name": name,
-                "description": "Demo project seeded on first run",
-                "owner": "demo_owner",
-                "type": "Prototype",
-                "start_date": "",
-                "status": "ONGOING",
-                "current_gate_id": first_gate,
-                "created_at": demo_now,
-                "updated_at": demo_now
-            })
-except Exception as _e:
-    pass
+# persistent DB (demo projects are seeded on first open)
+db = database()
 
 def set_page(page):
     st.session_state["page"] = page
@@ -96,7 +76,10 @@ def page_login():
             else:
                 st.error("Invalid username or password.")
     with col2:
-        st.image("assets/logo.png", caption="Fair Sight AI Governance", use_column_width=True)
+        logo = logo_uri()
+        if logo:
+            st.markdown(f"<img src='{logo}' style='width:100%'>", unsafe_allow_html=True)
+            st.caption("Fair Sight AI Governance")
 
 def page_home():
     render_home_header(db)
@@ -132,22 +115,24 @@ if st.session_state["page"] == "Login" and "auth_user" in st.session_state:
     set_page("Home")
 
 page = st.session_state["page"]
-if page == "Login":
-    page_login()
-elif page == "Home":
-    if "auth_user" not in st.session_state:
+# Root span of the rerun: the page's DB, AI, config and render_* spans nest under it
+with span(f"rerun.{page}"):
+    if page == "Login":
         page_login()
+    elif page == "Home":
+        if "auth_user" not in st.session_state:
+            page_login()
+        else:
+            page_home()
+    elif page == "CXO Dashboard":
+        page_cxo_dashboard() if "auth_user" in st.session_state else page_login()
+    elif page == "Add Project":
+        page_add_project() if "auth_user" in st.session_state else page_login()
+    elif page == "Settings":
+        page_settings() if "auth_user" in st.session_state else page_login()
+    elif page == "Help":
+        page_help()
     else:
-        page_home()
-elif page == "CXO Dashboard":
-    page_cxo_dashboard() if "auth_user" in st.session_state else page_login()
-elif page == "Add Project":
-    page_add_project() if "auth_user" in st.session_state else page_login()
-elif page == "Settings":
-    page_settings() if "auth_user" in st.session_state else page_login()
-elif page == "Help":
-    page_help()
-else:
-    st.write("Page not found.")
-
-render_footer()
+        st.write("Page not found.")
+
+    render_footer()
@@ -0,0 +1,93 @@
+# audit_store.py
+import json, os, time, threading
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Tuple
+
+# Append-only gate audit trails kept outside the project document.
+# Layout: AUDIT_DIR/<pid>/<gate_id>/<YYYY-MM>.jsonl, one event per line, one
+# segment per calendar month (UTC). Reads walk segments newest-first and read
+# each file backwards, so the common "latest events" query touches only the tail.
+# Page cursors are (ts, seq), seq being the event's byte offset in its segment:
+# events sharing a timestamp keep their append order across page boundaries.
+
+AUDIT_DIR = Path("audit_log")
+_READ_BLOCK = 64 * 1024
+
+def _segment_name(ts: float) -> str:
+    return time.strftime("%Y-%m", time.gmtime(ts)) + ".jsonl"
+
+def _read_reverse(path: Path) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    """Yield (byte offset, event) per line of path, last to first, reading from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        rest = b""
+        while pos > 0:
+            step = min(_READ_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines.pop(0)  # may be incomplete; finished by the next block
+            end = pos + len(rest) + sum(len(line) + 1 for line in lines)
+            for line in reversed(lines):
+                end -= len(line) + 1
+                if line.strip():
+                    yield end + 1, json.loads(line)
+        if rest.strip():
+            yield 0, json.loads(rest)
+
+class AuditStore:
+    def __init__(self, root: Path | str | None = None):
+        self.root = Path(root) if root else AUDIT_DIR
+        self._lock = threading.Lock()
+
+    def _gate_dir(self, pid: str, gate_id: str) -> Path:
+        return self.root / pid / gate_id
+
+    def _segments(self, pid: str, gate_id: str) -> List[Path]:
+        d = self._gate_dir(pid, gate_id)
+        if not d.is_dir():
+            return []
+        return sorted(d.glob("*.jsonl"), reverse=True)  # newest month first
+
+    def append(self, pid: str, gate_id: str, event: Dict[str, Any]):
+        self.append_many([(pid, gate_id, event)])
+
+    def append_many(self, events: List[Tuple[str, str, Dict[str, Any]]]):
+        """Append (pid, gate_id, event) triples; one fsync per touched segment."""
+        by_file: Dict[Path, List[str]] = {}
+        for pid, gate_id, ev in events:
+            path = self._gate_dir(pid, gate_id) / _segment_name(ev.get("ts", time.time()))
+            by_file.setdefault(path, []).append(json.dumps(ev))
+        with self._lock:
+            for path, lines in by_file.items():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def tail(self, pid: str, gate_id: str, n: int = 20) -> List[Dict[str, Any]]:
+        """The n most recent events, newest first."""
+        return self.page(pid, gate_id, limit=n)[0]
+
+    def page(self, pid: str, gate_id: str, limit: int = 50,
+             before: Tuple[float, int] | None = None):
+        """
+        One page of history, newest first, with events strictly older than
+        the (ts, seq) cursor `before`. Returns (events, cursor); pass cursor
+        as `before` to get the next page. cursor is None when the history is
+        exhausted.
+        """
+        out: List[Dict[str, Any]] = []
+        cutoff = _segment_name(before[0]) if before is not None else None
+        for seg in self._segments(pid, gate_id):
+            if cutoff is not None and seg.name > cutoff:
+                continue  # whole month is newer than the cursor
+            for seq, ev in _read_reverse(seg):
+                if before is not None and (ev.get("ts", 0), seq) >= before:
+                    continue
+                out.append(ev)
+                if len(out) == limit:
+                    return out, (ev.get("ts", 0), seq)
+        return out, None
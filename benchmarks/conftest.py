@@ -0,0 +1,86 @@
+# benchmarks/conftest.py
+import os, shutil, sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config_loader import load_config
+import portfolio_gen
+
+# Portfolios are generated once per parameter set (and config version) under
+# FAIRSIGHT_BENCH_DATA and reused by later runs; delete the directory to
+# regenerate. Sizes and backends come from the environment so a quick run can
+# skip the 10k portfolios:
+#   FAIRSIGHT_BENCH_SIZES=10,1000 FAIRSIGHT_BENCH_BACKENDS=json pytest benchmarks
+
+CONFIG_PATH = ROOT / "governance_config.json"
+DATA_DIR = Path(os.environ.get("FAIRSIGHT_BENCH_DATA", ROOT / "benchmarks" / ".data"))
+SIZES = [int(s) for s in os.environ.get("FAIRSIGHT_BENCH_SIZES", "10,1000,10000").split(",") if s.strip()]
+BACKENDS = [b.strip() for b in os.environ.get("FAIRSIGHT_BENCH_BACKENDS", "json,sqlite").split(",") if b.strip()]
+PARAMS = {
+    "fill": float(os.environ.get("FAIRSIGHT_BENCH_FILL", 0.5)),
+    "audit_per_gate": int(os.environ.get("FAIRSIGHT_BENCH_AUDIT", 2)),
+    "payload_bytes": int(os.environ.get("FAIRSIGHT_BENCH_PAYLOAD", 400)),
+    "seed": 0,
+}
+
+class Portfolio:
+    """A generated portfolio directory (the app's working directory layout)."""
+    def __init__(self, path: Path, backend: str, size: int):
+        self.path, self.backend, self.size = path, backend, size
+
+    def open(self):
+        if self.backend == "sqlite":
+            from sqlite_db import DB as SQLiteDB
+            return SQLiteDB(self.path / "fairsight.db")
+        from db import DB
+        return DB()
+
+def _build(backend: str, size: int) -> Path:
+    digest = load_config(str(CONFIG_PATH)).digest[:8]
+    name = (f"{backend}-{size}-f{PARAMS['fill']}-a{PARAMS['audit_per_gate']}-p{PARAMS['payload_bytes']}"
+            f"-s{PARAMS['seed']}-{digest}")
+    path = DATA_DIR / name
+    if not (path / ".complete").exists():
+        shutil.rmtree(path, ignore_errors=True)
+        portfolio_gen.generate_dir(str(path), config_path=str(CONFIG_PATH), backend=backend, projects=size, **PARAMS)
+        shutil.copy(CONFIG_PATH, path / "governance_config.json")
+        (path / ".complete").touch()
+    return path
+
+def pytest_generate_tests(metafunc):
+    if "portfolio_params" in metafunc.fixturenames:
+        params = [(b, n) for b in BACKENDS for n in SIZES]
+        metafunc.parametrize("portfolio_params", params, ids=[f"{b}-{n}" for b, n in params], scope="session")
+
+@pytest.fixture(scope="session")
+def _template(portfolio_params):
+    backend, size = portfolio_params
+    return Portfolio(_build(backend, size), backend, size)
+
+@pytest.fixture
+def portfolio(_template, monkeypatch, benchmark):
+    """The cached portfolio as the working directory, for read-only benchmarks."""
+    monkeypatch.chdir(_template.path)
+    monkeypatch.setenv("FAIRSIGHT_DB", _template.backend)
+    load_config(str(_template.path / "governance_config.json"))
+    benchmark.extra_info.update(backend=_template.backend, projects=_template.size, **PARAMS)
+    return _template
+
+@pytest.fixture(scope="session")
+def _scratch(_template, tmp_path_factory):
+    path = tmp_path_factory.mktemp(_template.path.name)
+    shutil.copytree(_template.path, path, dirs_exist_ok=True)
+    return Portfolio(path, _template.backend, _template.size)
+
+@pytest.fixture
+def scratch_portfolio(_scratch, monkeypatch, benchmark):
+    """A per-session copy of the portfolio, for benchmarks that write."""
+    monkeypatch.chdir(_scratch.path)
+    monkeypatch.setenv("FAIRSIGHT_DB", _scratch.backend)
+    load_config(str(_scratch.path / "governance_config.json"))
+    benchmark.extra_info.update(backend=_scratch.backend, projects=_scratch.size, **PARAMS)
+    return _scratch
@@ -0,0 +1,20 @@
+# benchmarks/test_dashboard.py
+import analytics
+
+# CXO dashboard aggregation: the materialized counters read on every visit,
+# and the pandas frames rebuilt once per write (portfolio_frames cache miss).
+
+def test_dashboard_summary(benchmark, portfolio):
+    db = portfolio.open()
+    db.dashboard_summary()
+    summary = benchmark(db.dashboard_summary)
+    assert summary["total"] >= portfolio.size
+
+def test_portfolio_frames_rebuild(benchmark, portfolio):
+    db = portfolio.open()
+    db.list_projects()
+
+    def invalidate():
+        analytics._CACHE["key"] = None
+    frames = benchmark.pedantic(analytics.portfolio_frames, args=(db,), setup=invalidate, rounds=10, warmup_rounds=1)
+    assert len(frames.projects.df) >= portfolio.size
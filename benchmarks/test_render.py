@@ -0,0 +1,38 @@
+# benchmarks/test_render.py
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import startup
+from conftest import ROOT
+
+# Headless full-page reruns of app.py through Streamlit's AppTest: Home with
+# one project open at the gate with the most checkpoints (picker, gate tabs,
+# status line and every swimlane row), and the CXO dashboard. Times are one
+# complete script run, as a widget interaction without fragments would cost.
+
+def _app(db, page: str) -> AppTest:
+    startup.database.clear()  # the process-level DB handle belongs to the previous portfolio
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+    at.session_state["auth_user"] = "caios"
+    at.session_state["role"] = "ChiefAIOfficer"
+    at.session_state["page"] = page
+    projects = db.list_projects()
+    if projects:
+        p = projects[len(projects) // 2]
+        at.session_state["open_project"] = p["id"]
+    at.session_state["active_gate"] = "G3"
+    at.run()
+    if at.exception:
+        pytest.fail(str(at.exception[0].message))
+    return at
+
+def test_render_home_swimlane(benchmark, portfolio):
+    at = _app(portfolio.open(), "Home")
+    benchmark.pedantic(at.run, rounds=10, warmup_rounds=1)
+    assert not at.exception
+    assert at.selectbox  # swimlane decision widgets rendered
+
+def test_render_cxo_dashboard(benchmark, portfolio):
+    at = _app(portfolio.open(), "CXO Dashboard")
+    benchmark.pedantic(at.run, rounds=10, warmup_rounds=1)
+    assert not at.exception
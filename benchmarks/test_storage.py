@@ -0,0 +1,66 @@
+# benchmarks/test_storage.py
+import itertools, random
+
+import pytest
+
+# Warm-cache timings of the storage calls the app makes on every rerun (reads)
+# and on every edit (writes). Each benchmark opens its store and reads it once
+# first, so the one-off load is not part of the measurement.
+
+def _pids(db, n=200, seed=1):
+    projects = db.list_projects()
+    return [p["id"] for p in random.Random(seed).sample(list(projects), min(n, len(projects)))]
+
+def _checkpoints(db, n=200):
+    """(pid, gate_id, artifact_key) of one decided checkpoint per touched gate of n projects."""
+    out = []
+    for pid in _pids(db, n):
+        p = db.get_project(pid)
+        for gid, gs in (p.get("gates") or {}).items():
+            for akey, cp in (gs.get("checkpoints") or {}).items():
+                out.append((pid, gid, akey))
+                break
+    if not out:
+        pytest.skip("portfolio has no decided checkpoints")
+    return out
+
+def test_list_projects(benchmark, portfolio):
+    db = portfolio.open()
+    db.list_projects()
+    result = benchmark(db.list_projects)
+    assert len(result) >= portfolio.size
+
+def test_get_project(benchmark, portfolio):
+    db = portfolio.open()
+    pids = itertools.cycle(_pids(db))
+    assert benchmark(lambda: db.get_project(next(pids))) is not None
+
+def test_get_artifact_payload(benchmark, portfolio):
+    db = portfolio.open()
+    keys = itertools.cycle(_checkpoints(db))
+
+    def read():
+        pid, _, akey = next(keys)
+        return db.get_artifact_payload(pid, akey)
+    benchmark(read)
+
+def test_save_checkpoint_decision(benchmark, scratch_portfolio):
+    db = scratch_portfolio.open()
+    targets = itertools.cycle(_checkpoints(db, 50))
+    decisions = itertools.cycle(["Approve", "Reject", "Pending"])
+
+    def save():
+        pid, gid, akey = next(targets)
+        db.save_checkpoint_decision(pid, gid, akey, next(decisions), "bench")
+    benchmark.pedantic(save, rounds=30, warmup_rounds=1)
+
+def test_save_checkpoint_payload(benchmark, scratch_portfolio):
+    db = scratch_portfolio.open()
+    targets = itertools.cycle(_checkpoints(db, 50))
+    counter = itertools.count()
+
+    def save():
+        pid, gid, akey = next(targets)
+        db.save_checkpoint_payload(pid, gid, akey, {"desc": f"Benchmark revision {next(counter)} " * 20,
+                                                   "link": "https://docs.example.com/bench", "notes": ""}, "bench")
+    benchmark.pedantic(save, rounds=30, warmup_rounds=1)
@@ -1,29 +1,157 @@
 # config_loader.py
-import json, os
+import hashlib, json, os, threading
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple, Optional
 
-_CONFIG = {}
+from tracing import traced
 
-def load_config(path: str):
+# The governance config is compiled once per file version into an immutable
+# CompiledConfig with dict indexes for the lookups the UI does on every rerun.
+# load_config() is cheap to call repeatedly: it stats the file and only
+# re-reads it when (mtime, size) changed, and only recompiles when the sha256
+# of the contents changed. The new config replaces the old one with a single
+# reference swap, so readers never see a half-built config.
+
+_EMPTY = {"roles": [], "decision_rules": {}, "gates": []}
+
+_LOCK = threading.Lock()
+_STATE: Dict[str, Any] = {"path": None, "stat": None}
+
+def _freeze(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+def _role(value) -> str:
+    return (value or "").strip()
+
+class CompiledConfig:
+    """
+    Read-only governance config. Behaves like the parsed JSON dict for
+    existing callers (config.get("roles")), plus O(1) lookups:
+    gate(gate_id), checkpoint(gate_id, artifact_key), by_artifact(key),
+    submitted_by(role) and reviewed_by(role).
+    """
+
+    def __init__(self, raw: Dict[str, Any], digest: str = ""):
+        self.digest = digest
+        self.raw = _freeze(raw)
+        self.roles = self.raw.get("roles", ())
+        self.gates = self.raw.get("gates", ())
+        self.decision_rules = self.raw.get("decision_rules", MappingProxyType({}))
+
+        gate_by_id: Dict[str, Any] = {}
+        checkpoints: Dict[Tuple[str, str], Any] = {}
+        by_artifact: Dict[str, List[Tuple[str, Any]]] = {}
+        by_submitter: Dict[str, List[Tuple[str, Any]]] = {}
+        by_reviewer: Dict[str, List[Tuple[str, Any]]] = {}
+        for g in self.gates:
+            gid = g["gate_id"]
+            gate_by_id.setdefault(gid, g)  # first definition wins, as with the old linear scan
+            for cp in g.get("checkpoints", ()):
+                akey = cp.get("artifact_key", "")
+                checkpoints.setdefault((gid, akey), cp)
+                by_artifact.setdefault(akey, []).append((gid, cp))
+                by_submitter.setdefault(_role(cp.get("submitted_by_role")), []).append((gid, cp))
+                by_reviewer.setdefault(_role(cp.get("reviewed_by_role")), []).append((gid, cp))
+
+        self._gate_by_id = MappingProxyType(gate_by_id)
+        self._checkpoints = MappingProxyType(checkpoints)
+        self._by_artifact = MappingProxyType({k: tuple(v) for k, v in by_artifact.items()})
+        self._by_submitter = MappingProxyType({k: tuple(v) for k, v in by_submitter.items()})
+        self._by_reviewer = MappingProxyType({k: tuple(v) for k, v in by_reviewer.items()})
+        self._reviewable = MappingProxyType(
+            {r: frozenset((gid, cp.get("artifact_key", "")) for gid, cp in v) for r, v in by_reviewer.items()}
+        )
+
+    # dict-style access to the parsed JSON
+    def get(self, key: str, default=None):
+        return self.raw.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self.raw[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.raw
+
+    # indexes
+    def gate(self, gate_id: str):
+        """Gate by id; falls back to the first gate (or None) like get_gate_by_id always has."""
+        g = self._gate_by_id.get(gate_id)
+        if g is None and self.gates:
+            return self.gates[0]
+        return g
+
+    def checkpoint(self, gate_id: str, artifact_key: str):
+        return self._checkpoints.get((gate_id, artifact_key))
+
+    def by_artifact(self, artifact_key: str) -> Tuple[Tuple[str, Any], ...]:
+        """(gate_id, checkpoint) pairs for an artifact key across all gates."""
+        return self._by_artifact.get(artifact_key, ())
+
+    def submitted_by(self, role: str) -> Tuple[Tuple[str, Any], ...]:
+        return self._by_submitter.get(_role(role), ())
+
+    def reviewed_by(self, role: str) -> Tuple[Tuple[str, Any], ...]:
+        return self._by_reviewer.get(_role(role), ())
+
+    def reviewable_by(self, role: str) -> frozenset:
+        """Set of (gate_id, artifact_key) the role is the designated reviewer for."""
+        return self._reviewable.get(_role(role), frozenset())
+
+_CONFIG = CompiledConfig(_EMPTY)
+
+def _stat(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+@traced("config.load")
+def load_config(path: str) -> CompiledConfig:
+    """Compiled config for path, reusing the cached one while the file is unchanged."""
     global _CONFIG
-    if not os.path.exists(path):
-        _CONFIG = {"roles": [], "decision_rules": {}, "gates": []}
+    stat = _stat(path)
+    if _STATE["path"] == path and _STATE["stat"] == stat:
         return _CONFIG
-    with open(path, "r", encoding="utf-8") as f:
-        _CONFIG = json.load(f)
+    with _LOCK:
+        stat = _stat(path)
+        if _STATE["path"] == path and _STATE["stat"] == stat:
+            return _CONFIG
+        if stat is None:
+            compiled = CompiledConfig(_EMPTY)
+        else:
+            with open(path, "rb") as f:
+                blob = f.read()
+            digest = hashlib.sha256(blob).hexdigest()
+            if _STATE["path"] == path and _CONFIG.digest == digest:
+                compiled = _CONFIG  # touched, not changed
+            else:
+                compiled = CompiledConfig(json.loads(blob.decode("utf-8")), digest)
+        _CONFIG = compiled
+        _STATE["path"], _STATE["stat"] = path, stat
+        return _CONFIG
+
+def get_config() -> CompiledConfig:
     return _CONFIG
 
 def get_roles():
-    return _CONFIG.get("roles", [])
+    return _CONFIG.roles
 
 def get_gates():
-    return _CONFIG.get("gates", [])
+    return _CONFIG.gates
 
 def get_gate_by_id(gate_id: str, gates=None):
-    gates = gates or get_gates()
+    cfg = _CONFIG
+    if gates is None or gates is cfg.gates:
+        return cfg.gate(gate_id)
     for g in gates:
         if g["gate_id"] == gate_id:
             return g
     return gates[0] if gates else None
 
 def get_decision_rules():
-    return _CONFIG.get("decision_rules", {})
+    return _CONFIG.decision_rules
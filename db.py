@@ -1,45 +1,620 @@
 # db.py
-import json, time, os, base64
+import copy, json, time, os, sys, base64, threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple
+
+from audit_store import AuditStore
+from tracing import traced
 
 DB_PATH = Path("local_db.json")
 
 DEFAULT_SETTINGS = {
     "openapi_key_obf": "",
-    "openapi_model": "gpt-4o-mini"
+    "openapi_model": "gpt-4o-mini",
+    "openapi_base_url": ""
+}
+
+# ---- Shared state cache ----
+# One parsed copy of the database per process, reused by every DB() instance
+# (and therefore every Streamlit session). It is keyed on the stat of the
+# snapshot file (and of the journal segments when journaling is on) so writes
+# made by other processes are picked up; our own commits patch it in place.
+# Readers get frozen views (MappingProxyType / tuple) so they cannot corrupt it.
+_LOCK = threading.RLock()
+_CACHE: Dict[str, Any] = {
+    "stamp": None,        # disk stamp the state was loaded from / written to
+    "state": None,        # mutable document, never handed out
+    "index": {},          # pid -> project dict inside state
+    "frozen": [],         # frozen projects, same order as state["projects"]
+    "pos": {},            # pid -> position in frozen
+    "view": None,         # frozen document returned to readers
+    "active": 1,          # journal segment receiving appends
+    "generation": 0,
+    "by_status": {},      # gate_id -> effective status -> set of pids
+    "status_of": {},      # pid -> {gate_id: effective status} as indexed in by_status
+    "names": [],          # sorted (casefolded name, pid) for query_projects
+    "by_field": {},       # QUERY_FIELDS field -> value -> set of pids
+    "fields_of": {},      # pid -> (name key, *QUERY_FIELDS values) as indexed above
 }
 
+def freeze(obj):
+    """Read-only view of a JSON-shaped value: dicts become MappingProxyType, lists tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+def thaw(obj):
+    """Return a plain, mutable deep copy of a frozen view returned by DB."""
+    if isinstance(obj, MappingProxyType):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    return obj
+
+# ---- Journal ----
+# With journaling on, each commit appends one fsync'd JSON line of ops to the
+# active segment in JOURNAL_DIR instead of rewriting local_db.json. Loading
+# replays segments numbered >= the snapshot's journal.next_segment; once the
+# active segment passes JOURNAL_COMPACT_BYTES a background thread folds the
+# log into a fresh snapshot (written to a temp file and atomically renamed).
+JOURNAL_DIR = Path("local_db.journal")
+JOURNAL_COMPACT_BYTES = 1_000_000
+JOURNAL_ENABLED = os.environ.get("FAIRSIGHT_DB_JOURNAL", "") == "1"
+_COMPACT_LOCK = threading.Lock()
+
+def _segment_path(seq: int, journal_dir: Path | None = None) -> Path:
+    return (journal_dir or JOURNAL_DIR) / f"{seq:06d}.log"
+
+def _segments(start: int = 1, journal_dir: Path | None = None) -> List[int]:
+    journal_dir = journal_dir or JOURNAL_DIR
+    if not journal_dir.is_dir():
+        return []
+    seqs = []
+    for f in journal_dir.glob("*.log"):
+        if f.stem.isdigit() and int(f.stem) >= start:
+            seqs.append(int(f.stem))
+    return sorted(seqs)
+
+def _disk_stamp(journal: bool = True):
+    """Stat of the snapshot and, when journal, of every journal segment."""
+    def stat(path: Path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    segments = _segments() if journal else ()
+    return (stat(DB_PATH), tuple((seq, stat(_segment_path(seq))) for seq in segments))
+
+# ---- Mutations ----
+# Every save_* call becomes a small op dict. apply_op() is the only code that
+# changes the document: it updates the live state on commit, replays the
+# journal on load and so also defines what a compacted snapshot contains.
+
+def _new_gate() -> Dict[str, Any]:
+    return {"checkpoints": {}, "gate_status": "Pending", "effective_status": "Pending",
+            "audit_summary": {"count": 0, "last_ts": 0}}
+
+def audit_event(op: Dict[str, Any]) -> Dict[str, Any] | None:
+    """The audit trail entry an op produces (written to the AuditStore, not the document)."""
+    kind = op["op"]
+    if kind == "checkpoint_decision":
+        return {"ts": op["ts"], "who": op["user"], "action": f"checkpoint:{op['artifact_key']}:{op['decision']}"}
+    if kind == "checkpoint_payload":
+        return {"ts": op["ts"], "who": op["user"], "action": f"artifact:{op['artifact_key']}:update"}
+    if kind == "gate_status":
+        return {"ts": op["ts"], "who": op["user"], "action": f"gate_status:{op['status']}", "reason": op["reason"]}
+    return None
+
+# ---- Effective gate status ----
+# Every gate stores effective_status: the CAIO override when the gate is
+# overridden, else its checkpoint decisions evaluated against the gate's
+# decision rules (gate_rules). apply_op refreshes it in the same write as the
+# decision or override that changes it. The rules digest it was computed with
+# is kept in data["aggregates"]["rules"]; when the config changes, every
+# gate is re-evaluated on the next read. RULES_ENGINE_VERSION is part of that
+# digest: bump it when gate_rules changes how a rule compiles or evaluates.
+RULES_CONFIG_PATH = "governance_config.json"
+RULES_ENGINE_VERSION = 2
+
+def rules_config():
+    """The loaded governance config, or RULES_CONFIG_PATH when none is loaded yet."""
+    from config_loader import get_config, load_config
+    cfg = get_config()
+    return cfg if cfg.digest else load_config(RULES_CONFIG_PATH)
+
+def rules_digest() -> str:
+    """Identifies the decision rules stored effective statuses were computed with."""
+    return f"{rules_config().digest}/v{RULES_ENGINE_VERSION}"
+
+def effective_status(gate_id: str, gs) -> str:
+    """Override-aware status of one gate state (works on frozen views too)."""
+    if gs.get("overridden"):
+        return gs.get("gate_status", "Pending")
+    from gate_rules import gate_status
+    decisions = {k: cp.get("decision", "Pending") for k, cp in gs.get("checkpoints", {}).items()}
+    return gate_status(gate_id, decisions, rules_config())
+
+# ---- Project queries ----
+# query_projects serves the Home picker one page at a time. Both stores index
+# the (case-insensitive) name and the QUERY_FIELDS equality filters: the JSON
+# store in _CACHE (a sorted name list, bisected for prefix searches, plus
+# value -> pids sets), SQLite with ordinary indexes on the projects table.
+QUERY_FIELDS = ("status", "owner", "current_gate_id")
+QUERY_SORTS = ("name", "updated")
+
+def name_key(p) -> str:
+    return (p.get("name") or "").casefold()
+
+def query_filters(status, owner, gate_id) -> Dict[str, str]:
+    """QUERY_FIELDS column -> value for the query_projects filters that were given."""
+    return {f: v for f, v in zip(QUERY_FIELDS, (status, owner, gate_id)) if v is not None}
+
+def project_matches(p, search: str, prefix: bool, filters: Dict[str, str]) -> bool:
+    """Unindexed form of the query_projects predicate (search already casefolded)."""
+    name = name_key(p)
+    if search and not (name.startswith(search) if prefix else search in name):
+        return False
+    return all((p.get(f) or "") == v for f, v in filters.items())
+
+# ---- Portfolio aggregates ----
+# Counters behind the CXO dashboard live in data["aggregates"] and are kept up
+# to date by apply_op, so the dashboard never walks every gate. gate_status
+# counts effective statuses. Each project also carries latest_gate =
+# {"gate_id", "ts"}: its most recently audited gate.
+
+GATE_STATUSES = ["Approve", "Reject", "Pending", "ReScope"]
+PROJECT_STATUSES = ["ONGOING", "COMPLETED", "PENDING"]
+
+def _project_status(p) -> str:
+    return (p.get("status", "ONGOING") or "ONGOING").upper()
+
+def _gate_last_ts(gs) -> float:
+    summary = gs.get("audit_summary")
+    if summary:
+        return summary.get("last_ts", 0)
+    return max((ev.get("ts", 0) for ev in gs.get("audit", [])), default=0)
+
+def compute_aggregates(data) -> Dict[str, Any]:
+    """Recompute the aggregates from scratch (works on frozen views too)."""
+    gate_counts = dict.fromkeys(GATE_STATUSES, 0)
+    proj_counts = dict.fromkeys(PROJECT_STATUSES, 0)
+    latest, effective = {}, {}
+    for p in data.get("projects", []):
+        pst = _project_status(p)
+        proj_counts[pst] = proj_counts.get(pst, 0) + 1
+        best_gid, best_ts = None, -1
+        for gid, gs in p.get("gates", {}).items():
+            status = effective_status(gid, gs)
+            effective.setdefault(p["id"], {})[gid] = status
+            gate_counts[status] = gate_counts.get(status, 0) + 1
+            ts = _gate_last_ts(gs)
+            if ts > best_ts:
+                best_gid, best_ts = gid, ts
+        if best_gid is not None:
+            latest[p["id"]] = {"gate_id": best_gid, "ts": best_ts}
+    return {"gate_status": gate_counts, "project_status": proj_counts, "latest_gate": latest,
+            "effective": effective, "rules": rules_digest()}
+
+def _install_aggregates(data: Dict[str, Any], agg: Dict[str, Any]):
+    data["aggregates"] = {"gate_status": agg["gate_status"], "project_status": agg["project_status"],
+                          "rules": agg["rules"]}
+    for p in data.get("projects", []):
+        if p["id"] in agg["latest_gate"]:
+            p["latest_gate"] = agg["latest_gate"][p["id"]]
+        else:
+            p.pop("latest_gate", None)
+        for gid, status in agg["effective"].get(p["id"], {}).items():
+            p["gates"][gid]["effective_status"] = status
+
+def _rules_stale(data) -> bool:
+    return (data.get("aggregates") or {}).get("rules") != rules_digest()
+
+def _bump(data: Dict[str, Any], kind: str, key: str, delta: int):
+    agg = data.get("aggregates")
+    if agg is None:
+        return  # not materialized yet; installed on the next load
+    counts = agg.setdefault(kind, {})
+    counts[key] = counts.get(key, 0) + delta
+
+def _gate(data: Dict[str, Any], p: Dict[str, Any], gate_id: str) -> Dict[str, Any]:
+    gates = p.setdefault("gates", {})
+    if gate_id not in gates:
+        gates[gate_id] = _new_gate()
+        _bump(data, "gate_status", "Pending", 1)
+    return gates[gate_id]
+
+def _set_effective(data: Dict[str, Any], gate_id: str, gate: Dict[str, Any]):
+    new = effective_status(gate_id, gate)
+    old = gate.get("effective_status", "Pending")
+    if new != old:
+        _bump(data, "gate_status", old, -1)
+        _bump(data, "gate_status", new, 1)
+    gate["effective_status"] = new
+
+def _touch_audit(p: Dict[str, Any], gate_id: str, ts: float):
+    # Only a summary stays inline; gates written before the AuditStore keep their
+    # old "audit" list until migrate_inline_audit() moves it out.
+    gate = p["gates"][gate_id]
+    legacy = gate.get("audit", [])
+    summary = gate.setdefault("audit_summary", {
+        "count": len(legacy),
+        "last_ts": max((ev.get("ts", 0) for ev in legacy), default=0),
+    })
+    summary["count"] += 1
+    summary["last_ts"] = max(summary["last_ts"], ts)
+    if ts >= (p.get("latest_gate") or {}).get("ts", -1):
+        p["latest_gate"] = {"gate_id": gate_id, "ts": ts}
+
+def apply_op(data: Dict[str, Any], index: Dict[str, Dict[str, Any]], op: Dict[str, Any]) -> str | None:
+    """Apply one op to data; return the id of the project it touched (None for settings)."""
+    kind = op["op"]
+    if kind == "settings":
+        data.setdefault("settings", dict(DEFAULT_SETTINGS)).update(op["patch"])
+        return None
+    if kind == "create_project":
+        # A copy: later ops change the project, and the op itself is still read
+        # afterwards (journal append, read-your-writes replay).
+        proj = copy.deepcopy(op["project"])
+        data.setdefault("projects", []).append(proj)
+        index[proj["id"]] = proj
+        _bump(data, "project_status", _project_status(proj), 1)
+        return proj["id"]
+    if kind == "rebuild_aggregates":
+        _install_aggregates(data, compute_aggregates(data))
+        return None
+
+    p = index.get(op["pid"])
+    if p is None:
+        return None
+    ts = op.get("ts")
+    if kind == "update_project":
+        _bump(data, "project_status", _project_status(p), -1)
+        p.update(op["patch"])
+        p["updated_at"] = ts
+        _bump(data, "project_status", _project_status(p), 1)
+    elif kind == "checkpoint_decision":
+        gate = _gate(data, p, op["gate_id"])
+        cp = gate["checkpoints"].setdefault(op["artifact_key"], {})
+        cp["decision"] = op["decision"]
+        cp["decided_by"] = op["user"]
+        cp["decided_at"] = ts
+        _set_effective(data, op["gate_id"], gate)
+        _touch_audit(p, op["gate_id"], ts)
+    elif kind == "checkpoint_payload":
+        # Stored once per (project, artifact_key); every gate listing the same
+        # artifact reads it from there, so nothing is copied between gates.
+        p.setdefault("artifact_payloads", {})[op["artifact_key"]] = {
+            "payload": op["payload"], "updated_by": op["user"], "updated_at": ts,
+        }
+        gate = _gate(data, p, op["gate_id"])
+        cp = gate["checkpoints"].setdefault(op["artifact_key"], {})
+        cp.pop("payload", None)
+        cp["payload_ref"] = op["artifact_key"]
+        cp["updated_by"] = op["user"]
+        cp["updated_at"] = ts
+        _touch_audit(p, op["gate_id"], ts)
+    elif kind == "fold_payloads":
+        # Older databases copied payloads into every gate; keep the newest copy once.
+        shared = p.setdefault("artifact_payloads", {})
+        for gs in p.get("gates", {}).values():
+            for akey, cp in gs.get("checkpoints", {}).items():
+                if "payload" not in cp:
+                    continue
+                cur = shared.get(akey)
+                if cur is None or (cp.get("updated_at") or 0) > (cur.get("updated_at") or 0):
+                    shared[akey] = {"payload": cp["payload"], "updated_by": cp.get("updated_by"),
+                                    "updated_at": cp.get("updated_at")}
+                del cp["payload"]
+                cp["payload_ref"] = akey
+    elif kind == "gate_status":
+        gate = _gate(data, p, op["gate_id"])
+        gate["gate_status"] = op["status"]
+        gate["overridden"] = True
+        gate["override_by"] = op["user"]
+        gate["override_reason"] = op["reason"]
+        _set_effective(data, op["gate_id"], gate)
+        _touch_audit(p, op["gate_id"], ts)
+    elif kind == "ai_suggestion":
+        # Kept beside the gates rather than in them: a suggestion is not a
+        # decision, so it must not create gate state or move the aggregates.
+        p.setdefault("ai_suggestions", {}).setdefault(op["gate_id"], {})[op["artifact_key"]] = op["suggestion"]
+    elif kind == "drop_inline_audit":
+        gate = p.get("gates", {}).get(op["gate_id"])
+        if gate and "audit" in gate:
+            legacy = gate.pop("audit")
+            gate["audit_summary"] = gate.get("audit_summary") or {
+                "count": len(legacy),
+                "last_ts": max((ev.get("ts", 0) for ev in legacy), default=0),
+            }
+    else:
+        raise ValueError(f"Unknown op: {kind}")
+    return op["pid"]
+
+# ---- Transactions ----
+# The open unit of work is per thread and shared by all DB() instances, so a
+# save_* call made anywhere inside "with db.transaction():" joins it.
+_TX = threading.local()
+_PID_LOCK = threading.Lock()
+_LAST_PID_MS = 0
+
+def load_document(path: Path | None = None, journal_dir: Path | None = None):
+    """
+    The document in snapshot path (default DB_PATH) with the journal segments
+    it has not absorbed yet replayed on top (default JOURNAL_DIR; for another
+    snapshot, the .journal directory next to it). Returns (data, index, the
+    last segment seen).
+    """
+    path = path or DB_PATH
+    journal_dir = journal_dir or (JOURNAL_DIR if path == DB_PATH else path.with_suffix(".journal"))
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    index = {p["id"]: p for p in data.setdefault("projects", [])}
+    if "aggregates" not in data or _rules_stale(data):
+        _install_aggregates(data, compute_aggregates(data))
+    start = data.get("journal", {}).get("next_segment", 1)
+    seqs = _segments(start, journal_dir)
+    for seq in seqs:
+        with open(_segment_path(seq, journal_dir), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break  # torn tail from a crash mid-append
+                for op in rec["ops"]:
+                    apply_op(data, index, op)
+    return data, index, max(seqs[-1] if seqs else start, start)
+
+def new_project_id() -> str:
+    # Millisecond ids, kept unique when many projects are created in one transaction.
+    global _LAST_PID_MS
+    with _PID_LOCK:
+        _LAST_PID_MS = max(int(time.time()*1000), _LAST_PID_MS + 1)
+        return f"p_{_LAST_PID_MS}"
+
 class DB:
-    def __init__(self):
+    def __init__(self, journal: bool | None = None):
+        self.journal = JOURNAL_ENABLED if journal is None else journal
+        self.audit = AuditStore()
         if not DB_PATH.exists():
             with open(DB_PATH, "w", encoding="utf-8") as f:
                 json.dump({"projects": [], "settings": DEFAULT_SETTINGS}, f)
 
-    def _load(self) -> Dict[str, Any]:
-        with open(DB_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+    # ---- Loading ----
+    @traced("db.load")
+    def _read_disk(self):
+        # Retried if a compaction removes a segment mid-read.
+        for attempt in range(3):
+            try:
+                return load_document()
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+
+    def _refresh(self):
+        """Make sure _CACHE reflects disk and the current decision rules; caller holds _LOCK."""
+        stamp = _disk_stamp(self.journal)
+        if _CACHE["state"] is not None and stamp == _CACHE["stamp"]:
+            if not _rules_stale(_CACHE["state"]):
+                return
+            # Config changed: re-evaluate every gate in memory; saved with the next write
+            data = _CACHE["state"]
+            _install_aggregates(data, compute_aggregates(data))
+        else:
+            data, index, active = self._read_disk()
+            # Never move back to a segment a running compaction has already sealed.
+            _CACHE.update(state=data, index=index, active=max(active, _CACHE["active"]), stamp=stamp)
+        _CACHE["frozen"] = [freeze(p) for p in data["projects"]]
+        _CACHE["pos"] = {p["id"]: i for i, p in enumerate(data["projects"])}
+        _CACHE["by_status"], _CACHE["status_of"] = {}, {}
+        _CACHE["names"], _CACHE["by_field"], _CACHE["fields_of"] = [], {}, {}
+        for p in data["projects"]:
+            self._index_status(p)
+            self._index_fields(p, sort=False)
+        _CACHE["names"].sort()
+        self._publish()
+
+    @staticmethod
+    def _index_status(p: Dict[str, Any]):
+        """Move p's entries in the gate -> effective status index; caller holds _LOCK."""
+        by_status = _CACHE["by_status"]
+        pid = p["id"]
+        for gid, status in _CACHE["status_of"].get(pid, {}).items():
+            by_status.get(gid, {}).get(status, set()).discard(pid)
+        current = {gid: gs.get("effective_status", "Pending") for gid, gs in p.get("gates", {}).items()}
+        for gid, status in current.items():
+            by_status.setdefault(gid, {}).setdefault(status, set()).add(pid)
+        _CACHE["status_of"][pid] = current
 
-    def _save(self, data: Dict[str, Any]):
-        with open(DB_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    @staticmethod
+    def _index_fields(p: Dict[str, Any], sort: bool = True):
+        """Move p's entries in the name and QUERY_FIELDS indexes; caller holds _LOCK."""
+        pid = p["id"]
+        old = _CACHE["fields_of"].get(pid)
+        new = (name_key(p), *((p.get(f) or "") for f in QUERY_FIELDS))
+        if old == new:
+            return
+        names, by_field = _CACHE["names"], _CACHE["by_field"]
+        if old is not None:
+            i = bisect_left(names, (old[0], pid))
+            if i < len(names) and names[i] == (old[0], pid):
+                del names[i]
+            for f, v in zip(QUERY_FIELDS, old[1:]):
+                by_field.get(f, {}).get(v, set()).discard(pid)
+        if sort:
+            insort(names, (new[0], pid))
+        else:
+            names.append((new[0], pid))
+        for f, v in zip(QUERY_FIELDS, new[1:]):
+            by_field.setdefault(f, {}).setdefault(v, set()).add(pid)
+        _CACHE["fields_of"][pid] = new
+
+    def _publish(self):
+        state = _CACHE["state"]
+        _CACHE["view"] = MappingProxyType({
+            k: tuple(_CACHE["frozen"]) if k == "projects" else freeze(v) for k, v in state.items()
+        })
+        _CACHE["generation"] += 1
+
+    def _view(self):
+        ops = getattr(_TX, "ops", None)
+        if _CACHE["view"] is None or _disk_stamp(self.journal) != _CACHE["stamp"] or _rules_stale(_CACHE["view"]):
+            with _LOCK:
+                self._refresh()
+        view = _CACHE["view"]
+        if ops:
+            # read-your-writes inside a transaction
+            data = thaw(view)
+            index = {p["id"]: p for p in data["projects"]}
+            for op in ops:
+                apply_op(data, index, op)
+            return freeze(data)
+        return view
+
+    def generation(self) -> int:
+        """Counter that changes whenever the cached state is replaced or written."""
+        self._view()
+        return _CACHE["generation"]
+
+    # ---- Writing ----
+    def _record(self, op: Dict[str, Any]):
+        # Round-trip through JSON so the live state holds exactly what replay would.
+        op = json.loads(json.dumps(op))
+        ops = getattr(_TX, "ops", None)
+        if ops is not None:
+            ops.append(op)
+        else:
+            self._commit([op])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: save_* calls inside the block are collected and
+        committed together on exit with a single write. Nested blocks join
+        the outermost one; an exception discards every pending change.
+        """
+        if getattr(_TX, "ops", None) is not None:
+            yield self
+            return
+        _TX.ops = []
+        try:
+            yield self
+            ops = _TX.ops
+        finally:
+            _TX.ops = None
+        if ops:
+            self._commit(ops)
+
+    @traced("db.commit")
+    def _commit(self, ops: List[Dict[str, Any]]):
+        compact = False
+        with _LOCK:
+            self._refresh()
+            try:
+                touched, events = set(), []
+                for op in ops:
+                    pid = apply_op(_CACHE["state"], _CACHE["index"], op)
+                    touched.add(pid)
+                    ev = audit_event(op) if pid else None
+                    if ev:
+                        events.append((pid, op["gate_id"], ev))
+                if any(op["op"] == "rebuild_aggregates" for op in ops):
+                    touched |= set(_CACHE["index"])  # latest_gate may change on every project
+                for pid in touched - {None}:
+                    self._index_status(_CACHE["index"][pid])
+                    self._index_fields(_CACHE["index"][pid])
+                    frozen = freeze(_CACHE["index"][pid])
+                    if pid in _CACHE["pos"]:
+                        _CACHE["frozen"][_CACHE["pos"][pid]] = frozen
+                    else:
+                        _CACHE["pos"][pid] = len(_CACHE["frozen"])
+                        _CACHE["frozen"].append(frozen)
+                self._publish()
+                # Audit events go first: a crash before the document write then leaves
+                # extra history rather than counted events that were never written.
+                if events:
+                    self.audit.append_many(events)
+                if self.journal:
+                    seg = _segment_path(_CACHE["active"])
+                    seg.parent.mkdir(exist_ok=True)
+                    with open(seg, "a", encoding="utf-8") as f:
+                        f.write(json.dumps({"ops": ops}) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    _CACHE["stamp"] = _disk_stamp(self.journal)
+                    compact = seg.stat().st_size > JOURNAL_COMPACT_BYTES
+                else:
+                    next_segment = _CACHE["active"] + 1 if _segments() else None
+                    self._replace_snapshot(self._snapshot_text(_CACHE["state"], next_segment), next_segment)
+            except Exception:
+                _CACHE["state"] = _CACHE["view"] = None  # reload from disk on next access
+                raise
+        if compact:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    @staticmethod
+    def _snapshot_text(doc: Dict[str, Any], next_segment: int | None) -> str:
+        doc = dict(doc)
+        if next_segment is not None or "journal" in doc:
+            doc["journal"] = {"next_segment": next_segment or _CACHE["active"]}
+        return json.dumps(doc, separators=(",", ":"))
+
+    def _replace_snapshot(self, text: str, next_segment: int | None):
+        """Atomically replace local_db.json and drop folded segments; caller holds _LOCK."""
+        tmp = DB_PATH.with_name(DB_PATH.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, DB_PATH)
+        if next_segment is not None:
+            for seq in _segments():
+                if seq < next_segment:
+                    _segment_path(seq).unlink(missing_ok=True)
+            _CACHE["active"] = next_segment
+        _CACHE["stamp"] = _disk_stamp(self.journal)
+
+    def compact(self):
+        """Fold the journal into a new snapshot; safe to call while the app is serving."""
+        if not _COMPACT_LOCK.acquire(blocking=False):
+            return  # another compaction is already running
+        try:
+            with _LOCK:
+                self._refresh()
+                if not _segments():
+                    return
+                # Seal the active segment: later commits append to the next one.
+                view, base = _CACHE["view"], _CACHE["stamp"][0]
+                next_segment = _CACHE["active"] = _CACHE["active"] + 1
+            text = self._snapshot_text(thaw(view), next_segment)
+            with _LOCK:
+                if _disk_stamp(self.journal)[0] != base:
+                    return  # a newer snapshot was written meanwhile
+                self._replace_snapshot(text, next_segment)
+        finally:
+            _COMPACT_LOCK.release()
 
     # ---- Settings ----
     def get_settings(self) -> Dict[str, Any]:
-        return self._load().get("settings", DEFAULT_SETTINGS)
+        return self._view().get("settings", MappingProxyType(DEFAULT_SETTINGS))
 
     def save_openapi_key(self, raw_key: str, model: str | None = None):
-        data = self._load()
         obf = base64.b64encode(raw_key.encode("utf-8")).decode("utf-8") if raw_key else ""
-        data["settings"]["openapi_key_obf"] = obf
+        patch = {"openapi_key_obf": obf}
         if model:
-            data["settings"]["openapi_model"] = model
-        self._save(data)
+            patch["openapi_model"] = model
+        self._record({"op": "settings", "patch": patch})
 
     def clear_openapi_key(self):
-        data = self._load()
-        data["settings"]["openapi_key_obf"] = ""
-        self._save(data)
+        self._record({"op": "settings", "patch": {"openapi_key_obf": ""}})
+
+    def save_openapi_base_url(self, url: str):
+        self._record({"op": "settings", "patch": {"openapi_base_url": url}})
 
     def get_openapi_key(self) -> str:
         obf = self.get_settings().get("openapi_key_obf","")
@@ -51,102 +626,232 @@ class DB:
             return ""
 
     # ---- Projects ----
+    @traced("db.create_project")
     def create_project(self, proj: Dict[str, Any]) -> str:
-        data = self._load()
-        pid = f"p_{int(time.time()*1000)}"
+        pid = new_project_id()
         proj["id"] = pid
         proj["gates"] = {}
-        data["projects"].append(proj)
-        self._save(data)
+        self._record({"op": "create_project", "project": proj})
         return pid
 
+    @traced("db.list_projects")
     def list_projects(self) -> List[Dict[str, Any]]:
-        return self._load().get("projects", [])
+        return self._view().get("projects", ())
 
+    @traced("db.get_project")
     def get_project(self, pid: str) -> Dict[str, Any] | None:
-        for p in self._load().get("projects", []):
+        view = self._view()
+        projects = view.get("projects", ())
+        if not getattr(_TX, "ops", None):
+            # O(1) through the cache's pid -> position index (positions only ever append).
+            i = _CACHE["pos"].get(pid)
+            if i is not None and i < len(projects) and projects[i]["id"] == pid:
+                return projects[i]
+        for p in projects:
             if p["id"] == pid:
                 return p
         return None
 
+    @traced("db.projects_with_gate_status")
+    def projects_with_gate_status(self, gate_id: str, status: str) -> List[Dict[str, Any]]:
+        """Projects whose effective status at gate_id is status, from the status index (no scan)."""
+        view = self._view()
+        projects = view.get("projects", ())
+        if getattr(_TX, "ops", None):
+            return [p for p in projects if p.get("gates", {}).get(gate_id, {}).get("effective_status") == status]
+        with _LOCK:
+            positions = sorted(_CACHE["pos"][pid] for pid in _CACHE["by_status"].get(gate_id, {}).get(status, ()))
+        return [projects[i] for i in positions if i < len(projects)]
+
+    @traced("db.query_projects")
+    def query_projects(self, search: str = "", status: str | None = None, owner: str | None = None,
+                       gate_id: str | None = None, sort: str = "name", prefix: bool = False,
+                       limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of projects whose name contains search (case-insensitive;
+        starts with it when prefix=True) and whose status / owner / current
+        gate equal the given values, sorted by name or "updated" (newest
+        first). Returns (page, total matches); only the page's projects are
+        touched, the rest is answered from the name and field indexes.
+        """
+        if sort not in QUERY_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        view = self._view()
+        projects = view.get("projects", ())
+        q = search.strip().casefold()
+        filters = query_filters(status, owner, gate_id)
+        if getattr(_TX, "ops", None):
+            matched = sorted((p for p in projects if project_matches(p, q, prefix, filters)),
+                             key=lambda p: (name_key(p), p["id"]))
+        else:
+            with _LOCK:
+                names = _CACHE["names"]
+                if q and prefix:
+                    names = names[bisect_left(names, (q,)):bisect_left(names, (q + "\U0010ffff",))]
+                elif q:
+                    names = [n for n in names if q in n[0]]
+                keep = None
+                for f, v in filters.items():
+                    ids = _CACHE["by_field"].get(f, {}).get(v, set())
+                    keep = ids if keep is None else keep & ids
+                pos = _CACHE["pos"]
+                positions = [pos[pid] for _, pid in names if keep is None or pid in keep]
+            if sort == "name":
+                page = positions[offset:offset + limit]
+                return [projects[i] for i in page if i < len(projects)], len(positions)
+            matched = [projects[i] for i in positions if i < len(projects)]
+        if sort == "updated":
+            matched.sort(key=lambda p: p.get("updated_at") or 0, reverse=True)
+        return matched[offset:offset + limit], len(matched)
+
+    @traced("db.update_project")
     def update_project(self, pid: str, patch: Dict[str, Any]):
-        data = self._load()
-        for i,p in enumerate(data["projects"]):
-            if p["id"] == pid:
-                p.update(patch)
-                p["updated_at"] = time.time()
-                data["projects"][i] = p
-                self._save(data)
-                return
+        self._record({"op": "update_project", "pid": pid, "patch": patch, "ts": time.time()})
 
+    @traced("db.save_checkpoint_decision")
     def save_checkpoint_decision(self, pid: str, gate_id: str, artifact_key: str, decision: str, user: str):
-        data = self._load()
-        for i,p in enumerate(data["projects"]):
-            if p["id"] == pid:
-                gates = p.setdefault("gates", {})
-                gate = gates.setdefault(gate_id, {"checkpoints": {}, "gate_status": "Pending", "audit": []})
-                cp = gate["checkpoints"].setdefault(artifact_key, {})
-                cp["decision"] = decision
-                cp["decided_by"] = user
-                cp["decided_at"] = time.time()
-                gate["audit"].append({"ts": time.time(), "who": user, "action": f"checkpoint:{artifact_key}:{decision}"})
-                data["projects"][i] = p
-                self._save(data)
-                return
+        self._record({"op": "checkpoint_decision", "pid": pid, "gate_id": gate_id, "artifact_key": artifact_key,
+                      "decision": decision, "user": user, "ts": time.time()})
 
+    @traced("db.save_checkpoint_payload")
     def save_checkpoint_payload(self, pid: str, gate_id: str, artifact_key: str, payload: dict, user: str):
-        data = self._load()
-        for i,p in enumerate(data["projects"]):
-            if p["id"] == pid:
-                gates = p.setdefault("gates", {})
-                # Save for the current gate
-                gate = gates.setdefault(gate_id, {"checkpoints": {}, "gate_status": "Pending", "audit": []})
-                cp = gate["checkpoints"].setdefault(artifact_key, {})
-                cp["payload"] = payload
-                cp["updated_by"] = user
-                cp["updated_at"] = time.time()
-                gate["audit"].append({"ts": time.time(), "who": user, "action": f"artifact:{artifact_key}:update"})
-                # PROPAGATE_SIMILAR_ARTIFACTS: copy same payload to other gates with same artifact_key
-                for other_gid, other_gate in gates.items():
-                    if other_gid == gate_id:
-                        continue
-                    ocp = other_gate.setdefault("checkpoints", {}).setdefault(artifact_key, {})
-                    ocp["payload"] = payload
-                    ocp["updated_by"] = user
-                    ocp["updated_at"] = time.time()
-                data["projects"][i] = p
-                self._save(data)
-                return
+        self._record({"op": "checkpoint_payload", "pid": pid, "gate_id": gate_id, "artifact_key": artifact_key,
+                      "payload": payload, "user": user, "ts": time.time()})
 
+    @traced("db.save_gate_status")
     def save_gate_status(self, pid: str, gate_id: str, status: str, user: str, reason: str = ""):
-        data = self._load()
-        for i, p in enumerate(data["projects"]):
-            if p["id"] == pid:
-                gates = p.setdefault("gates", {})
-                gate = gates.setdefault(gate_id, {"checkpoints": {}, "gate_status": "Pending", "audit": []})
-                gate["gate_status"] = status
-                gate["overridden"] = True
-                gate["override_by"] = user
-                gate["override_reason"] = reason
-                gate["audit"].append({
-                    "ts": time.time(),
-                    "who": user,
-                    "action": f"gate_status:{status}",
-                    "reason": reason
-                })
-                data["projects"][i] = p
-                self._save(data)
-                return
+        self._record({"op": "gate_status", "pid": pid, "gate_id": gate_id, "status": status,
+                      "user": user, "reason": reason, "ts": time.time()})
+
+    @traced("db.save_ai_suggestion")
+    def save_ai_suggestion(self, pid: str, gate_id: str, artifact_key: str, suggestion: Dict[str, Any]):
+        self._record({"op": "ai_suggestion", "pid": pid, "gate_id": gate_id, "artifact_key": artifact_key,
+                      "suggestion": suggestion, "ts": time.time()})
 
+    @traced("db.get_ai_suggestions")
+    def get_ai_suggestions(self, pid: str, gate_id: str) -> Dict[str, Any]:
+        """{artifact_key: suggestion} of the latest stored AI suggestions for one gate."""
+        p = self.get_project(pid)
+        return (p or {}).get("ai_suggestions", {}).get(gate_id, {})
 
+    @traced("db.get_artifact_payload")
     def get_artifact_payload(self, pid: str, artifact_key: str):
-        data = self._load()
-        for p in data.get("projects", []):
-            if p["id"] == pid:
-                gates = p.get("gates", {})
-                # Prefer payload from any gate that has it
-                for gid, gs in gates.items():
-                    cp = gs.get("checkpoints", {}).get(artifact_key, {})
-                    if "payload" in cp:
-                        return cp.get("payload")
+        p = self.get_project(pid)
+        if p is None:
+            return None
+        shared = p.get("artifact_payloads", {}).get(artifact_key)
+        if shared is not None:
+            return shared.get("payload")
+        # Not yet folded (see migrate_artifact_payloads): any gate's copy will do
+        for gid, gs in p.get("gates", {}).items():
+            cp = gs.get("checkpoints", {}).get(artifact_key, {})
+            if "payload" in cp:
+                return cp.get("payload")
         return None
+
+    def migrate_artifact_payloads(self) -> int:
+        """Fold per-gate payload copies into artifact_payloads; returns the number of projects touched."""
+        pids = [p["id"] for p in self.list_projects()
+                if any("payload" in cp for gs in p.get("gates", {}).values()
+                       for cp in gs.get("checkpoints", {}).values())]
+        with self.transaction():
+            for pid in pids:
+                self._record({"op": "fold_payloads", "pid": pid})
+        return len(pids)
+
+    # ---- Dashboard aggregates ----
+    @traced("db.dashboard_summary")
+    def dashboard_summary(self) -> Dict[str, Any]:
+        """Materialized CXO dashboard counters; read without touching any project."""
+        view = self._view()
+        agg = view.get("aggregates") or {}
+        return {
+            "total": len(view.get("projects", ())),
+            "gate_status": {**dict.fromkeys(GATE_STATUSES, 0), **agg.get("gate_status", {})},
+            "project_status": {**dict.fromkeys(PROJECT_STATUSES, 0), **agg.get("project_status", {})},
+        }
+
+    def rebuild_aggregates(self, verify_only: bool = False) -> List[str]:
+        """
+        Recompute the aggregates from scratch and report where the materialized
+        values differ. Unless verify_only, the recomputed values are stored.
+        """
+        view = self._view()
+        fresh = compute_aggregates(view)
+        stored = view.get("aggregates") or {}
+        diffs = []
+        for kind in ("gate_status", "project_status"):
+            for key in sorted(set(fresh[kind]) | set(stored.get(kind, {}))):
+                want, have = fresh[kind].get(key, 0), stored.get(kind, {}).get(key, 0)
+                if want != have:
+                    diffs.append(f"{kind}[{key}]: stored {have}, actual {want}")
+        for p in view.get("projects", ()):
+            want = fresh["latest_gate"].get(p["id"], {}).get("gate_id")
+            have = (p.get("latest_gate") or {}).get("gate_id")
+            if want != have:
+                diffs.append(f"latest_gate[{p['id']}]: stored {have}, actual {want}")
+            for gid, gs in p.get("gates", {}).items():
+                want, have = fresh["effective"][p["id"]][gid], gs.get("effective_status")
+                if want != have:
+                    diffs.append(f"effective_status[{p['id']}/{gid}]: stored {have}, actual {want}")
+        if diffs and not verify_only:
+            self._record({"op": "rebuild_aggregates"})
+        return diffs
+
+    # ---- Audit ----
+    @traced("db.audit_page")
+    def audit_page(self, pid: str, gate_id: str, limit: int = 50, before: Tuple[float, int] | None = None):
+        """Newest-first page of a gate's audit trail; returns (events, (ts, seq) cursor) like AuditStore.page."""
+        events, cursor = self.audit.page(pid, gate_id, limit, before)
+        if len(events) < limit:
+            # Events recorded before the AuditStore existed are older than anything in it,
+            # so their seq is negative: their list position minus the list length.
+            p = self.get_project(pid) or {}
+            legacy = p.get("gates", {}).get(gate_id, {}).get("audit", ())
+            keyed = [((ev.get("ts", 0), i - len(legacy)), ev) for i, ev in enumerate(legacy)]
+            older = sorted((kv for kv in keyed if before is None or kv[0] < before),
+                           key=lambda kv: kv[0], reverse=True)[:limit - len(events)]
+            events += [thaw(ev) for _, ev in older]
+            cursor = older[-1][0] if older and len(events) == limit else None
+        return events, cursor
+
+    def migrate_inline_audit(self) -> int:
+        """Move inline gate["audit"] lists into the AuditStore; returns the number of events moved."""
+        moved = 0
+        with self.transaction():
+            for p in self.list_projects():
+                for gid, gs in p.get("gates", {}).items():
+                    legacy = gs.get("audit")
+                    if legacy is None:
+                        continue
+                    self.audit.append_many([(p["id"], gid, thaw(ev)) for ev in legacy])
+                    self._record({"op": "drop_inline_audit", "pid": p["id"], "gate_id": gid})
+                    moved += len(legacy)
+        return moved
+
+def open_db():
+    """Return the configured storage backend: FAIRSIGHT_DB=sqlite selects sqlite_db.DB."""
+    if os.environ.get("FAIRSIGHT_DB", "json").lower() == "sqlite":
+        from sqlite_db import DB as SQLiteDB
+        return SQLiteDB()
+    return DB()
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "compact":
+        DB(journal=True).compact()
+        print(f"Compacted journal into {DB_PATH}.")
+    elif cmd == "migrate-audit":
+        print(f"Moved {DB().migrate_inline_audit()} audit events into {AuditStore().root}/.")
+    elif cmd == "rebuild-aggregates":
+        verify_only = "--verify" in sys.argv[2:]
+        diffs = open_db().rebuild_aggregates(verify_only=verify_only)
+        for d in diffs:
+            print(d)
+        print(f"{len(diffs)} difference(s) found" + ("." if verify_only or not diffs else "; aggregates rebuilt."))
+        sys.exit(1 if diffs and verify_only else 0)
+    elif cmd == "migrate-artifacts":
+        print(f"Folded shared artifact payloads for {DB().migrate_artifact_payloads()} projects.")
+    else:
+        print("Usage: python db.py compact|migrate-audit|migrate-artifacts|rebuild-aggregates [--verify]")
+        sys.exit(1)
@@ -0,0 +1,252 @@
+# gate_rules.py
+import math, re, sys, threading, time
+from typing import Dict, Any, List, Tuple, Optional, Sequence, Mapping
+
+import numpy as np
+
+from config_loader import CompiledConfig, get_config
+from scorer import keyword_stems, rulebook
+from workflow import DECISIONS
+
+# Gate status from the decision_rules rows of the governance config. Each
+# gate's "Approval Rule" text is parsed once per loaded config into a GateRule:
+# a pass threshold plus masks over the gate's checkpoints for critical
+# checkpoints (the ones guarding a Critical Blocker) and must-pass checkpoints.
+# Decisions are encoded as small ints (their index in workflow.DECISIONS), so
+# a rule evaluates a whole (projects x checkpoints) matrix with a handful of
+# NumPy reductions. Gates without a rule keep the old semantics: any Reject
+# rejects, every checkpoint must be approved.
+#
+# Evaluation order: Reject when a critical or must-pass checkpoint is
+# rejected or too many are rejected to still reach the threshold; Approve
+# when enough are approved and every must-pass one is; else ReScope if any
+# checkpoint is ReScope; else Pending.
+
+APPROVE, REJECT, RESCOPE, PENDING = (DECISIONS.index(d) for d in ("Approve", "Reject", "ReScope", "Pending"))
+_CODE = {d: i for i, d in enumerate(DECISIONS)}
+_STATUS = np.array(DECISIONS, dtype=object)
+
+_PCT_PASS = re.compile(r"(?:≥|>=)\s*(\d+(?:\.\d+)?)\s*%\s*pass", re.I)
+_PCT_OF = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*of\s+(.+?)\s+checkpoints?\s+pass", re.I)
+_ALL_PASS = re.compile(r"^all\s+(.+?)\s+checkpoints?\s+pass", re.I)
+_MUST_PASS = re.compile(r"^(.+?)\s+must\s+pass", re.I)
+_ALL_OF = re.compile(r"^all\s+(.+)$", re.I)
+_NO_CRITICAL = re.compile(r"\bno\s+critical\s+fails?\b", re.I)
+_SUSPEND = re.compile(r"\bsuspend\w*\s+if\b", re.I)
+_ALTERNATIVES = re.compile(r"\s*(?:/|\+|,|\band\b)\s*", re.I)
+
+_LOCK = threading.Lock()
+_ENGINE: Dict[str, Any] = {"cfg": None, "engine": None}
+
+def encode(decisions: Sequence[str]) -> np.ndarray:
+    """Decision strings -> int8 codes; anything unknown counts as Pending."""
+    return np.fromiter((_CODE.get(d, PENDING) for d in decisions), dtype=np.int8, count=len(decisions))
+
+def decode(codes: np.ndarray) -> np.ndarray:
+    return _STATUS[codes]
+
+class GateRule:
+    """
+    Compiled rule for one gate. keys is the gate's artifact keys in config
+    order; every decision vector/matrix column follows that order.
+    """
+
+    def __init__(self, gate_id: str, keys: Sequence[str], text: str = "", threshold: float = 1.0,
+                 critical: Optional[np.ndarray] = None, must: Optional[np.ndarray] = None,
+                 clauses: Optional[List[Dict[str, Any]]] = None):
+        self.gate_id = gate_id
+        self.keys = tuple(keys)
+        self.text = text
+        self.threshold = threshold
+        n = len(self.keys)
+        self.critical = np.ones(n, dtype=bool) if critical is None else critical
+        self.must = np.zeros(n, dtype=bool) if must is None else must
+        self.clauses = clauses or []
+        self._column = {k: i for i, k in enumerate(self.keys)}
+        # Approve needs at least this many approvals; more rejects than max_rejects is hopeless
+        self.min_approvals = max(1, math.ceil(threshold * n - 1e-9)) if n else 1
+        self.max_rejects = n - self.min_approvals
+
+    @classmethod
+    def compile(cls, gate: Mapping[str, Any], row: Optional[Mapping[str, Any]], critical: Mapping) -> "GateRule":
+        gid = gate["gate_id"]
+        cps = list(gate.get("checkpoints", ()))
+        keys = [cp.get("artifact_key", "") for cp in cps]
+        if row is None:
+            return cls(gid, keys, clauses=[{"kind": "legacy", "text": "Every checkpoint approved; any Reject rejects"}])
+        texts = [f"{cp.get('checkpoint', '')} {cp.get('artifact', '')}" for cp in cps]
+        cp_stems = [set(keyword_stems(t)) for t in texts]
+        n = len(keys)
+
+        def matching(terms: str) -> np.ndarray:
+            """Checkpoints matching any '/'/'+'-separated alternative (all of its words)."""
+            mask = np.zeros(n, dtype=bool)
+            for alt in filter(None, _ALTERNATIVES.split(terms)):
+                want = set(keyword_stems(alt))
+                if want:
+                    mask |= np.array([want <= s for s in cp_stems], dtype=bool)
+            return mask
+
+        text = (row.get("Approval Rule") or "").strip()
+        threshold, clauses = None, []
+        crit = np.zeros(n, dtype=bool)
+        must = np.zeros(n, dtype=bool)
+        for clause in filter(None, (c.strip() for c in text.split(";"))):
+            if m := _PCT_PASS.search(clause):
+                threshold = float(m.group(1)) / 100
+                clauses.append({"kind": "threshold", "text": clause})
+            elif (m := _PCT_OF.search(clause)) or (m := _ALL_PASS.search(clause)):
+                pct, terms = (float(m.group(1)), m.group(2)) if m.re is _PCT_OF else (100.0, m.group(1))
+                mask = matching(terms)
+                if pct >= 100:
+                    if not mask.any():
+                        mask = np.ones(n, dtype=bool)  # no checkpoint names these terms: the whole gate
+                    must |= mask
+                    clauses.append({"kind": "must", "text": clause, "mask": mask})
+                else:
+                    # A share below 100% is not tracked per checkpoint: it becomes the gate's threshold
+                    threshold = pct / 100
+                    clauses.append({"kind": "threshold", "text": clause})
+            elif _NO_CRITICAL.search(clause):
+                crit |= np.array([bool(critical.get((gid, k))) for k in keys], dtype=bool)
+                clauses.append({"kind": "critical", "text": clause, "mask": crit.copy()})
+            elif _SUSPEND.search(clause):
+                crit[:] = True
+                clauses.append({"kind": "critical", "text": clause, "mask": crit.copy()})
+            elif (m := _MUST_PASS.search(clause)) or (m := _ALL_OF.search(clause)):
+                mask = matching(m.group(1))
+                if mask.any():
+                    must |= mask
+                    clauses.append({"kind": "must", "text": clause, "mask": mask})
+                else:
+                    clauses.append({"kind": "advisory", "text": clause})
+            else:
+                clauses.append({"kind": "advisory", "text": clause})
+        if threshold is None:
+            # Only subset clauses: the rest of the gate has no pass rate of its own
+            threshold = 0.0 if must.any() else 1.0
+        return cls(gid, keys, text, threshold, crit, must, clauses)
+
+    # ----- evaluation -----
+    def vector(self, decisions: Mapping[str, str]) -> np.ndarray:
+        """Decision codes in column order from an artifact_key -> decision mapping."""
+        return encode([decisions.get(k, "Pending") for k in self.keys])
+
+    def evaluate_batch(self, codes: np.ndarray) -> np.ndarray:
+        """Status codes for an (n, len(keys)) matrix of decision codes."""
+        codes = np.asarray(codes).reshape(-1, len(self.keys))
+        approved = codes == APPROVE
+        rejected = codes == REJECT
+        n_approved = approved.sum(axis=1)
+        reject = ((rejected & (self.critical | self.must)).any(axis=1)
+                  | (rejected.sum(axis=1) > self.max_rejects))
+        approve = ~reject & (n_approved >= self.min_approvals) & (approved | ~self.must).all(axis=1)
+        if not self.keys:
+            approve[:] = False
+        rescope = ~reject & ~approve & (codes == RESCOPE).any(axis=1)
+        return np.select([reject, approve, rescope], [REJECT, APPROVE, RESCOPE], PENDING).astype(np.int8)
+
+    def evaluate(self, decisions: Mapping[str, str]) -> str:
+        return DECISIONS[int(self.evaluate_batch(self.vector(decisions))[0])]
+
+    def explain(self, decisions: Mapping[str, str]) -> List[Dict[str, Any]]:
+        """One {"rule", "ok", "detail"} per clause; ok is None for clauses that are not evaluated."""
+        codes = self.vector(decisions)
+        approved, rejected = codes == APPROVE, codes == REJECT
+        n = len(self.keys)
+        out = []
+        for c in self.clauses:
+            kind = c["kind"]
+            if kind in ("threshold", "legacy"):
+                ok = bool(n) and int(approved.sum()) >= self.min_approvals
+                detail = (f"{int(approved.sum())}/{n} approved, {int(rejected.sum())} rejected "
+                          f"(needs {self.min_approvals}, at most {self.max_rejects} rejected)")
+                if kind == "legacy" and rejected.any():
+                    ok = False
+            elif kind == "critical":
+                failed = [k for k, bad in zip(self.keys, rejected & c["mask"]) if bad]
+                ok = not failed
+                named = [k for k, m in zip(self.keys, c["mask"]) if m]
+                detail = (f"rejected: {', '.join(failed)}" if failed
+                          else f"no rejects among {', '.join(named) or 'no critical checkpoints'}")
+            elif kind == "must":
+                pending = [k for k, m, a in zip(self.keys, c["mask"], approved) if m and not a]
+                ok = not pending
+                detail = f"not yet approved: {', '.join(pending)}" if pending else "all approved"
+            else:
+                ok, detail = None, "not mapped to checkpoints; review manually"
+            out.append({"rule": c["text"], "ok": ok, "detail": detail})
+        return out
+
+class RuleEngine:
+    """GateRule per gate of one CompiledConfig; unknown gates get the legacy rule."""
+
+    def __init__(self, cfg: CompiledConfig):
+        rows = {}
+        for row in cfg.decision_rules.get("rows", ()):
+            rows.setdefault((row.get("Gate") or "").split(":", 1)[0].strip(), row)
+        critical = rulebook(cfg).critical
+        self.rules: Dict[str, GateRule] = {
+            g["gate_id"]: GateRule.compile(g, rows.get(g["gate_id"]), critical) for g in cfg.gates
+        }
+
+    def gate(self, gate_id: str, keys: Sequence[str] = ()) -> GateRule:
+        rule = self.rules.get(gate_id)
+        if rule is None:
+            rule = GateRule(gate_id, keys, clauses=[{"kind": "legacy", "text": "Every checkpoint approved; any Reject rejects"}])
+        return rule
+
+def engine(cfg: Optional[CompiledConfig] = None) -> RuleEngine:
+    """RuleEngine for cfg (default: the loaded config), recompiled only when load_config() recompiles."""
+    cfg = cfg or get_config()
+    eng = _ENGINE["engine"]
+    if eng is not None and _ENGINE["cfg"] is cfg:
+        return eng
+    with _LOCK:
+        if _ENGINE["engine"] is None or _ENGINE["cfg"] is not cfg:
+            _ENGINE["engine"] = RuleEngine(cfg)
+            _ENGINE["cfg"] = cfg
+        return _ENGINE["engine"]
+
+def gate_status(gate_id: str, decisions: Mapping[str, str], cfg: Optional[CompiledConfig] = None) -> str:
+    """Rule-based status of one gate from its artifact_key -> decision mapping."""
+    return engine(cfg).gate(gate_id, list(decisions)).evaluate(decisions)
+
+def evaluate_gates(rows: Sequence[Tuple[str, Mapping[str, str]]], cfg: Optional[CompiledConfig] = None) -> List[str]:
+    """Statuses for many (gate_id, decisions) pairs, batched into one matrix per gate."""
+    eng = engine(cfg)
+    by_gate: Dict[str, List[int]] = {}
+    for i, (gid, _) in enumerate(rows):
+        by_gate.setdefault(gid, []).append(i)
+    out: List[str] = ["Pending"] * len(rows)
+    for gid, idx in by_gate.items():
+        rule = eng.gate(gid, list(rows[idx[0]][1]))
+        matrix = np.empty((len(idx), len(rule.keys)), dtype=np.int8)
+        for r, i in enumerate(idx):
+            d = rows[i][1]
+            matrix[r] = [_CODE.get(d.get(k, "Pending"), PENDING) for k in rule.keys]
+        for i, code in zip(idx, rule.evaluate_batch(matrix)):
+            out[i] = DECISIONS[code]
+    return out
+
+if __name__ == "__main__":
+    from config_loader import load_config
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opts = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    eng = engine(load_config(args[0] if args else "governance_config.json"))
+    for gid, rule in eng.rules.items():
+        print(f"{gid}: {rule.text or '(no rule)'} -> threshold {rule.threshold:.0%}, "
+              f"critical {int(rule.critical.sum())}, must-pass {int(rule.must.sum())} of {len(rule.keys)}")
+        for c in rule.clauses:
+            print(f"    [{c['kind']}] {c['text']}")
+    n = int(opts.get("bench", 100_000))
+    rng = np.random.default_rng(0)
+    started = time.perf_counter()
+    total = 0
+    for rule in eng.rules.values():
+        codes = rng.integers(0, len(DECISIONS), size=(n, len(rule.keys)), dtype=np.int8)
+        t = time.perf_counter()
+        rule.evaluate_batch(codes)
+        total += n
+        print(f"{rule.gate_id}: {n} evaluations in {(time.perf_counter() - t) * 1000:.1f} ms")
+    print(f"{total} gate evaluations in {(time.perf_counter() - started) * 1000:.1f} ms (including matrix setup).")
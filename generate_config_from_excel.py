@@ -1,135 +1,230 @@
-# generate_config_from_excel.py
-import json, re, sys
-import pandas as pd
-
-def norm(s: str) -> str:
-    return (s or "").strip().lower()
-
-def pick_col(cols, target):
-    # exact match after normalize (case/space tolerant)
-    nmap = {norm(c): c for c in cols}
-    t = norm(target)
-    if t in nmap:
-        return nmap[t]
-    # soft fallback: allow minor punctuation differences
-    for k, v in nmap.items():
-        if k.replace(" ", "") == t.replace(" ", ""):
-            return v
-    return None
-
-def slug(s: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "-", (s or "").lower()).strip("-")
-
-def main(xlsx_path: str, out_path: str):
-    xls = pd.ExcelFile(xlsx_path)
-    sheets = xls.sheet_names
-
-    # Roles & Decision Rules
-    roles_sheet = next((s for s in sheets if norm(s).startswith("roles")), None)
-    decision_sheet = next((s for s in sheets if "decision" in norm(s)), None)
-
-    roles = []
-    if roles_sheet:
-        rdf = xls.parse(roles_sheet).fillna("")
-        # try to find "Role" and a responsibilities/description column
-        role_col = pick_col(rdf.columns, "Role")
-        resp_col = None
-        for cand in ["Responsibilities", "Responsibility", "Description", "Notes"]:
-            resp_col = pick_col(rdf.columns, cand)
-            if resp_col:
-                break
-        for _, r in rdf.iterrows():
-            role = str(r.get(role_col, "")).strip() if role_col else ""
-            if role:
-                roles.append({
-                    "role": role,
-                    "permissions": str(r.get(resp_col, "")).strip() if resp_col else ""
-                })
-
-    decision_rules = {}
-    if decision_sheet:
-        ddf = xls.parse(decision_sheet).fillna("")
-        decision_rules = {
-            "columns": [str(c) for c in ddf.columns],
-            "rows": ddf.astype(str).to_dict(orient="records")
-        }
-
-    # Gates: tabs like G#_Name
-    gate_tabs = [s for s in sheets if re.match(r"^G\d+_", s.strip(), flags=re.I)]
-    gates = []
-    for tab in gate_tabs:
-        df = xls.parse(tab).fillna("")
-        cols = list(df.columns)
-
-        # *** STRICT columns as requested ***
-        checkpoint_col = pick_col(cols, "Checkpoint")
-        produced_col   = pick_col(cols, "Artifacts Produced")
-
-        if not produced_col or not checkpoint_col:
-            raise ValueError(
-                f"[{tab}] Missing required columns. "
-                f"Found: {cols}. Need 'Checkpoint' and 'Artifacts Produced'."
-            )
-
-        submitter_col = pick_col(cols, "Submitted By")
-        reviewer_col  = pick_col(cols, "Reviewed By")
-        status_col    = pick_col(cols, "Status")  # optional
-
-        cps = []
-        seen = set()
-        for _, row in df.iterrows():
-            checkpoint_name = str(row.get(checkpoint_col, "")).strip()
-            artifact_name   = str(row.get(produced_col, "")).strip()
-            if not artifact_name and not checkpoint_name:
-                continue  # skip blank
-
-            # Use artifact as the key anchor (same artifact across gates == same key)
-            key_source = artifact_name or checkpoint_name
-            akey = slug(key_source)
-            if (tab, akey) in seen:
-                continue
-            seen.add((tab, akey))
-
-            cps.append({
-                "checkpoint": checkpoint_name,                   # ← from "Checkpoint"
-                "artifact": artifact_name,                       # ← from "Artifacts Produced"
-                "artifact_key": akey,
-                "submitted_by_role": str(row.get(submitter_col, "")).strip() if submitter_col else "",
-                "reviewed_by_role":  str(row.get(reviewer_col,  "")).strip() if reviewer_col  else "",
-                "initial_status":    str(row.get(status_col,    "")).strip() if status_col    else ""
-            })
-
-        gates.append({
-            "gate_id": tab.split("_")[0],                       # e.g., "G0"
-            "gate_name": tab.split("_", 1)[1] if "_" in tab else tab,
-            "checkpoints": cps
-        })
-
-    # sort by G#
-    def gkey(g):
-        m = re.match(r"g(\d+)", g["gate_id"], flags=re.I)
-        return int(m.group(1)) if m else 999
-    gates.sort(key=gkey)
-
-    out = {
-        "source_excel": xlsx_path.split("/")[-1],
-        "roles": roles,
-        "decision_rules": decision_rules,
-        "gates": gates,
-        "column_mapping": {
-            "checkpoint": "Checkpoint",
-            "artifact": "Artifacts Produced",
-            "submitted_by_role": "Submitted By",
-            "reviewed_by_role": "Reviewed By",
-            "initial_status": "Status"
-        }
-    }
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
-    print(f"Wrote {out_path} with {len(gates)} gates.")
-
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python generate_config_from_excel.py <excel_path> <out_json>")
-        sys.exit(1)
-    main(sys.argv[1], sys.argv[2])
+# generate_config_from_excel.py
+import hashlib, json, os, re, sys, zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Sheets are compiled independently and the result of each is cached in
+# <out_json>.cache keyed on a hash of the sheet's own XML with its shared
+# strings inlined, so editing one tab only re-parses that tab. Changed
+# sheets are parsed in a process pool. The written JSON is byte-identical to a
+# full, uncached run.
+
+CACHE_VERSION = 1
+
+_NS = {
+    "m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_SHARED_REF = re.compile(rb'<c\b[^>]*\bt="s"[^>]*>\s*<v>(\d+)</v>')
+
+def norm(s: str) -> str:
+    return (s or "").strip().lower()
+
+def pick_col(cols, target):
+    # exact match after normalize (case/space tolerant)
+    nmap = {norm(c): c for c in cols}
+    t = norm(target)
+    if t in nmap:
+        return nmap[t]
+    # soft fallback: allow minor punctuation differences
+    for k, v in nmap.items():
+        if k.replace(" ", "") == t.replace(" ", ""):
+            return v
+    return None
+
+def slug(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (s or "").lower()).strip("-")
+
+def _text(df: pd.DataFrame, col) -> pd.Series:
+    # str() of each cell, as the row-wise version did; "" when the column is absent
+    if not col:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].astype(object).map(str).str.strip()
+
+# ---- Per-sheet parsers (run in worker processes) ----
+
+def _parse_roles(df: pd.DataFrame):
+    # try to find "Role" and a responsibilities/description column
+    role_col = pick_col(df.columns, "Role")
+    resp_col = None
+    for cand in ["Responsibilities", "Responsibility", "Description", "Notes"]:
+        resp_col = pick_col(df.columns, cand)
+        if resp_col:
+            break
+    roles = pd.DataFrame({"role": _text(df, role_col), "permissions": _text(df, resp_col)})
+    return roles[roles["role"] != ""].to_dict(orient="records")
+
+def _parse_decisions(df: pd.DataFrame):
+    return {
+        "columns": [str(c) for c in df.columns],
+        "rows": df.astype(str).to_dict(orient="records")
+    }
+
+def _parse_gate(df: pd.DataFrame, tab: str):
+    cols = list(df.columns)
+
+    # *** STRICT columns as requested ***
+    checkpoint_col = pick_col(cols, "Checkpoint")
+    produced_col   = pick_col(cols, "Artifacts Produced")
+
+    if not produced_col or not checkpoint_col:
+        raise ValueError(
+            f"[{tab}] Missing required columns. "
+            f"Found: {cols}. Need 'Checkpoint' and 'Artifacts Produced'."
+        )
+
+    checkpoint = _text(df, checkpoint_col)
+    artifact = _text(df, produced_col)
+    # Use artifact as the key anchor (same artifact across gates == same key)
+    key_source = artifact.where(artifact != "", checkpoint)
+    cps = pd.DataFrame({
+        "checkpoint": checkpoint,                                  # ← from "Checkpoint"
+        "artifact": artifact,                                      # ← from "Artifacts Produced"
+        "artifact_key": key_source.str.lower().str.replace(r"[^a-z0-9]+", "-", regex=True).str.strip("-"),
+        "submitted_by_role": _text(df, pick_col(cols, "Submitted By")),
+        "reviewed_by_role": _text(df, pick_col(cols, "Reviewed By")),
+        "initial_status": _text(df, pick_col(cols, "Status")),   # optional
+    })
+    cps = cps[key_source != ""]                                     # skip blank
+    cps = cps[~cps["artifact_key"].duplicated()]                    # first row per key wins
+
+    return {
+        "gate_id": tab.split("_")[0],                       # e.g., "G0"
+        "gate_name": tab.split("_", 1)[1] if "_" in tab else tab,
+        "checkpoints": cps.to_dict(orient="records")
+    }
+
+def _parse_sheet(xlsx_path: str, tab: str, kind: str):
+    df = pd.read_excel(xlsx_path, sheet_name=tab).fillna("")
+    if kind == "roles":
+        return _parse_roles(df)
+    if kind == "decisions":
+        return _parse_decisions(df)
+    return _parse_gate(df, tab)
+
+# ---- Sheet hashing ----
+
+def sheet_hashes(xlsx_path: str, sheets):
+    """
+    {sheet_name: sha256} of each sheet's worksheet XML with the shared strings
+    it references inlined. Empty for workbooks that are not xlsx zips (nothing cached).
+    """
+    if not zipfile.is_zipfile(xlsx_path):
+        return {}
+    with zipfile.ZipFile(xlsx_path) as zf:
+        names = set(zf.namelist())
+        wb = ET.fromstring(zf.read("xl/workbook.xml"))
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {r.get("Id"): r.get("Target") for r in rels.findall("rel:Relationship", _NS)}
+        shared = []
+        if "xl/sharedStrings.xml" in names:
+            for si in ET.fromstring(zf.read("xl/sharedStrings.xml")).findall("m:si", _NS):
+                shared.append("".join(t.text or "" for t in si.iter(f"{{{_NS['m']}}}t")))
+        out = {}
+        for s in wb.findall("m:sheets/m:sheet", _NS):
+            name = s.get("name")
+            target = targets.get(s.get(f"{{{_NS['r']}}}id"), "")
+            part = target.lstrip("/") if target.startswith("/") else "xl/" + target
+            if name not in sheets or part not in names:
+                continue
+            # inline the referenced strings so renumbering the shared table doesn't invalidate the sheet
+            xml = _SHARED_REF.sub(
+                lambda m: m.group(0)[:m.start(1) - m.start(0)] + shared[int(m.group(1))].encode("utf-8") + b"</v>",
+                zf.read(part),
+            )
+            out[name] = hashlib.sha256(xml).hexdigest()
+    return out
+
+def _load_cache(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return cache.get("sheets", {}) if cache.get("version") == CACHE_VERSION else {}
+
+def _save_cache(path: str, sheets):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "sheets": sheets}, f)
+    os.replace(tmp, path)
+
+def main(xlsx_path: str, out_path: str, jobs: int | None = None, use_cache: bool = True):
+    xls = pd.ExcelFile(xlsx_path)
+    sheets = xls.sheet_names
+
+    # Roles & Decision Rules
+    roles_sheet = next((s for s in sheets if norm(s).startswith("roles")), None)
+    decision_sheet = next((s for s in sheets if "decision" in norm(s)), None)
+    # Gates: tabs like G#_Name
+    gate_tabs = [s for s in sheets if re.match(r"^G\d+_", s.strip(), flags=re.I)]
+
+    work = [(s, "gate") for s in gate_tabs]
+    if decision_sheet:
+        work.insert(0, (decision_sheet, "decisions"))
+    if roles_sheet:
+        work.insert(0, (roles_sheet, "roles"))
+
+    cache_path = out_path + ".cache"
+    cached = _load_cache(cache_path) if use_cache else {}
+    hashes = sheet_hashes(xlsx_path, {s for s, _ in work})
+    results, todo = {}, []
+    for tab, kind in work:
+        entry = cached.get(f"{kind}:{tab}")
+        if entry and entry.get("hash") == hashes.get(tab):
+            results[tab, kind] = entry["result"]
+        else:
+            todo.append((tab, kind))
+
+    # Fork/spawn costs more than parsing a single sheet, so only pool when it can pay off
+    jobs = jobs or min(len(todo), os.cpu_count() or 1)
+    if len(todo) > 1 and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [(tab, kind, pool.submit(_parse_sheet, xlsx_path, tab, kind)) for tab, kind in todo]
+            for tab, kind, fut in futures:
+                results[tab, kind] = fut.result()
+    else:
+        for tab, kind in todo:
+            results[tab, kind] = _parse_sheet(xlsx_path, tab, kind)
+
+    roles = results[roles_sheet, "roles"] if roles_sheet else []
+    decision_rules = results[decision_sheet, "decisions"] if decision_sheet else {}
+    gates = [results[tab, "gate"] for tab in gate_tabs]
+
+    # sort by G#
+    def gkey(g):
+        m = re.match(r"g(\d+)", g["gate_id"], flags=re.I)
+        return int(m.group(1)) if m else 999
+    gates.sort(key=gkey)
+
+    out = {
+        "source_excel": xlsx_path.split("/")[-1],
+        "roles": roles,
+        "decision_rules": decision_rules,
+        "gates": gates,
+        "column_mapping": {
+            "checkpoint": "Checkpoint",
+            "artifact": "Artifacts Produced",
+            "submitted_by_role": "Submitted By",
+            "reviewed_by_role": "Reviewed By",
+            "initial_status": "Status"
+        }
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2)
+    if use_cache and hashes:
+        _save_cache(cache_path, {
+            f"{kind}:{tab}": {"hash": hashes[tab], "result": results[tab, kind]}
+            for tab, kind in work if tab in hashes
+        })
+    print(f"Wrote {out_path} with {len(gates)} gates ({len(todo)} of {len(work)} sheets parsed).")
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) < 2:
+        print("Usage: python generate_config_from_excel.py <excel_path> <out_json> [--jobs=N] [--no-cache]")
+        sys.exit(1)
+    jobs = next((int(a.split("=", 1)[1]) for a in sys.argv[1:] if a.startswith("--jobs=")), None)
+    main(args[0], args[1], jobs=jobs, use_cache="--no-cache" not in sys.argv)
@@ -0,0 +1,164 @@
+# policy_index.py
+import json, math, os, re, sys, threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Optional
+
+# BM25 retrieval over policy_notes.txt so prompts carry only the passages that
+# matter for a checkpoint instead of the whole policy. The notes are split
+# into paragraph-aligned chunks of about CHUNK_WORDS words; the chunks are saved
+# to INDEX_PATH together with the sha256 of the notes they came from and are
+# rebuilt only when that hash changes. Pure Python, no extra dependencies.
+
+INDEX_PATH = Path(os.environ.get("FAIRSIGHT_POLICY_INDEX_PATH", "policy_index.json"))
+TOP_K = int(os.environ.get("FAIRSIGHT_POLICY_TOP_K", 4))
+CHUNK_WORDS = 120
+INDEX_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+must should may can all any each per not no into than then their there these those be been being
+""".split())
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the usual ~4 characters per token estimate."""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return math.ceil(len(text) / 4)
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS) -> List[str]:
+    """Paragraphs packed into chunks of up to max_words; longer paragraphs are split on words."""
+    chunks: List[str] = []
+    cur: List[str] = []
+    n = 0
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        words = para.split()
+        if len(words) > max_words:
+            if cur:
+                chunks.append("\n\n".join(cur))
+                cur, n = [], 0
+            for i in range(0, len(words), max_words):
+                chunks.append(" ".join(words[i:i + max_words]))
+            continue
+        if n + len(words) > max_words and cur:
+            chunks.append("\n\n".join(cur))
+            cur, n = [], 0
+        cur.append(para)
+        n += len(words)
+    if cur:
+        chunks.append("\n\n".join(cur))
+    return chunks
+
+class PolicyIndex:
+    def __init__(self, chunks: List[str], version: str = ""):
+        self.version = version
+        self.chunks = chunks
+        self._full_tokens: Optional[int] = None
+        self.tfs = [Counter(tokenize(c)) for c in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.tfs]
+        self.avgdl = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        df: Counter = Counter()
+        for tf in self.tfs:
+            df.update(tf.keys())
+        n = len(chunks)
+        self.idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+
+    @classmethod
+    def build(cls, text: str, version: str = "") -> "PolicyIndex":
+        return cls(chunk_text(text), version)
+
+    def search(self, query: str, k: int = TOP_K) -> List[Tuple[float, int]]:
+        """(score, chunk index) of the k best-scoring chunks, best first; zero scores are dropped."""
+        terms = set(tokenize(query))
+        scored = []
+        for i, tf in enumerate(self.tfs):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.avgdl or 1))
+            s = sum(self.idf[t] * tf[t] * (BM25_K1 + 1) / (tf[t] + norm) for t in terms if t in tf)
+            if s > 0:
+                scored.append((s, i))
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return scored[:k]
+
+    def context(self, query: str, k: int = TOP_K) -> str:
+        """
+        Top-k chunks for query, joined in document order. When no chunk
+        matches, the first k chunks, so the prompt never loses the policy.
+        """
+        if len(self.chunks) <= k:
+            return "\n\n".join(self.chunks)
+        hits = sorted(i for _, i in self.search(query, k)) or range(k)
+        return "\n\n".join(self.chunks[i] for i in hits)
+
+    def full_tokens(self, text: str) -> int:
+        """count_tokens(text) for the notes this index was built from, computed once."""
+        if self._full_tokens is None:
+            self._full_tokens = count_tokens(text)
+        return self._full_tokens
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"format": INDEX_VERSION, "version": self.version, "chunks": self.chunks}
+
+# One index per process, backed by INDEX_PATH; chunking is the only state
+# persisted (term statistics are cheap to recompute from the chunks).
+_LOCK = threading.Lock()
+_INDEX: Dict[str, Optional[PolicyIndex]] = {"index": None}
+
+def get_index(text: str, version: str, path: Path | str | None = None) -> PolicyIndex:
+    """Index for the notes identified by version (their sha256), loading or rebuilding as needed."""
+    idx = _INDEX["index"]
+    if idx is not None and idx.version == version:
+        return idx
+    path = Path(path) if path else INDEX_PATH
+    with _LOCK:
+        idx = _INDEX["index"]
+        if idx is not None and idx.version == version:
+            return idx
+        idx = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("format") == INDEX_VERSION and saved.get("version") == version:
+                idx = PolicyIndex(saved["chunks"], version)
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+        if idx is None:
+            idx = PolicyIndex.build(text, version)
+            if not idx.chunks:
+                _INDEX["index"] = idx  # no notes, nothing worth persisting
+                return idx
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(idx.to_json(), f)
+            os.replace(tmp, path)
+        _INDEX["index"] = idx
+        return idx
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python policy_index.py <policy_notes.txt> <query words...> [--k=N]")
+        sys.exit(1)
+    import hashlib
+    k = next((int(a.split("=", 1)[1]) for a in sys.argv[2:] if a.startswith("--k=")), TOP_K)
+    query = " ".join(a for a in sys.argv[2:] if not a.startswith("--"))
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        notes = f.read()
+    index = get_index(notes, hashlib.sha256(notes.encode("utf-8")).hexdigest())
+    for score, i in index.search(query, k):
+        print(f"--- chunk {i} (score {score:.2f})\n{index.chunks[i]}\n")
+    ctx = index.context(query, k)
+    print(f"{len(index.chunks)} chunks; policy tokens {count_tokens(notes)} -> {count_tokens(ctx)} with top-{k}.")
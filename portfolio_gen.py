@@ -0,0 +1,132 @@
+# portfolio_gen.py
+import os, random, sys, time
+from typing import Dict, Any, List
+
+from config_loader import CompiledConfig, load_config
+from db import PROJECT_STATUSES
+
+# Synthetic portfolios for benchmarks and load tests, shaped by the real gates
+# of governance_config.json. Each project reaches a random current gate; a
+# `fill` fraction of the checkpoints of the gates up to it get an artifact
+# payload of about `payload_bytes` (desc + notes built from the checkpoint's
+# own wording plus filler, most with an evidence link) and a decision. Every
+# touched gate also gets `audit_per_gate` earlier decision revisions, each of
+# which lands in the audit trail like a real edit. Everything is written
+# through the storage API in one transaction, so effective statuses, dashboard
+# aggregates and the audit store are exactly what the app would have built.
+# The same seed always yields the same portfolio (ids and timestamps aside).
+
+ADJECTIVES = ["Adaptive", "Bayesian", "Customer", "Dynamic", "Enterprise", "Fraud", "Generative", "Hybrid",
+              "Intelligent", "Joint", "Knowledge", "Linguistic", "Market", "Neural", "Omni", "Predictive",
+              "Quality", "Risk", "Smart", "Trusted", "Unified", "Vision", "Workforce", "Yield"]
+NOUNS = ["Assistant", "Chatbot", "Classifier", "Copilot", "Detector", "Engine", "Forecaster", "Matcher",
+         "Optimizer", "Pilot", "Platform", "Ranker", "Recommender", "Scorer", "Summarizer", "Triage"]
+FILLER = ("model data review evidence owner metric threshold sample baseline validation approach risk "
+          "mitigation control monitoring stakeholder dataset bias fairness accuracy drift audit sign-off").split()
+# Final decisions of filled checkpoints
+DECISION_WEIGHTS = {"Approve": 0.6, "Pending": 0.2, "ReScope": 0.12, "Reject": 0.08}
+STATUS_WEIGHTS = {"ONGOING": 0.7, "COMPLETED": 0.2, "PENDING": 0.1}
+OWNERS = 50
+
+def _text(rng: random.Random, seed_words: List[str], size: int) -> str:
+    words, n = [], 0
+    while n < size:
+        w = rng.choice(seed_words) if seed_words and rng.random() < 0.3 else rng.choice(FILLER)
+        words.append(w)
+        n += len(w) + 1
+    return " ".join(words)
+
+def _payload(rng: random.Random, cp: Dict[str, Any], size: int) -> Dict[str, str]:
+    seed_words = [w for w in f"{cp.get('checkpoint', '')} {cp.get('artifact', '')}".lower().split() if len(w) > 3]
+    link = f"https://docs.example.com/{cp['artifact_key']}/{rng.randrange(10**6)}" if rng.random() < 0.7 else ""
+    return {"desc": _text(rng, seed_words, size * 3 // 4), "link": link, "notes": _text(rng, seed_words, size // 4)}
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def generate(
+    db,
+    cfg: CompiledConfig,
+    projects: int = 100,
+    fill: float = 0.5,
+    audit_per_gate: int = 2,
+    payload_bytes: int = 400,
+    seed: int = 0,
+) -> List[str]:
+    """Add a synthetic portfolio to db; returns the new project ids."""
+    rng = random.Random(seed)
+    gates = list(cfg.gates)
+    now = time.time()
+    pids = []
+    with db.transaction():
+        for i in range(projects):
+            reached = rng.randrange(len(gates)) if gates else -1
+            created = now - rng.uniform(0, 365) * 86400
+            status = _pick(rng, STATUS_WEIGHTS)
+            if status == "COMPLETED":
+                reached = len(gates) - 1
+            pid = db.create_project({
+                "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i:05d}",
+                "description": "Synthetic project (portfolio_gen)",
+                "owner": f"owner{rng.randrange(OWNERS):02d}",
+                "type": rng.choice(["Prototype", "Production", "Research"]),
+                "start_date": time.strftime("%Y-%m-%d", time.localtime(created)),
+                "status": status if status in PROJECT_STATUSES else "ONGOING",
+                "current_gate_id": gates[reached]["gate_id"] if gates else "",
+                "created_at": created,
+                "updated_at": created + rng.uniform(0, now - created),
+            })
+            pids.append(pid)
+            for gate in gates[:reached + 1]:
+                gid = gate["gate_id"]
+                cps = gate.get("checkpoints", [])
+                filled = [cp for cp in cps if rng.random() < fill]
+                if not filled:
+                    continue
+                for _ in range(audit_per_gate):
+                    cp = rng.choice(cps)
+                    db.save_checkpoint_decision(pid, gid, cp["artifact_key"], _pick(rng, DECISION_WEIGHTS), "synthetic")
+                for cp in filled:
+                    db.save_checkpoint_payload(pid, gid, cp["artifact_key"], _payload(rng, cp, payload_bytes), "synthetic")
+                    db.save_checkpoint_decision(pid, gid, cp["artifact_key"], _pick(rng, DECISION_WEIGHTS), "synthetic")
+    return pids
+
+def generate_dir(
+    path: str,
+    config_path: str = "governance_config.json",
+    backend: str = "json",
+    **params,
+) -> List[str]:
+    """
+    Build a portfolio in directory path (local_db.json + audit_log/, and
+    fairsight.db when backend="sqlite"), the layout the app expects in its
+    working directory. Returns the new project ids.
+    """
+    cfg = load_config(os.path.abspath(config_path))
+    os.makedirs(path, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        from db import DB
+        pids = generate(DB(), cfg, **params)
+        if backend == "sqlite":
+            from sqlite_db import migrate_from_json
+            migrate_from_json("local_db.json", "fairsight.db")
+        return pids
+    finally:
+        os.chdir(cwd)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python portfolio_gen.py <dir> [--projects=N] [--fill=F] [--audit=N] [--payload=BYTES] "
+              "[--seed=S] [--sqlite]")
+        sys.exit(1)
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[2:] if a.startswith("--"))
+    started = time.perf_counter()
+    pids = generate_dir(
+        sys.argv[1], backend="sqlite" if "sqlite" in opts else "json",
+        projects=int(opts.get("projects", 100)), fill=float(opts.get("fill", 0.5)),
+        audit_per_gate=int(opts.get("audit", 2)), payload_bytes=int(opts.get("payload", 400)),
+        seed=int(opts.get("seed", 0)),
+    )
+    print(f"Generated {len(pids)} projects in {sys.argv[1]} in {time.perf_counter() - started:.1f}s.")
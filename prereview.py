@@ -0,0 +1,155 @@
+# prereview.py
+import importlib.util, os, random, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+from ai import suggest_for_checkpoint, suggestion_record
+
+# Gate- and project-wide AI pre-review. Every checkpoint is sent through
+# ai.suggest_for_checkpoint on a bounded thread pool with triage, so only the
+# checkpoints the heuristic scorer finds borderline reach the model. Real API
+# calls pass a shared token bucket first, retryable API errors are retried
+# with jittered exponential backoff, and each suggestion is saved with
+# db.save_ai_suggestion as soon as it completes. A checkpoint the model cannot
+# answer is reported as an error (see ai.CircuitOpenError). Point Settings ->
+# base URL at any OpenAI-compatible server (including a local fake) to
+# exercise it without the real API.
+
+CONCURRENCY = int(os.environ.get("FAIRSIGHT_AI_CONCURRENCY", 4))
+RATE_PER_SEC = float(os.environ.get("FAIRSIGHT_AI_RATE", 2.0))
+BURST = int(os.environ.get("FAIRSIGHT_AI_BURST", 4))
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# openai takes ~0.5 s to import: its retryable error types are only looked up
+# once a call has failed, like ai.AIService.client imports it on first use.
+_HAS_OPENAI = importlib.util.find_spec("openai") is not None
+_RETRYABLE: Dict[str, Optional[Tuple[type, ...]]] = {"errors": None}
+
+def _retryable() -> Tuple[type, ...]:
+    if _RETRYABLE["errors"] is None:
+        errors: Tuple[type, ...] = ()
+        if _HAS_OPENAI:
+            try:
+                import openai
+                errors = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+            except Exception:
+                pass  # a broken install: nothing from it can be raised either
+        _RETRYABLE["errors"] = errors
+    return _RETRYABLE["errors"]
+
+class TokenBucket:
+    """Blocking token bucket: acquire() waits until a token is available."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def _with_retry(fn: Callable[[], Dict[str, Any]], attempts: int = MAX_ATTEMPTS) -> Dict[str, Any]:
+    for attempt in range(1, attempts + 1):
+        try:
+            res = fn()
+            res["attempts"] = attempt
+            return res
+        except Exception as e:
+            if attempt == attempts or not isinstance(e, _retryable()):
+                raise
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+def _tasks(db, pid: str, gates: List[Dict[str, Any]]):
+    for gate in gates:
+        for cp in gate.get("checkpoints", ()):
+            payload = db.get_artifact_payload(pid, cp["artifact_key"]) or {}
+            yield gate, cp, payload
+
+def prereview(
+    db,
+    pid: str,
+    gates: List[Dict[str, Any]],
+    user: str,
+    concurrency: int = CONCURRENCY,
+    rate: float = RATE_PER_SEC,
+    burst: int = BURST,
+    on_result: Optional[Callable[[Dict[str, Any], int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Pre-review every checkpoint of the given gates for one project. Results
+    are stored as they complete; on_result(result, done, total) is called from
+    the calling thread after each one (safe for Streamlit widgets). Returns the
+    results in completion order; failed checkpoints carry an "error" instead
+    of a suggestion.
+    """
+    project = db.get_project(pid)
+    if project is None:
+        return []
+    bucket = TokenBucket(rate, burst)
+    tasks = list(_tasks(db, pid, gates))
+
+    def run(gate, cp, payload):
+        return _with_retry(lambda: suggest_for_checkpoint(
+            project, gate, cp, has_artifact=bool(payload), payload=payload,
+            before_call=bucket.acquire, max_retries=0, fallback=False, triage=True,
+        ))
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="prereview") as pool:
+        futures = {pool.submit(run, gate, cp, payload): (gate, cp, payload) for gate, cp, payload in tasks}
+        for fut in as_completed(futures):
+            gate, cp, payload = futures[fut]
+            out = {"gate_id": gate["gate_id"], "artifact_key": cp["artifact_key"]}
+            try:
+                res = fut.result()
+            except Exception as e:
+                out["error"] = f"{type(e).__name__}: {e}"
+            else:
+                suggestion = suggestion_record(res, bool(payload), user)
+                db.save_ai_suggestion(pid, gate["gate_id"], cp["artifact_key"], suggestion)
+                out.update(suggestion, latency_ms=res["latency_ms"], attempts=res["attempts"])
+            results.append(out)
+            if on_result is not None:
+                on_result(out, len(results), len(tasks))
+    return results
+
+def prereview_gate(db, pid: str, gate: Dict[str, Any], user: str, **kw) -> List[Dict[str, Any]]:
+    return prereview(db, pid, [gate], user, **kw)
+
+def prereview_project(db, pid: str, gates: List[Dict[str, Any]], user: str, **kw) -> List[Dict[str, Any]]:
+    return prereview(db, pid, list(gates), user, **kw)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python prereview.py <project_id> [gate_id] [--concurrency=N] [--rate=R]")
+        sys.exit(1)
+    from config_loader import load_config
+    from db import open_db
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opts = dict(a[2:].split("=", 1) for a in sys.argv[1:] if a.startswith("--") and "=" in a)
+    cfg = load_config("governance_config.json")
+    gates = [cfg.gate(args[1])] if len(args) > 1 else list(cfg.gates)
+    started = time.perf_counter()
+    res = prereview(
+        open_db(), args[0], gates, "cli",
+        concurrency=int(opts.get("concurrency", CONCURRENCY)), rate=float(opts.get("rate", RATE_PER_SEC)),
+        on_result=lambda r, done, total: print(
+            f"[{done}/{total}] {r['gate_id']}/{r['artifact_key']}: {r.get('decision') or r.get('error')}"
+        ),
+    )
+    failed = sum(1 for r in res if "error" in r)
+    print(f"Pre-reviewed {len(res) - failed}/{len(res)} checkpoints in {time.perf_counter() - started:.1f}s.")
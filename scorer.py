@@ -0,0 +1,265 @@
+# scorer.py
+import re, sys, threading, time
+from typing import Dict, Any, List, Tuple, Optional
+
+import numpy as np
+
+from config_loader import CompiledConfig, get_config
+from policy_index import tokenize
+
+# Offline artifact-completeness scorer: a first pass that runs in microseconds
+# so only borderline checkpoints need the LLM. An artifact payload (desc, link,
+# notes) is scored on length, an evidence link, how many of the checkpoint's
+# own keywords it mentions and red-flag words (TBD, missing, ...). A mention of
+# one of the gate's Critical Blockers from decision_rules makes it borderline
+# and caps the suggestion at ReScope: a phrase match cannot tell "No consent"
+# from "No consent issues were found", so only a reviewer or the LLM may
+# suggest Reject. Mentions with a negation in the NEGATION_WORDS words before
+# them ("not a prohibited use case") do not count. The same features are
+# computed with pandas string ops over all checkpoints of all projects by
+# score_portfolio().
+
+APPROVE_AT = 0.75
+RESCOPE_AT = 0.35
+DESC_WORDS = 40   # description length that earns the full length score
+NOTES_WORDS = 20
+STEM = 6          # keyword prefix length, so "documented" matches "documentation"
+NEGATION_WORDS = 4  # words before a blocker mention searched for a negation
+
+# Feature weights; red flags subtract up to two occurrences
+WEIGHTS = {"desc": 0.35, "notes": 0.15, "link": 0.25, "keywords": 0.25, "red_flag": 0.15}
+
+_LINK = re.compile(r"^\s*https?://[^\s/]+\.[^\s]+", re.I)
+_RED_FLAGS = r"\b(?:tbd|todo|wip|draft|pending|missing|incomplete|placeholder|not (?:yet )?(?:done|started|available|configured|provided))\b"
+_RED_FLAG = re.compile(_RED_FLAGS, re.I)
+_ACRONYM = re.compile(r"\b[A-Z]{3,}\b")
+_NEGATION = re.compile(r"\b(?:no|not|non|never|none|without|free\s+of|absence\s+of|rather\s+than)\b|n't\b", re.I)
+# Blocker words too generic to mark a checkpoint as guarding that blocker
+_GENERIC = frozenset({"data", "missin", "report", "fail", "thresh", "plan", "incide", "ignore"})
+
+_LOCK = threading.Lock()
+_RULEBOOK: Dict[str, Any] = {"cfg": None, "rules": None}
+
+def keyword_stems(text: str) -> List[str]:
+    words = [w for w in tokenize(text) if len(w) >= 4 and not w.isdigit()]
+    words += [a.lower() for a in _ACRONYM.findall(text)]
+    return sorted({w[:STEM] for w in words})
+
+def _gate_prefix(label: str) -> str:
+    return (label or "").split(":", 1)[0].strip()
+
+class Rulebook:
+    """
+    Precompiled regexes for one CompiledConfig: per checkpoint its keyword
+    stems and whether it guards a Critical Blocker, per gate one pattern
+    matching any of its blocker phrases.
+    """
+
+    def __init__(self, cfg: CompiledConfig):
+        blockers: Dict[str, List[str]] = {}
+        for row in cfg.decision_rules.get("rows", ()):
+            phrases = [b.strip() for b in (row.get("Critical Blockers") or "").split(";") if b.strip()]
+            blockers.setdefault(_gate_prefix(row.get("Gate", "")), []).extend(phrases)
+
+        self.blocker_re: Dict[str, Optional[re.Pattern]] = {}
+        self.negated_re: Dict[str, Optional[re.Pattern]] = {}
+        self.keywords: Dict[Tuple[str, str], Tuple[re.Pattern, ...]] = {}
+        self.critical: Dict[Tuple[str, str], bool] = {}
+        for g in cfg.gates:
+            gid = g["gate_id"]
+            phrases = blockers.get(gid, [])
+            alternation = "|".join(r"\b" + r"\s+".join(map(re.escape, p.split())) for p in phrases)
+            self.blocker_re[gid] = re.compile(alternation, re.I) if phrases else None
+            # A negation, at most NEGATION_WORDS - 1 words, then a blocker: the
+            # mentions blocker_hit skips. re only has fixed-width lookbehinds, so
+            # the window is matched forwards and the negated mentions blanked out.
+            self.negated_re[gid] = re.compile(
+                rf"(?:{_NEGATION.pattern})\S*(?:\s+\S+){{0,{NEGATION_WORDS - 1}}}?\s+(?:{alternation})", re.I
+            ) if phrases else None
+            blocker_stems = set(keyword_stems(" ".join(phrases))) - _GENERIC
+            for cp in g.get("checkpoints", ()):
+                key = (gid, cp.get("artifact_key", ""))
+                stems = keyword_stems(f"{cp.get('checkpoint', '')} {cp.get('artifact', '')}")
+                self.keywords[key] = tuple(re.compile(r"\b" + re.escape(s), re.I) for s in stems)
+                self.critical[key] = bool(blocker_stems.intersection(stems))
+
+    def blockers(self, gate_id: str) -> Optional[re.Pattern]:
+        return self.blocker_re.get(gate_id)
+
+    def blocker_hit(self, gate_id: str, text: str) -> Optional[re.Match]:
+        """First mention of one of the gate's blockers that is not negated just before it."""
+        pattern = self.blocker_re.get(gate_id)
+        if pattern is None or not pattern.search(text):
+            return None
+        return pattern.search(self.negated_re[gate_id].sub(" ", text))
+
+def rulebook(cfg: Optional[CompiledConfig] = None) -> Rulebook:
+    """Rulebook for cfg (default: the loaded config), rebuilt only when load_config() recompiles."""
+    cfg = cfg or get_config()
+    rules = _RULEBOOK["rules"]
+    if rules is not None and _RULEBOOK["cfg"] is cfg:
+        return rules
+    with _LOCK:
+        if _RULEBOOK["rules"] is None or _RULEBOOK["cfg"] is not cfg:
+            _RULEBOOK["rules"] = Rulebook(cfg)
+            _RULEBOOK["cfg"] = cfg
+        return _RULEBOOK["rules"]
+
+def _combine(desc_words, notes_words, has_link, kw_ratio, red_flags, blocker, critical, has_payload):
+    """Score and decision arrays from feature arrays (shared by the single and batch paths)."""
+    w = WEIGHTS
+    score = (w["desc"] * np.minimum(desc_words / DESC_WORDS, 1.0)
+             + w["notes"] * np.minimum(notes_words / NOTES_WORDS, 1.0)
+             + w["link"] * has_link
+             + w["keywords"] * kw_ratio
+             - w["red_flag"] * np.minimum(red_flags, 2))
+    score = np.where(has_payload, np.clip(score, 0.0, 1.0), 0.0)
+    may_approve = has_link | ~critical  # a critical checkpoint needs linked evidence
+    confident_approve = (score >= APPROVE_AT) & may_approve
+    borderline = has_payload & (blocker | ((score >= RESCOPE_AT) & ~confident_approve))
+    # Never Reject: a blocker mention only holds the suggestion at ReScope for review
+    decision = np.select(
+        [~has_payload | blocker, confident_approve, (score >= (APPROVE_AT + RESCOPE_AT) / 2) & may_approve],
+        ["ReScope", "Approve", "Approve"],
+        "ReScope",
+    )
+    return score, decision, borderline
+
+def score_checkpoint(gate_id: str, checkpoint: Dict[str, Any], payload: Optional[dict],
+                     cfg: Optional[CompiledConfig] = None) -> Dict[str, Any]:
+    """
+    {"score", "decision", "borderline", "critical", "blocker", "reasons"} for
+    one checkpoint. Never Approve without a payload and never Reject; a
+    mentioned (not negated) Critical Blocker suggests ReScope and is always
+    borderline.
+    """
+    rules = rulebook(cfg)
+    key = (gate_id, checkpoint.get("artifact_key", ""))
+    payload = payload or {}
+    desc, link, notes = (str(payload.get(k) or "") for k in ("desc", "link", "notes"))
+    text = f"{desc} {notes}"
+    keywords = rules.keywords.get(key, ())
+    kw_hits = sum(1 for k in keywords if k.search(text))
+    blocker_hit = rules.blocker_hit(gate_id, text)
+    red_flags = len(_RED_FLAG.findall(text))
+    critical = rules.critical.get(key, False)
+    has_link = bool(_LINK.match(link))
+    has_payload = bool(payload)
+
+    score, decision, borderline = _combine(
+        np.array([len(desc.split())]), np.array([len(notes.split())]), np.array([has_link]),
+        np.array([kw_hits / len(keywords) if keywords else 0.0]), np.array([red_flags]),
+        np.array([blocker_hit is not None]), np.array([critical]), np.array([has_payload]),
+    )
+    reasons = []
+    if blocker_hit is not None:
+        reasons.append(f"Mentions critical blocker \"{blocker_hit.group(0)}\"; needs a reviewer's judgement.")
+    if not has_payload:
+        reasons.append("Required artifact is missing; evidence not provided.")
+    else:
+        reasons.append(f"Description has {len(desc.split())} words"
+                       + (f" and notes {len(notes.split())}." if notes.strip() else "; no notes."))
+        reasons.append("Evidence link provided." if has_link else "No evidence link provided.")
+        if keywords:
+            reasons.append(f"Mentions {kw_hits} of {len(keywords)} checkpoint keywords.")
+        if red_flags:
+            reasons.append(f"{red_flags} red-flag term(s) such as TBD, draft or missing.")
+        if critical and not has_link:
+            reasons.append("Checkpoint guards a critical blocker and needs linked evidence.")
+    return {"score": round(float(score[0]), 3), "decision": str(decision[0]),
+            "borderline": bool(borderline[0]), "critical": critical, "blocker": blocker_hit is not None,
+            "reasons": reasons}
+
+def heuristic_suggestion(scored: Dict[str, Any]) -> str:
+    """score_checkpoint() result in the same markdown shape as an AI suggestion."""
+    rationale = "\n".join(f"  - {r}" for r in scored["reasons"][:3])
+    if scored["decision"] == "Approve":
+        nxt = "Confirm data lineage and bias checks are attached."
+    elif scored.get("blocker"):
+        nxt = "Confirm whether the critical blocker applies; if it does, attach evidence of the fix."
+    else:
+        nxt = "Provide the missing artifact details, an evidence link and traceability notes."
+    return (f"- **Suggested decision:** {scored['decision']}\n"
+            f"- **Rationale:** (heuristic score {scored['score']:.2f})\n{rationale}\n"
+            f"- **Evidence to verify next**: {nxt}")
+
+def _payload_of(p: Dict[str, Any], gate_id: str, akey: str) -> dict:
+    shared = p.get("artifact_payloads", {}).get(akey)
+    if shared is not None:
+        return shared.get("payload") or {}
+    cp = p.get("gates", {}).get(gate_id, {}).get("checkpoints", {}).get(akey, {})
+    return cp.get("payload") or {}
+
+def score_portfolio(projects, cfg: Optional[CompiledConfig] = None) -> "pd.DataFrame":
+    """
+    One row per (project, configured checkpoint) with the features, score,
+    decision and borderline flag. Feature extraction and scoring are
+    vectorized over the whole portfolio.
+    """
+    import pandas as pd  # only the portfolio pass needs it; keeps Home/gate_rules light
+    cfg = cfg or get_config()
+    rules = rulebook(cfg)
+    cols: Dict[str, list] = {k: [] for k in ["pid", "gate_id", "artifact_key", "decision_made",
+                                             "has_payload", "desc", "link", "notes"]}
+    for p in projects:
+        for g in cfg.gates:
+            gid = g["gate_id"]
+            decided = p.get("gates", {}).get(gid, {}).get("checkpoints", {})
+            for cp in g.get("checkpoints", ()):
+                akey = cp.get("artifact_key", "")
+                payload = _payload_of(p, gid, akey)
+                cols["pid"].append(p["id"])
+                cols["gate_id"].append(gid)
+                cols["artifact_key"].append(akey)
+                cols["decision_made"].append(decided.get(akey, {}).get("decision", "Pending"))
+                cols["has_payload"].append(bool(payload))
+                for k in ("desc", "link", "notes"):
+                    cols[k].append(str(payload.get(k) or ""))
+    df = pd.DataFrame(cols)
+    if df.empty:
+        return df.assign(score=pd.Series(dtype="float64"), decision=pd.Series(dtype="object"),
+                         borderline=pd.Series(dtype="bool"))
+
+    text = df["desc"] + " " + df["notes"]
+    desc_words = df["desc"].str.count(r"\S+").to_numpy()
+    notes_words = df["notes"].str.count(r"\S+").to_numpy()
+    has_link = df["link"].str.match(_LINK).to_numpy(dtype=bool)
+    red_flags = text.str.count(_RED_FLAG).to_numpy()
+    kw_ratio = np.zeros(len(df))
+    blocker = np.zeros(len(df), dtype=bool)
+    critical = np.zeros(len(df), dtype=bool)
+    # Each checkpoint/gate has its own patterns: one string op per pattern over its rows
+    for (gid, akey), idx in df.groupby(["gate_id", "artifact_key"], sort=False).indices.items():
+        sub = text.iloc[idx]
+        keywords = rules.keywords.get((gid, akey), ())
+        if keywords:
+            kw_ratio[idx] = sum(sub.str.contains(k).to_numpy(dtype=int) for k in keywords) / len(keywords)
+        critical[idx] = rules.critical.get((gid, akey), False)
+    for gid, idx in df.groupby("gate_id", sort=False).indices.items():
+        pattern = rules.blockers(gid)
+        if pattern is None:
+            continue
+        # Few texts mention a blocker at all; only those need the negated mentions blanked out
+        mentioned = idx[text.iloc[idx].str.contains(pattern).to_numpy(dtype=bool)]
+        kept = text.iloc[mentioned].str.replace(rules.negated_re[gid], " ", regex=True)
+        blocker[mentioned] = kept.str.contains(pattern).to_numpy(dtype=bool)
+
+    score, decision, borderline = _combine(desc_words, notes_words, has_link, kw_ratio, red_flags,
+                                           blocker, critical, df["has_payload"].to_numpy(dtype=bool))
+    return df.drop(columns=["desc", "link", "notes"]).assign(
+        desc_words=desc_words, notes_words=notes_words, has_link=has_link, keyword_ratio=kw_ratio,
+        red_flags=red_flags, blocker=blocker, critical=critical,
+        score=score.round(3), decision=decision, borderline=borderline,
+    )
+
+if __name__ == "__main__":
+    from config_loader import load_config
+    from db import open_db
+    cfg = load_config(sys.argv[1] if len(sys.argv) > 1 else "governance_config.json")
+    projects = open_db().list_projects()
+    started = time.perf_counter()
+    df = score_portfolio(projects, cfg)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(df.groupby(["decision", "borderline"]).size().to_string())
+    print(f"Scored {len(df)} checkpoints across {len(projects)} projects in {elapsed:.1f} ms; "
+          f"{int(df['borderline'].sum()) if len(df) else 0} borderline need the LLM.")
@@ -0,0 +1,688 @@
+# sqlite_db.py
+import json, time, os, sys, base64, sqlite3, threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from audit_store import AuditStore, AUDIT_DIR
+from tracing import traced
+from db import (DEFAULT_SETTINGS, GATE_STATUSES, PROJECT_STATUSES, QUERY_SORTS, new_project_id, apply_op,
+                effective_status, freeze, load_document, query_filters, rules_digest)
+
+# Drop-in replacement for db.DB backed by SQLite. Projects, gate states,
+# checkpoints and audit events live in their own tables so every mutation
+# touches only the rows it changes. Select it with FAIRSIGHT_DB=sqlite
+# (see db.open_db) after running the one-shot migrator below. As in the JSON
+# store, gate_states.effective_status is refreshed in the same transaction as
+# the decision or override that changes it and is indexed by (gate_id, status).
+# Reads return the same read-only views as the JSON store (db.freeze); use
+# db.thaw for a mutable copy.
+
+SQLITE_PATH = Path(os.environ.get("FAIRSIGHT_SQLITE_PATH", "fairsight.db"))
+
+# Project columns promoted out of the JSON document so they can be indexed.
+PROJECT_COLUMNS = ["name", "status", "owner", "current_gate_id", "created_at", "updated_at"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    status TEXT,
+    owner TEXT,
+    current_gate_id TEXT,
+    created_at REAL,
+    updated_at REAL,
+    doc TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS gate_states (
+    pid TEXT NOT NULL,
+    gate_id TEXT NOT NULL,
+    gate_status TEXT NOT NULL DEFAULT 'Pending',
+    effective_status TEXT NOT NULL DEFAULT 'Pending',
+    overridden INTEGER NOT NULL DEFAULT 0,
+    override_by TEXT,
+    override_reason TEXT,
+    PRIMARY KEY (pid, gate_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    pid TEXT NOT NULL,
+    gate_id TEXT NOT NULL,
+    artifact_key TEXT NOT NULL,
+    decision TEXT,
+    decided_by TEXT,
+    decided_at REAL,
+    payload TEXT,
+    updated_by TEXT,
+    updated_at REAL,
+    PRIMARY KEY (pid, gate_id, artifact_key)
+);
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid TEXT NOT NULL,
+    gate_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    who TEXT,
+    action TEXT,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    pid TEXT NOT NULL,
+    artifact_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_by TEXT,
+    updated_at REAL,
+    PRIMARY KEY (pid, artifact_key)
+);
+CREATE TABLE IF NOT EXISTS ai_suggestions (
+    pid TEXT NOT NULL,
+    gate_id TEXT NOT NULL,
+    artifact_key TEXT NOT NULL,
+    suggestion TEXT NOT NULL,
+    created_at REAL,
+    PRIMARY KEY (pid, gate_id, artifact_key)
+);
+CREATE INDEX IF NOT EXISTS idx_gate_states_gate ON gate_states (gate_id, gate_status);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_artifact ON checkpoints (pid, artifact_key);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_gate ON checkpoints (gate_id, artifact_key);
+CREATE INDEX IF NOT EXISTS idx_audit_gate ON audit_events (pid, gate_id, ts);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects (name COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects (status, name COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects (owner, name COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_projects_gate ON projects (current_gate_id, name COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_projects_updated ON projects (updated_at);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', '0');
+"""
+
+# Materialized CXO dashboard aggregates, maintained by triggers in the same
+# transaction as the write that changes them.
+AGGREGATES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agg_counts (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, key)
+);
+CREATE TABLE IF NOT EXISTS project_latest (
+    pid TEXT PRIMARY KEY,
+    gate_id TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_gate_effective_insert AFTER INSERT ON gate_states BEGIN
+    INSERT INTO agg_counts (kind, key, n) VALUES ('gate_status', NEW.effective_status, 1)
+        ON CONFLICT (kind, key) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_gate_effective AFTER UPDATE OF effective_status ON gate_states
+WHEN OLD.effective_status IS NOT NEW.effective_status BEGIN
+    UPDATE agg_counts SET n = n - 1 WHERE kind = 'gate_status' AND key = OLD.effective_status;
+    INSERT INTO agg_counts (kind, key, n) VALUES ('gate_status', NEW.effective_status, 1)
+        ON CONFLICT (kind, key) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_gate_effective_delete AFTER DELETE ON gate_states BEGIN
+    UPDATE agg_counts SET n = n - 1 WHERE kind = 'gate_status' AND key = OLD.effective_status;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_project_insert AFTER INSERT ON projects BEGIN
+    INSERT INTO agg_counts (kind, key, n) VALUES ('project_status', UPPER(COALESCE(NULLIF(NEW.status, ''), 'ONGOING')), 1)
+        ON CONFLICT (kind, key) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_project_status AFTER UPDATE OF status ON projects
+WHEN OLD.status IS NOT NEW.status BEGIN
+    UPDATE agg_counts SET n = n - 1
+        WHERE kind = 'project_status' AND key = UPPER(COALESCE(NULLIF(OLD.status, ''), 'ONGOING'));
+    INSERT INTO agg_counts (kind, key, n) VALUES ('project_status', UPPER(COALESCE(NULLIF(NEW.status, ''), 'ONGOING')), 1)
+        ON CONFLICT (kind, key) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_project_delete AFTER DELETE ON projects BEGIN
+    UPDATE agg_counts SET n = n - 1
+        WHERE kind = 'project_status' AND key = UPPER(COALESCE(NULLIF(OLD.status, ''), 'ONGOING'));
+END;
+CREATE TRIGGER IF NOT EXISTS trg_audit_latest AFTER INSERT ON audit_events BEGIN
+    INSERT INTO project_latest (pid, gate_id, ts) VALUES (NEW.pid, NEW.gate_id, NEW.ts)
+        ON CONFLICT (pid) DO UPDATE SET gate_id = excluded.gate_id, ts = excluded.ts
+        WHERE excluded.ts >= project_latest.ts;
+END;
+"""
+
+# Databases created before effective_status counted the stored gate_status.
+EFFECTIVE_MIGRATION = """
+DROP TRIGGER IF EXISTS trg_gate_insert;
+DROP TRIGGER IF EXISTS trg_gate_status;
+DROP TRIGGER IF EXISTS trg_gate_delete;
+"""
+EFFECTIVE_INDEX = "CREATE INDEX IF NOT EXISTS idx_gate_states_effective ON gate_states (gate_id, effective_status)"
+
+# Full recompute used to seed and verify the materialized tables.
+FRESH_COUNTS = """
+SELECT 'gate_status' AS kind, effective_status AS key, COUNT(*) AS n FROM gate_states GROUP BY effective_status
+UNION ALL
+SELECT 'project_status', UPPER(COALESCE(NULLIF(status, ''), 'ONGOING')), COUNT(*) FROM projects
+GROUP BY UPPER(COALESCE(NULLIF(status, ''), 'ONGOING'))
+"""
+FRESH_LATEST = """
+SELECT pid, gate_id, MAX(ts) AS ts FROM audit_events GROUP BY pid
+"""
+
+class DB:
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path else SQLITE_PATH
+        self._local = threading.local()
+        self._rules = None
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA)
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(gate_states)")}
+            if "effective_status" not in columns:
+                conn.execute("ALTER TABLE gate_states ADD COLUMN effective_status TEXT NOT NULL DEFAULT 'Pending'")
+                conn.executescript(EFFECTIVE_MIGRATION)
+                conn.execute("DELETE FROM meta WHERE key IN ('aggregates', 'rules')")
+            conn.execute(EFFECTIVE_INDEX)
+            conn.executescript(AGGREGATES_SCHEMA)
+            for k, v in DEFAULT_SETTINGS.items():
+                conn.execute("INSERT OR IGNORE INTO settings (key, value) VALUES (?, ?)", (k, v))
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'aggregates'").fetchone() is None:
+            # First open since aggregates were introduced: seed them from the data.
+            self.rebuild_aggregates()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('aggregates', '1')")
+        self._sync_rules()
+
+    def _sync_rules(self):
+        """Re-evaluate every gate's effective status if the decision rules changed since it was stored."""
+        digest = rules_digest()
+        if digest == self._rules:
+            return
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if row is None or row["value"] != digest:
+            self._refresh_effective()
+            with self._write() as conn:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('rules', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                    (digest,),
+                )
+        self._rules = digest
+
+    def _conn(self) -> sqlite3.Connection:
+        # Streamlit serves sessions from several threads; one connection each.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """One atomic write transaction; also bumps the generation counter."""
+        conn = self._conn()
+        if getattr(self._local, "in_tx", False):
+            yield conn  # joined: the outer transaction commits
+            return
+        with conn:
+            conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+            yield conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: save_* calls inside the block run in one SQLite
+        transaction and commit together on exit. Nested blocks join the
+        outermost one; an exception rolls every change back.
+        """
+        if getattr(self._local, "in_tx", False):
+            yield self
+            return
+        with self._write():
+            self._local.in_tx = True
+            try:
+                yield self
+            finally:
+                self._local.in_tx = False
+
+    def generation(self) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row["value"]) if row else 0
+
+    # ---- Settings ----
+    def get_settings(self) -> Dict[str, Any]:
+        rows = self._conn().execute("SELECT key, value FROM settings").fetchall()
+        return freeze({**DEFAULT_SETTINGS, **{r["key"]: r["value"] for r in rows}})
+
+    def _set_setting(self, key: str, value: str):
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def save_openapi_key(self, raw_key: str, model: str | None = None):
+        obf = base64.b64encode(raw_key.encode("utf-8")).decode("utf-8") if raw_key else ""
+        self._set_setting("openapi_key_obf", obf)
+        if model:
+            self._set_setting("openapi_model", model)
+
+    def clear_openapi_key(self):
+        self._set_setting("openapi_key_obf", "")
+
+    def save_openapi_base_url(self, url: str):
+        self._set_setting("openapi_base_url", url)
+
+    def get_openapi_key(self) -> str:
+        obf = self.get_settings().get("openapi_key_obf","")
+        if not obf:
+            return ""
+        try:
+            return base64.b64decode(obf.encode("utf-8")).decode("utf-8")
+        except Exception:
+            return ""
+
+    # ---- Row <-> document helpers ----
+    @staticmethod
+    def _split_project(proj: Dict[str, Any]):
+        doc = {k: v for k, v in proj.items()
+               if k not in PROJECT_COLUMNS and k not in ("id", "gates", "artifact_payloads", "ai_suggestions")}
+        return [proj.get(c) for c in PROJECT_COLUMNS], json.dumps(doc)
+
+    def _insert_project(self, conn: sqlite3.Connection, proj: Dict[str, Any]):
+        cols, doc = self._split_project(proj)
+        conn.execute(
+            f"INSERT INTO projects (id, {', '.join(PROJECT_COLUMNS)}, doc) "
+            f"VALUES (?, {', '.join('?' for _ in PROJECT_COLUMNS)}, ?) ON CONFLICT (id) DO UPDATE SET "
+            f"{', '.join(f'{c} = excluded.{c}' for c in PROJECT_COLUMNS)}, doc = excluded.doc",
+            [proj["id"], *cols, doc],
+        )
+
+    @staticmethod
+    def _project_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        p = json.loads(row["doc"] or "{}")
+        for c in PROJECT_COLUMNS:
+            if row[c] is not None:
+                p[c] = row[c]
+        p["id"] = row["id"]
+        p["gates"] = {}
+        return p
+
+    def _attach_gates(self, projects: Dict[str, Dict[str, Any]], where: str = "", args=()):
+        conn = self._conn()
+        for r in conn.execute(f"SELECT * FROM gate_states {where}", args):
+            p = projects.get(r["pid"])
+            if p is None:
+                continue
+            gate = {"checkpoints": {}, "gate_status": r["gate_status"], "effective_status": r["effective_status"],
+                    "audit_summary": {"count": 0, "last_ts": 0}}
+            if r["overridden"]:
+                gate.update(overridden=True, override_by=r["override_by"], override_reason=r["override_reason"])
+            p["gates"][r["gate_id"]] = gate
+        for r in conn.execute(f"SELECT * FROM checkpoints {where}", args):
+            gate = projects.get(r["pid"], {}).get("gates", {}).get(r["gate_id"])
+            if gate is None:
+                continue
+            cp = {}
+            if r["payload"] is not None:
+                cp.update(payload=json.loads(r["payload"]), updated_by=r["updated_by"], updated_at=r["updated_at"])
+            elif r["updated_at"] is not None:
+                cp.update(payload_ref=r["artifact_key"], updated_by=r["updated_by"], updated_at=r["updated_at"])
+            if r["decision"] is not None:
+                cp.update(decision=r["decision"], decided_by=r["decided_by"], decided_at=r["decided_at"])
+            gate["checkpoints"][r["artifact_key"]] = cp
+        for r in conn.execute(f"SELECT * FROM project_latest {where}", args):
+            p = projects.get(r["pid"])
+            if p is not None:
+                p["latest_gate"] = {"gate_id": r["gate_id"], "ts": r["ts"]}
+        for r in conn.execute(f"SELECT * FROM artifacts {where}", args):
+            p = projects.get(r["pid"])
+            if p is not None:
+                p.setdefault("artifact_payloads", {})[r["artifact_key"]] = {
+                    "payload": json.loads(r["payload"]), "updated_by": r["updated_by"], "updated_at": r["updated_at"],
+                }
+        for r in conn.execute(f"SELECT * FROM ai_suggestions {where}", args):
+            p = projects.get(r["pid"])
+            if p is not None:
+                p.setdefault("ai_suggestions", {}).setdefault(r["gate_id"], {})[r["artifact_key"]] = (
+                    json.loads(r["suggestion"])
+                )
+        # Only a summary is attached; the trail itself is paged with audit_page().
+        for r in conn.execute(
+            f"SELECT pid, gate_id, COUNT(*) AS n, MAX(ts) AS last_ts FROM audit_events {where} GROUP BY pid, gate_id",
+            args,
+        ):
+            gate = projects.get(r["pid"], {}).get("gates", {}).get(r["gate_id"])
+            if gate is not None:
+                gate["audit_summary"] = {"count": r["n"], "last_ts": r["last_ts"]}
+
+    @staticmethod
+    def _ensure_gate(conn: sqlite3.Connection, pid: str, gate_id: str):
+        conn.execute("INSERT OR IGNORE INTO gate_states (pid, gate_id) VALUES (?, ?)", (pid, gate_id))
+
+    def _gate_effective(self, conn: sqlite3.Connection, pid: str, gate_id: str) -> str:
+        gate = conn.execute(
+            "SELECT gate_status, overridden FROM gate_states WHERE pid = ? AND gate_id = ?", (pid, gate_id)
+        ).fetchone()
+        gs = {"gate_status": gate["gate_status"], "overridden": bool(gate["overridden"]), "checkpoints": {
+            r["artifact_key"]: {"decision": r["decision"] or "Pending"}
+            for r in conn.execute(
+                "SELECT artifact_key, decision FROM checkpoints WHERE pid = ? AND gate_id = ?", (pid, gate_id)
+            )
+        }}
+        return effective_status(gate_id, gs)
+
+    def _update_effective(self, conn: sqlite3.Connection, pid: str, gate_id: str):
+        conn.execute(
+            "UPDATE gate_states SET effective_status = ? WHERE pid = ? AND gate_id = ?",
+            (self._gate_effective(conn, pid, gate_id), pid, gate_id),
+        )
+
+    def _refresh_effective(self, verify_only: bool = False) -> List[str]:
+        """Recompute every gate's effective status; returns the gates whose stored value differed."""
+        conn = self._conn()
+        stale = []
+        for r in conn.execute("SELECT pid, gate_id, effective_status FROM gate_states").fetchall():
+            want = self._gate_effective(conn, r["pid"], r["gate_id"])
+            if want != r["effective_status"]:
+                stale.append((r["pid"], r["gate_id"], r["effective_status"], want))
+        if stale and not verify_only:
+            with self._write() as conn:
+                conn.executemany(
+                    "UPDATE gate_states SET effective_status = ? WHERE pid = ? AND gate_id = ?",
+                    [(want, pid, gid) for pid, gid, _, want in stale],
+                )
+        return [f"effective_status[{pid}/{gid}]: stored {have}, actual {want}" for pid, gid, have, want in stale]
+
+    @staticmethod
+    def _audit(conn: sqlite3.Connection, pid: str, gate_id: str, who: str, action: str, reason: str | None = None):
+        conn.execute(
+            "INSERT INTO audit_events (pid, gate_id, ts, who, action, reason) VALUES (?, ?, ?, ?, ?, ?)",
+            (pid, gate_id, time.time(), who, action, reason),
+        )
+
+    def _project_exists(self, pid: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM projects WHERE id = ?", (pid,)).fetchone() is not None
+
+    # ---- Projects ----
+    @traced("db.create_project")
+    def create_project(self, proj: Dict[str, Any]) -> str:
+        pid = new_project_id()
+        proj["id"] = pid
+        proj["gates"] = {}
+        with self._write() as conn:
+            self._insert_project(conn, proj)
+        return pid
+
+    @traced("db.list_projects")
+    def list_projects(self) -> List[Dict[str, Any]]:
+        rows = self._conn().execute("SELECT * FROM projects ORDER BY rowid").fetchall()
+        projects = {r["id"]: self._project_from_row(r) for r in rows}
+        self._attach_gates(projects)
+        return tuple(freeze(p) for p in projects.values())
+
+    @traced("db.get_project")
+    def get_project(self, pid: str) -> Dict[str, Any] | None:
+        row = self._conn().execute("SELECT * FROM projects WHERE id = ?", (pid,)).fetchone()
+        if row is None:
+            return None
+        projects = {pid: self._project_from_row(row)}
+        self._attach_gates(projects, "WHERE pid = ?", (pid,))
+        return freeze(projects[pid])
+
+    @traced("db.projects_with_gate_status")
+    def projects_with_gate_status(self, gate_id: str, status: str) -> List[Dict[str, Any]]:
+        """Projects whose effective status at gate_id is status, through idx_gate_states_effective."""
+        self._sync_rules()
+        sub = "SELECT pid FROM gate_states WHERE gate_id = ? AND effective_status = ?"
+        rows = self._conn().execute(
+            f"SELECT * FROM projects WHERE id IN ({sub}) ORDER BY rowid", (gate_id, status)
+        ).fetchall()
+        projects = {r["id"]: self._project_from_row(r) for r in rows}
+        self._attach_gates(projects, f"WHERE pid IN ({sub})", (gate_id, status))
+        return [freeze(p) for p in projects.values()]
+
+    @traced("db.query_projects")
+    def query_projects(self, search: str = "", status: str | None = None, owner: str | None = None,
+                       gate_id: str | None = None, sort: str = "name", prefix: bool = False,
+                       limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Same contract as db.DB.query_projects; prefix searches and filters go through the idx_projects_* indexes."""
+        if sort not in QUERY_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        where, args = [], []
+        q = search.strip()
+        if q:
+            esc = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            where.append("name LIKE ? ESCAPE '\\'")
+            args.append(f"{esc}%" if prefix else f"%{esc}%")
+        for col, value in query_filters(status, owner, gate_id).items():
+            where.append(f"{col} = ?")
+            args.append(value)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        order = "name COLLATE NOCASE, id" if sort == "name" else "updated_at DESC, name COLLATE NOCASE, id"
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM projects {clause}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM projects {clause} ORDER BY {order} LIMIT ? OFFSET ?", (*args, limit, offset)
+        ).fetchall()
+        projects = {r["id"]: self._project_from_row(r) for r in rows}
+        if projects:
+            self._attach_gates(projects, f"WHERE pid IN ({','.join('?' * len(projects))})", tuple(projects))
+        return [freeze(p) for p in projects.values()], total
+
+    @traced("db.update_project")
+    def update_project(self, pid: str, patch: Dict[str, Any]):
+        row = self._conn().execute("SELECT * FROM projects WHERE id = ?", (pid,)).fetchone()
+        if row is None:
+            return
+        p = self._project_from_row(row)
+        p.update({k: v for k, v in patch.items() if k != "gates"})
+        p["id"] = pid
+        p["updated_at"] = time.time()
+        with self._write() as conn:
+            self._insert_project(conn, p)
+
+    @traced("db.save_checkpoint_decision")
+    def save_checkpoint_decision(self, pid: str, gate_id: str, artifact_key: str, decision: str, user: str):
+        if not self._project_exists(pid):
+            return
+        with self._write() as conn:
+            self._ensure_gate(conn, pid, gate_id)
+            conn.execute(
+                "INSERT INTO checkpoints (pid, gate_id, artifact_key, decision, decided_by, decided_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (pid, gate_id, artifact_key) DO UPDATE SET "
+                "decision = excluded.decision, decided_by = excluded.decided_by, decided_at = excluded.decided_at",
+                (pid, gate_id, artifact_key, decision, user, time.time()),
+            )
+            self._update_effective(conn, pid, gate_id)
+            self._audit(conn, pid, gate_id, user, f"checkpoint:{artifact_key}:{decision}")
+
+    @traced("db.save_checkpoint_payload")
+    def save_checkpoint_payload(self, pid: str, gate_id: str, artifact_key: str, payload: dict, user: str):
+        if not self._project_exists(pid):
+            return
+        with self._write() as conn:
+            self._ensure_gate(conn, pid, gate_id)
+            now = time.time()
+            # One row per (project, artifact_key), shared by every gate listing the artifact.
+            conn.execute(
+                "INSERT INTO artifacts (pid, artifact_key, payload, updated_by, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (pid, artifact_key) DO UPDATE SET "
+                "payload = excluded.payload, updated_by = excluded.updated_by, updated_at = excluded.updated_at",
+                (pid, artifact_key, json.dumps(payload), user, now),
+            )
+            conn.execute(
+                "INSERT INTO checkpoints (pid, gate_id, artifact_key, updated_by, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (pid, gate_id, artifact_key) DO UPDATE SET "
+                "payload = NULL, updated_by = excluded.updated_by, updated_at = excluded.updated_at",
+                (pid, gate_id, artifact_key, user, now),
+            )
+            self._audit(conn, pid, gate_id, user, f"artifact:{artifact_key}:update")
+
+    @traced("db.save_gate_status")
+    def save_gate_status(self, pid: str, gate_id: str, status: str, user: str, reason: str = ""):
+        if not self._project_exists(pid):
+            return
+        with self._write() as conn:
+            self._ensure_gate(conn, pid, gate_id)
+            conn.execute(
+                "UPDATE gate_states SET gate_status = ?, overridden = 1, override_by = ?, override_reason = ? "
+                "WHERE pid = ? AND gate_id = ?",
+                (status, user, reason, pid, gate_id),
+            )
+            self._update_effective(conn, pid, gate_id)
+            self._audit(conn, pid, gate_id, user, f"gate_status:{status}", reason)
+
+    @traced("db.save_ai_suggestion")
+    def save_ai_suggestion(self, pid: str, gate_id: str, artifact_key: str, suggestion: Dict[str, Any]):
+        if not self._project_exists(pid):
+            return
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO ai_suggestions (pid, gate_id, artifact_key, suggestion, created_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (pid, gate_id, artifact_key) DO UPDATE SET "
+                "suggestion = excluded.suggestion, created_at = excluded.created_at",
+                (pid, gate_id, artifact_key, json.dumps(suggestion), time.time()),
+            )
+
+    @traced("db.get_ai_suggestions")
+    def get_ai_suggestions(self, pid: str, gate_id: str) -> Dict[str, Any]:
+        """{artifact_key: suggestion} of the latest stored AI suggestions for one gate."""
+        rows = self._conn().execute(
+            "SELECT artifact_key, suggestion FROM ai_suggestions WHERE pid = ? AND gate_id = ?", (pid, gate_id)
+        ).fetchall()
+        return freeze({r["artifact_key"]: json.loads(r["suggestion"]) for r in rows})
+
+    @traced("db.get_artifact_payload")
+    def get_artifact_payload(self, pid: str, artifact_key: str):
+        row = self._conn().execute(
+            "SELECT payload FROM artifacts WHERE pid = ? AND artifact_key = ?", (pid, artifact_key)
+        ).fetchone()
+        return freeze(json.loads(row["payload"])) if row else None
+
+    # ---- Dashboard aggregates ----
+    @traced("db.dashboard_summary")
+    def dashboard_summary(self) -> Dict[str, Any]:
+        """Materialized CXO dashboard counters; read without touching any project."""
+        self._sync_rules()
+        summary = {"gate_status": dict.fromkeys(GATE_STATUSES, 0), "project_status": dict.fromkeys(PROJECT_STATUSES, 0)}
+        for r in self._conn().execute("SELECT kind, key, n FROM agg_counts WHERE n != 0"):
+            summary[r["kind"]][r["key"]] = r["n"]
+        summary["total"] = sum(summary["project_status"].values())
+        return summary
+
+    def rebuild_aggregates(self, verify_only: bool = False) -> List[str]:
+        """
+        Recompute the aggregates from scratch and report where the materialized
+        tables differ. Unless verify_only, the recomputed values are stored.
+        """
+        effective = self._refresh_effective(verify_only)
+        conn = self._conn()
+        fresh = {(r["kind"], r["key"]): r["n"] for r in conn.execute(FRESH_COUNTS)}
+        stored = {(r["kind"], r["key"]): r["n"] for r in conn.execute("SELECT kind, key, n FROM agg_counts")}
+        diffs = [f"{kind}[{key}]: stored {stored.get((kind, key), 0)}, actual {fresh.get((kind, key), 0)}"
+                 for kind, key in sorted(set(fresh) | set(stored))
+                 if fresh.get((kind, key), 0) != stored.get((kind, key), 0)]
+        fresh_latest = {r["pid"]: r["gate_id"] for r in conn.execute(FRESH_LATEST)}
+        stored_latest = {r["pid"]: r["gate_id"] for r in conn.execute("SELECT pid, gate_id FROM project_latest")}
+        diffs += [f"latest_gate[{pid}]: stored {stored_latest.get(pid)}, actual {fresh_latest.get(pid)}"
+                  for pid in sorted(set(fresh_latest) | set(stored_latest))
+                  if fresh_latest.get(pid) != stored_latest.get(pid)]
+        if diffs and not verify_only:
+            with self._write() as conn:
+                conn.execute("DELETE FROM agg_counts")
+                conn.execute(f"INSERT INTO agg_counts (kind, key, n) {FRESH_COUNTS}")
+                conn.execute("DELETE FROM project_latest")
+                conn.execute(f"INSERT INTO project_latest (pid, gate_id, ts) {FRESH_LATEST}")
+        return effective + diffs
+
+    # ---- Audit ----
+    @traced("db.audit_page")
+    def audit_page(self, pid: str, gate_id: str, limit: int = 50, before: Tuple[float, int] | None = None):
+        """Newest-first page of a gate's audit trail; the cursor is (ts, id) of the last event returned."""
+        ts, seq = before if before is not None else (float("inf"), 0)
+        rows = self._conn().execute(
+            "SELECT id, ts, who, action, reason FROM audit_events WHERE pid = ? AND gate_id = ? "
+            "AND (ts < ? OR (ts = ? AND id < ?)) ORDER BY ts DESC, id DESC LIMIT ?",
+            (pid, gate_id, ts, ts, seq, limit),
+        ).fetchall()
+        events = []
+        for r in rows:
+            ev = {"ts": r["ts"], "who": r["who"], "action": r["action"]}
+            if r["reason"] is not None:
+                ev["reason"] = r["reason"]
+            events.append(ev)
+        return events, ((rows[-1]["ts"], rows[-1]["id"]) if len(rows) == limit else None)
+
+# ---- One-shot migrator from local_db.json ----
+
+def migrate_from_json(json_path: str, sqlite_path: str) -> int:
+    """
+    Copy every project, gate state, checkpoint, artifact and audit event into
+    SQLite, including writes still in the JSON store's journal.
+    """
+    data, _, _ = load_document(Path(json_path))
+    target = DB(sqlite_path)
+    audit = AuditStore(Path(json_path).resolve().parent / AUDIT_DIR)
+    with target._write() as conn:
+        for k, v in (data.get("settings") or {}).items():
+            conn.execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (k, v),
+            )
+        for p in data.get("projects", []):
+            apply_op(data, {p["id"]: p}, {"op": "fold_payloads", "pid": p["id"]})
+            target._insert_project(conn, p)
+            for akey, art in p.get("artifact_payloads", {}).items():
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (pid, artifact_key, payload, updated_by, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (p["id"], akey, json.dumps(art["payload"]), art.get("updated_by"), art.get("updated_at")),
+                )
+            for gid, suggestions in (p.get("ai_suggestions") or {}).items():
+                conn.executemany(
+                    "INSERT OR REPLACE INTO ai_suggestions (pid, gate_id, artifact_key, suggestion, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(p["id"], gid, akey, json.dumps(sug), sug.get("at")) for akey, sug in suggestions.items()],
+                )
+            for gid, gs in (p.get("gates") or {}).items():
+                conn.execute(
+                    "INSERT INTO gate_states "
+                    "(pid, gate_id, gate_status, overridden, override_by, override_reason) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (pid, gate_id) DO UPDATE SET gate_status = excluded.gate_status, "
+                    "overridden = excluded.overridden, override_by = excluded.override_by, "
+                    "override_reason = excluded.override_reason",
+                    (p["id"], gid, gs.get("gate_status", "Pending"), 1 if gs.get("overridden") else 0,
+                     gs.get("override_by"), gs.get("override_reason")),
+                )
+                for akey, cp in (gs.get("checkpoints") or {}).items():
+                    conn.execute(
+                        "INSERT OR REPLACE INTO checkpoints (pid, gate_id, artifact_key, decision, decided_by, "
+                        "decided_at, payload, updated_by, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (p["id"], gid, akey, cp.get("decision"), cp.get("decided_by"), cp.get("decided_at"),
+                         json.dumps(cp["payload"]) if "payload" in cp else None,
+                         cp.get("updated_by"), cp.get("updated_at")),
+                    )
+                # Inline (legacy) events first, then whatever the AuditStore holds.
+                events = list(gs.get("audit", []))
+                events += reversed(audit.page(p["id"], gid, limit=sys.maxsize)[0])
+                conn.execute("DELETE FROM audit_events WHERE pid = ? AND gate_id = ?", (p["id"], gid))
+                conn.executemany(
+                    "INSERT INTO audit_events (pid, gate_id, ts, who, action, reason) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(p["id"], gid, ev.get("ts", 0), ev.get("who"), ev.get("action"), ev.get("reason"))
+                     for ev in events],
+                )
+    target.rebuild_aggregates()  # audit history was replaced wholesale above
+    return len(data.get("projects", []))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python sqlite_db.py <local_db.json> <sqlite_db_path>")
+        sys.exit(1)
+    n = migrate_from_json(sys.argv[1], sys.argv[2])
+    print(f"Migrated {n} projects into {sys.argv[2]}.")
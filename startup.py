@@ -0,0 +1,160 @@
+# startup.py
+import base64, json, os, re, subprocess, sys, time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import streamlit as st
+
+from config_loader import CompiledConfig, load_config
+from db import open_db
+from tracing import record
+
+# Process-level resources for app.py. Streamlit re-executes the whole script on
+# every rerun, so anything app.py builds at top level is rebuilt per click. The
+# storage handle (including the demo-project seeding check), the CSS and the
+# logo are built once per server process with st.cache_resource and shared by
+# every session; the config is compiled once per file version by load_config
+# and only stat()'ed per rerun. The AI service is already a lazily built
+# process singleton (ai.get_service) and is not touched at startup, so openai
+# is only imported when a suggestion is actually requested.
+#
+# Heavy dependencies stay off the cold path: pandas loads with the dashboard
+# (analytics) or scorer.score_portfolio, openai on the first AI client, and
+# the logo is inlined as a data URI so st.image (PIL, numpy) is never needed.
+# `python startup.py` prints an import-time report per entry point.
+
+CONFIG_PATH = "governance_config.json"
+CSS_PATH = Path("styles.css")
+LOGO_PATH = Path(__file__).parent / "assets" / "logo.png"
+HEAVY_MODULES = ("pandas", "numpy", "openai", "PIL", "tiktoken")
+
+# Import sets per entry point: cold start is what app.py needs to render any
+# page; the others are what a page or action imports on top of it.
+ENTRY_POINTS = {
+    "cold start": ["streamlit", "config_loader", "auth", "db", "ui_components", "startup"],
+    "home (gate rules)": ["gate_rules"],
+    "ai card": ["ai"],
+    "dashboard": ["analytics"],
+    "pre-review": ["prereview"],
+}
+
+DEMO_PROJECTS = ["AI Risk Scoring Pilot", "Customer Chatbot Revamp", "Forecast Model V2"]
+
+# Build time (ms) of each process resource, for the Settings page
+_TIMINGS: Dict[str, float] = {}
+
+def _timed(name: str, started: float):
+    _TIMINGS[name] = round((time.perf_counter() - started) * 1000, 1)
+    record(f"startup.{name}", _TIMINGS[name])
+
+def config() -> CompiledConfig:
+    return load_config(CONFIG_PATH)
+
+def _seed_demo_projects(db, cfg: CompiledConfig):
+    try:
+        if db.list_projects():
+            return
+        gates = cfg.gates
+        first_gate = gates[0]["gate_id"] if gates else ""
+        demo_now = time.time()
+        with db.transaction():
+            for name in DEMO_PROJECTS:
+                db.create_project({
+                    "name": name,
+                    "description": "Demo project seeded on first run",
+                    "owner": "demo_owner",
+                    "type": "Prototype",
+                    "start_date": "",
+                    "status": "ONGOING",
+                    "current_gate_id": first_gate,
+                    "created_at": demo_now,
+                    "updated_at": demo_now
+                })
+    except Exception:
+        pass
+
+@st.cache_resource(show_spinner=False)
+def database():
+    """The storage backend, opened (and seeded when empty) once per process."""
+    started = time.perf_counter()
+    db = open_db()
+    _seed_demo_projects(db, config())
+    _timed("database", started)
+    return db
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _css(path: str, mtime: float) -> str:
+    started = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        markup = f"<style>{f.read()}</style>"
+    _timed("css", started)
+    return markup
+
+def css() -> str:
+    """<style> block from styles.css, re-read only when the file changes."""
+    try:
+        mtime = CSS_PATH.stat().st_mtime
+    except OSError:
+        return ""
+    return _css(str(CSS_PATH), mtime)
+
+@st.cache_resource(show_spinner=False)
+def logo_uri() -> str:
+    """assets/logo.png as a data URI ("" when missing)."""
+    if not LOGO_PATH.exists():
+        return ""
+    return "data:image/png;base64," + base64.b64encode(LOGO_PATH.read_bytes()).decode("ascii")
+
+def startup_report() -> Dict[str, Any]:
+    """Resource build times and which heavy modules this process has imported so far."""
+    return {"timings_ms": dict(_TIMINGS), "loaded": [m for m in HEAVY_MODULES if m in sys.modules]}
+
+# ---- Import-time report ----
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+_MARK = "--fairsight-import-mark--"
+
+def import_report(modules: List[str], preload: List[str] = ()) -> Dict[str, Any]:
+    """
+    Import modules in a fresh interpreter with -X importtime, after preload
+    (whose cost is excluded). Returns the total and per-module cumulative
+    milliseconds and the heavy dependencies the import pulled in.
+    """
+    code = ""
+    if preload:
+        code += f"import {', '.join(preload)}; "
+    code += f"import sys; sys.stderr.write('{_MARK}\\n'); import {', '.join(modules)}; "
+    code += f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          cwd=Path(__file__).parent, env={**os.environ, "PYTHONWARNINGS": "ignore"})
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    lines = proc.stderr.split(_MARK, 1)[-1].splitlines()
+    top: Dict[str, float] = {}
+    heavy: Dict[str, float] = {}
+    for line in lines:
+        m = _IMPORT_LINE.match(line)
+        if not m:
+            continue
+        cumulative_ms, depth, name = int(m.group(2)) / 1000, len(m.group(3)), m.group(4)
+        if depth == 1:
+            top[name] = cumulative_ms
+        if name in HEAVY_MODULES:
+            heavy[name] = cumulative_ms
+    # A failed optional import (e.g. tiktoken) is still listed by -X importtime
+    loaded = set(proc.stdout.split())
+    heavy = {m: ms for m, ms in heavy.items() if m in loaded}
+    return {"total_ms": round(sum(top.values()), 1), "modules": top, "heavy": heavy}
+
+if __name__ == "__main__":
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[1:] if a.startswith("--"))
+    report, loaded = {}, []
+    for name, modules in ENTRY_POINTS.items():
+        report[name] = import_report(modules, preload=loaded)
+        loaded = loaded or modules
+    if "json" in opts:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, r in report.items():
+            heavy = ", ".join(f"{m} {ms:.0f} ms" for m, ms in r["heavy"].items()) or "none"
+            print(f"{name:<18} {r['total_ms']:>8.1f} ms   heavy: {heavy}")
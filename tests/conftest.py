@@ -0,0 +1,20 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config_loader import load_config
+
+@pytest.fixture
+def cfg():
+    return load_config(str(ROOT / "governance_config.json"))
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """An empty working directory, where the stores put local_db.json, audit_log/ and fairsight.db."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,45 @@
+# tests/test_ai_stream.py
+from types import SimpleNamespace
+
+import ai
+
+class _Cache:
+    def get(self, key):
+        return None
+
+    def put(self, key, text):
+        pass
+
+def _chunk(text):
+    return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+def _service(chunks):
+    completions = SimpleNamespace(create=lambda **kw: iter(_chunk(c) for c in chunks))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return SimpleNamespace(config=lambda: ("key", "model", None), breaker=ai.CircuitBreaker(),
+                           client=lambda *a: client)
+
+def _stream(monkeypatch, chunks, has_artifact=False):
+    monkeypatch.setattr(ai, "_HAS_OPENAI", True)
+    monkeypatch.setattr(ai, "get_service", lambda: _service(chunks))
+    monkeypatch.setattr(ai, "get_cache", lambda: _Cache())
+    monkeypatch.setattr(ai, "_checkpoint_prompt", lambda *a: ("prompt", "v1", {}))
+    stream = ai.SuggestionStream({}, {"gate_id": "G0"}, {"artifact_key": "a"}, has_artifact)
+    return list(stream), stream.result
+
+def test_approve_after_long_preamble_is_never_shown_without_artifact(monkeypatch):
+    preamble = ["- **Rationale:** " + "word " * 30 + "\n" for _ in range(5)]  # well over 400 chars
+    shown, result = _stream(monkeypatch, preamble + ["- **Suggested decision:**", " Approve", "\n- done"])
+    assert sum(map(len, preamble)) > 400
+    assert "Approve" not in "".join(shown)
+    assert "**Suggested decision:** ReScope" in "".join(shown)
+    assert "Approve" not in result["text"]
+
+def test_text_without_decision_line_is_released_at_the_end(monkeypatch):
+    shown, result = _stream(monkeypatch, ["no verdict ", "here"])
+    assert "".join(shown) == "no verdict here"
+    assert result["source"] == "llm"
+
+def test_artifact_streams_immediately(monkeypatch):
+    shown, _ = _stream(monkeypatch, ["- **Suggested decision:** Approve", "\n- ok"], has_artifact=True)
+    assert shown == ["- **Suggested decision:** Approve", "\n- ok"]
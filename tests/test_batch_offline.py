@@ -0,0 +1,39 @@
+# tests/test_batch_offline.py
+from types import SimpleNamespace
+
+import pytest
+
+import ai
+from ai_queue import JobQueue, work
+from db import DB
+from prereview import prereview
+
+@pytest.fixture
+def no_key(monkeypatch):
+    service = SimpleNamespace(config=lambda: ("", "model", None), breaker=ai.CircuitBreaker(reset_after=0.01))
+    monkeypatch.setattr(ai, "get_service", lambda: service)
+
+@pytest.fixture
+def project(cfg, workdir):
+    db = DB()
+    pid = db.create_project({"name": "Offline", "owner": "o", "status": "ONGOING", "current_gate_id": "G0"})
+    return db, pid
+
+def test_prereview_without_key_reports_errors_and_stores_nothing(cfg, project, no_key):
+    db, pid = project
+    gate = cfg.gates[0]
+    results = prereview(db, pid, [gate], "tester", rate=1000, burst=100)
+    assert len(results) == len(gate["checkpoints"])
+    assert all("error" in r and "decision" not in r for r in results)
+    assert not db.get_ai_suggestions(pid, gate["gate_id"])
+
+def test_queue_without_key_hands_jobs_back_uncharged(cfg, project, no_key, workdir):
+    db, pid = project
+    gate = cfg.gates[0]
+    queue = JobQueue(workdir / "queue.db")
+    queue.enqueue([(pid, gate["gate_id"], cp["artifact_key"]) for cp in gate["checkpoints"]])
+    assert work(queue, db, cfg, concurrency=1, once=True) == 0
+    assert queue.counts()["queued"] == len(gate["checkpoints"])
+    attempts = [r[0] for r in queue._conn().execute("SELECT attempts FROM jobs")]
+    assert set(attempts) == {0}
+    assert not db.get_ai_suggestions(pid, gate["gate_id"])
@@ -0,0 +1,34 @@
+# tests/test_gate_rules.py
+import itertools
+
+import numpy as np
+
+from gate_rules import encode, engine
+from workflow import DECISIONS, compute_gate_status
+
+def _all_decisions(rule):
+    """Every combination of decisions over the rule's checkpoints, as a code matrix."""
+    combos = list(itertools.product(DECISIONS, repeat=len(rule.keys)))
+    return combos, np.stack([encode(c) for c in combos])
+
+def test_all_checkpoints_pass_rule_matches_the_baseline(cfg):
+    # G4: "All operational readiness checkpoints pass" names no checkpoint: it covers the whole gate
+    rule = engine(cfg).gate("G4")
+    assert rule.must.all()
+    combos, codes = _all_decisions(rule)
+    verdicts = [DECISIONS[c] for c in rule.evaluate_batch(codes)]
+    assert verdicts == [compute_gate_status(list(c)) for c in combos]
+
+def test_subset_rule_only_gates_on_the_subset(cfg):
+    # G3: "100% of security/compliance checkpoints pass" leaves the other checkpoints free
+    rule = engine(cfg).gate("G3")
+    subset = [i for i, k in enumerate(rule.keys) if rule.must[i]]
+    assert [rule.keys[i] for i in subset] == ["security-test-report", "compliance-checklist"]
+    assert rule.threshold == 0.0
+    combos, codes = _all_decisions(rule)
+    for combo, code in zip(combos, rule.evaluate_batch(codes)):
+        baseline = compute_gate_status([combo[i] for i in subset])
+        if baseline in ("Approve", "Reject"):
+            assert DECISIONS[code] == baseline, combo
+        else:
+            assert DECISIONS[code] in ("ReScope", "Pending"), combo
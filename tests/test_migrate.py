@@ -0,0 +1,22 @@
+# tests/test_migrate.py
+import json
+
+from db import DB
+from sqlite_db import DB as SQLiteDB, migrate_from_json
+
+def test_migration_replays_uncompacted_journal(cfg, workdir):
+    db = DB(journal=True)
+    pid = db.create_project({"name": "Journaled", "owner": "o", "status": "ONGOING", "current_gate_id": "G0"})
+    akey = cfg.gates[0]["checkpoints"][0]["artifact_key"]
+    db.save_checkpoint_payload(pid, "G0", akey, {"desc": "from the journal", "link": "", "notes": ""}, "tester")
+    db.save_checkpoint_decision(pid, "G0", akey, "Approve", "tester")
+    with open(workdir / "local_db.json", "r", encoding="utf-8") as f:
+        assert json.load(f)["projects"] == []  # nothing compacted yet
+
+    migrate_from_json(str(workdir / "local_db.json"), str(workdir / "fairsight.db"))
+
+    target = SQLiteDB(workdir / "fairsight.db")
+    p = target.get_project(pid)
+    assert p is not None and p["name"] == "Journaled"
+    assert p["gates"]["G0"]["checkpoints"][akey]["decision"] == "Approve"
+    assert target.get_artifact_payload(pid, akey)["desc"] == "from the journal"
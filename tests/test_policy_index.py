@@ -0,0 +1,19 @@
+# tests/test_policy_index.py
+from policy_index import PolicyIndex
+
+NOTES = [
+    "Consent must be recorded for every personal data source.",
+    "Fairness metrics are reviewed against the agreed threshold.",
+    "Security testing includes a penetration test before launch.",
+    "Rollback plans are rehearsed before each production release.",
+    "Drift monitoring alerts the model owner within one day.",
+]
+
+def test_context_returns_matching_chunks():
+    idx = PolicyIndex(NOTES)
+    assert idx.context("penetration test", k=2) == NOTES[2]
+
+def test_context_falls_back_to_leading_chunks_when_nothing_matches():
+    idx = PolicyIndex(NOTES)
+    assert idx.search("quantum blockchain", k=2) == []
+    assert idx.context("quantum blockchain", k=2) == "\n\n".join(NOTES[:2])
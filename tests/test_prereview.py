@@ -0,0 +1,124 @@
+# tests/test_prereview.py
+import json, subprocess, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ai
+import prereview
+from ai_cache import SuggestionCache
+from conftest import ROOT
+from db import DB
+
+def test_import_does_not_load_openai():
+    code = "import sys, prereview; print('openai' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True)
+    assert out.stdout.strip() == "False"
+
+def test_retryable_errors_are_retried(monkeypatch):
+    monkeypatch.setitem(prereview._RETRYABLE, "errors", (ConnectionError,))
+    monkeypatch.setattr(prereview, "BACKOFF_BASE", 0.0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("reset by peer")
+        return {"text": "ok"}
+    assert prereview._with_retry(flaky)["attempts"] == 3
+
+def test_other_errors_are_not_retried():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad input")
+    with pytest.raises(ValueError):
+        prereview._with_retry(broken)
+    assert len(calls) == 1
+
+class _FakeOpenAI(BaseHTTPRequestHandler):
+    """Chat completions endpoint answering each distinct prompt with a 429 first, then a suggestion."""
+    latency = 0.15
+    reply = "- **Suggested decision:** ReScope\n- **Rationale:** fake"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            prompt = body["messages"][-1]["content"]
+            server.seen[prompt] = server.seen.get(prompt, 0) + 1
+            first = server.seen[prompt] == 1
+            server.times.append(time.monotonic())
+            server.inflight += 1
+            server.max_inflight = max(server.max_inflight, server.inflight)
+        try:
+            time.sleep(self.latency)
+            if first:
+                self._reply(429, {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}})
+            else:
+                self._reply(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": self.reply}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+                })
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+    def _reply(self, status, doc):
+        data = json.dumps(doc).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fake_openai():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenAI)
+    server.lock, server.seen, server.times = threading.Lock(), {}, []
+    server.inflight = server.max_inflight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_prereview_against_a_rate_limited_server(cfg, workdir, fake_openai, monkeypatch):
+    pytest.importorskip("openai")
+    db = DB()
+    db.save_openapi_key("test-key")
+    db.save_openapi_base_url(f"http://127.0.0.1:{fake_openai.server_port}/v1")
+    service = ai.AIService(db)
+    service.breaker = ai.CircuitBreaker(failures=100)  # every checkpoint's first call fails
+    monkeypatch.setattr(ai, "get_service", lambda: service)
+    monkeypatch.setattr(ai, "get_cache", lambda: SuggestionCache(workdir / "ai_cache.db"))
+    monkeypatch.setattr(ai, "score_checkpoint", lambda *a: {"borderline": True})  # no triage shortcut
+    monkeypatch.setitem(prereview._RETRYABLE, "errors", None)
+    monkeypatch.setattr(prereview, "BACKOFF_BASE", 0.01)
+    pid = db.create_project({"name": "Served", "owner": "o", "status": "ONGOING", "current_gate_id": "G0"})
+    gate = cfg.gates[0]
+    keys = {cp["artifact_key"] for cp in gate["checkpoints"]}
+    concurrency, rate, burst = 3, 20.0, 2
+
+    results = prereview.prereview(db, pid, [gate], "tester", concurrency=concurrency, rate=rate, burst=burst)
+
+    assert {r["artifact_key"] for r in results} == keys
+    assert all("error" not in r and r["attempts"] == 2 for r in results)
+    assert sorted(fake_openai.seen.values()) == [2] * len(keys)
+    assert 2 <= fake_openai.max_inflight <= concurrency
+    # Token bucket: no window of requests holds more than its refill plus the burst
+    times = fake_openai.times
+    assert all(j - i + 1 <= burst + rate * (times[j] - times[i]) + 1
+               for i in range(len(times)) for j in range(i, len(times)))
+    assert times[-1] - times[0] >= (len(times) - burst) / rate - 0.1
+    stored = db.get_ai_suggestions(pid, gate["gate_id"])
+    assert set(stored) == keys
+    assert all(s["source"] == "llm" and s["decision"] == "ReScope" and s["by"] == "tester"
+               for s in stored.values())
@@ -0,0 +1,54 @@
+# tests/test_scorer.py
+import pytest
+
+from scorer import score_checkpoint, score_portfolio
+
+LINK = "https://docs.example.com/evidence"
+
+def _checkpoint(cfg, gate_id):
+    return next(g for g in cfg.gates if g["gate_id"] == gate_id)["checkpoints"][0]
+
+@pytest.mark.parametrize("gate_id, text", [
+    ("G1", "No consent issues were found; data card attached"),
+    ("G0", "This is not a prohibited use case; approved by the ethics board"),
+    ("G4", "Deployment is never without a rollback plan, see the runbook"),
+])
+def test_clean_evidence_mentioning_a_blocker_is_not_rejected(cfg, gate_id, text):
+    scored = score_checkpoint(gate_id, _checkpoint(cfg, gate_id), {"desc": text, "link": LINK}, cfg)
+    assert scored["decision"] != "Reject"
+
+@pytest.mark.parametrize("gate_id, text", [
+    ("G0", "This is not a prohibited use case"),
+    ("G2", "There was no missing explainability in the review"),
+])
+def test_negated_blocker_mention_is_ignored(cfg, gate_id, text):
+    scored = score_checkpoint(gate_id, _checkpoint(cfg, gate_id), {"desc": text, "link": LINK}, cfg)
+    assert not scored["blocker"]
+
+def test_blocker_mention_is_borderline_rescope(cfg):
+    scored = score_checkpoint("G0", _checkpoint(cfg, "G0"), {"desc": "Prohibited use case identified", "link": LINK}, cfg)
+    assert scored["blocker"] and scored["borderline"]
+    assert scored["decision"] == "ReScope"
+
+def test_portfolio_pass_agrees_with_single_checkpoint(cfg):
+    cp = _checkpoint(cfg, "G0")
+    texts = ["This is not a prohibited use case", "Prohibited use case identified"]
+    projects = [{"id": f"p{i}", "artifact_payloads": {cp["artifact_key"]: {"payload": {"desc": t, "link": LINK}}},
+                 "gates": {}} for i, t in enumerate(texts)]
+    df = score_portfolio(projects, cfg)
+    rows = df[(df["gate_id"] == "G0") & (df["artifact_key"] == cp["artifact_key"])].set_index("pid")
+    for i, t in enumerate(texts):
+        single = score_checkpoint("G0", cp, {"desc": t, "link": LINK}, cfg)
+        assert rows.loc[f"p{i}", "blocker"] == single["blocker"]
+        assert rows.loc[f"p{i}", "decision"] == single["decision"]
+
+def test_critical_checkpoint_is_not_approved_without_a_link(cfg):
+    gate = next(g for g in cfg.gates if g["gate_id"] == "G4")
+    cp = next(c for c in gate["checkpoints"] if c["artifact_key"] == "rollback-runbook")
+    words = f"{cp['checkpoint']} {cp['artifact']}".split()
+    payload = {"desc": " ".join(words * (40 // len(words) + 1)), "notes": "reviewed and signed off " * 5}
+    unlinked = score_checkpoint("G4", cp, payload, cfg)
+    assert unlinked["critical"] and not unlinked["blocker"]
+    assert unlinked["score"] >= 0.55 and unlinked["decision"] == "ReScope"
+    linked = score_checkpoint("G4", cp, {**payload, "link": LINK}, cfg)
+    assert linked["decision"] == "Approve"
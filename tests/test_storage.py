@@ -0,0 +1,226 @@
+# tests/test_storage.py
+import json, os, subprocess, sys
+from types import MappingProxyType
+
+import pytest
+
+from db import DB, load_document, thaw
+from sqlite_db import DB as SQLiteDB, migrate_from_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _project(name="Alpha", **fields):
+    return {"name": name, "owner": "o", "status": "ONGOING", "current_gate_id": "G0", **fields}
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, cfg, workdir):
+    """A fresh, empty store of each backend in the working directory."""
+    if request.param == "sqlite":
+        return SQLiteDB(workdir / "fairsight.db")
+    return DB()
+
+def _akey(cfg, gate=0, n=0):
+    return cfg.gates[gate]["checkpoints"][n]["artifact_key"]
+
+# ---- Read cache ----
+
+def test_reads_see_writes_and_generation_moves(cfg, store):
+    before = store.generation()
+    pid = store.create_project(_project())
+    store.save_checkpoint_decision(pid, "G0", _akey(cfg), "Approve", "tester")
+    assert store.generation() != before
+    p = store.get_project(pid)
+    assert p["gates"]["G0"]["checkpoints"][_akey(cfg)]["decision"] == "Approve"
+    assert [q["id"] for q in store.list_projects()] == [pid]
+
+def test_reads_are_frozen(cfg, store):
+    pid = store.create_project(_project())
+    store.save_checkpoint_payload(pid, "G0", _akey(cfg), {"desc": "d", "link": "", "notes": ""}, "tester")
+    p = store.get_project(pid)
+    assert isinstance(p, MappingProxyType) and isinstance(p["gates"], MappingProxyType)
+    with pytest.raises(TypeError):
+        p["name"] = "changed"
+    assert isinstance(store.list_projects(), tuple)
+    page, _ = store.query_projects()
+    assert all(isinstance(q, MappingProxyType) for q in page)
+    assert isinstance(store.get_artifact_payload(pid, _akey(cfg)), MappingProxyType)
+    assert isinstance(store.get_settings(), MappingProxyType)
+    assert thaw(p)["name"] == "Alpha"
+
+def test_json_reads_are_shared(workdir):
+    db = DB()
+    pid = db.create_project(_project())
+    p = db.get_project(pid)
+    assert DB().get_project(pid) is p  # one cached copy for every DB() instance
+    db.update_project(pid, {"name": "Renamed"})
+    assert DB().get_project(pid)["name"] == "Renamed"
+
+def test_json_cache_picks_up_writes_from_another_process(workdir):
+    db = DB()
+    pid = db.create_project(_project())
+    script = f"from db import DB; DB().update_project({pid!r}, {{'name': 'From elsewhere'}})"
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    subprocess.run([sys.executable, "-c", script], cwd=workdir, env=env, check=True)
+    assert db.get_project(pid)["name"] == "From elsewhere"
+
+# ---- Transactions ----
+
+def test_reads_inside_a_transaction_leave_pending_ops_alone(cfg, workdir):
+    db = DB()
+    akey = _akey(cfg)
+    with db.transaction():
+        pid = db.create_project(_project())
+        db.save_checkpoint_decision(pid, "G0", akey, "Approve", "tester")
+        for _ in range(3):
+            assert db.get_project(pid)["gates"]["G0"]["audit_summary"]["count"] == 1
+    assert db.get_project(pid)["gates"]["G0"]["audit_summary"]["count"] == 1
+    assert db.rebuild_aggregates(verify_only=True) == []
+
+def test_transaction_commits_everything_together(cfg, store):
+    gate = cfg.gates[0]
+    with store.transaction():
+        pid = store.create_project(_project())
+        for cp in gate["checkpoints"]:
+            store.save_checkpoint_decision(pid, "G0", cp["artifact_key"], "Approve", "tester")
+        with store.transaction():  # nested blocks join the outer one
+            store.save_gate_status(pid, "G0", "Approve", "caio", "all clear")
+        assert store.get_project(pid)["gates"]["G0"]["gate_status"] == "Approve"  # read-your-writes
+    gs = store.get_project(pid)["gates"]["G0"]
+    assert len(gs["checkpoints"]) == len(gate["checkpoints"])
+    assert gs["effective_status"] == "Approve"
+    assert gs["audit_summary"]["count"] == len(gate["checkpoints"]) + 1
+    assert store.dashboard_summary()["gate_status"]["Approve"] == 1
+    assert store.rebuild_aggregates(verify_only=True) == []
+
+def test_failed_transaction_writes_nothing(cfg, store):
+    pid = store.create_project(_project())
+    generation = store.generation()
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.save_checkpoint_decision(pid, "G0", _akey(cfg), "Reject", "tester")
+            store.update_project(pid, {"name": "Half done"})
+            raise RuntimeError("abort")
+    p = store.get_project(pid)
+    assert p["name"] == "Alpha" and not p["gates"]
+    assert store.generation() == generation
+    assert store.dashboard_summary()["gate_status"]["Reject"] == 0
+    assert store.audit_page(pid, "G0")[0] == []
+
+# ---- Journal ----
+
+def test_journal_replay_matches_the_committed_state(cfg, workdir):
+    db = DB(journal=True)
+    akey = _akey(cfg)
+    with db.transaction():
+        pid = db.create_project(_project())
+        db.save_checkpoint_decision(pid, "G0", akey, "Approve", "tester")
+    live = db.get_project(pid)
+
+    data, _, _ = load_document()
+    replayed = next(p for p in data["projects"] if p["id"] == pid)
+    assert replayed["gates"]["G0"]["audit_summary"]["count"] == live["gates"]["G0"]["audit_summary"]["count"] == 1
+
+def test_compaction_folds_the_journal_into_the_snapshot(cfg, workdir):
+    db = DB(journal=True)
+    pid = db.create_project(_project())
+    db.save_checkpoint_decision(pid, "G0", _akey(cfg), "Approve", "tester")
+    segments = sorted((workdir / "local_db.journal").glob("*.log"))
+    assert segments and load_document()[0]["projects"][0]["id"] == pid
+
+    db.compact()
+    assert not any(seg.exists() for seg in segments)
+    with open(workdir / "local_db.json", "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    assert [p["id"] for p in snapshot["projects"]] == [pid]
+
+    # Writes after the compaction go to a new segment and replay on top of it.
+    db.save_checkpoint_decision(pid, "G0", _akey(cfg), "Reject", "tester")
+    data, _, _ = load_document()
+    gs = data["projects"][0]["gates"]["G0"]
+    assert gs["checkpoints"][_akey(cfg)]["decision"] == "Reject"
+    assert gs["audit_summary"]["count"] == 2
+    assert db.rebuild_aggregates(verify_only=True) == []
+
+def test_journal_replay_stops_at_a_torn_tail(cfg, workdir):
+    db = DB(journal=True)
+    pid = db.create_project(_project())
+    segment = sorted((workdir / "local_db.journal").glob("*.log"))[-1]
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"ops": [{"op": "update_pro')  # crash mid-append
+    data, _, _ = load_document()
+    assert [p["id"] for p in data["projects"]] == [pid]
+
+# ---- Project queries ----
+
+def _portfolio(store):
+    """Five projects with distinct names, owners, statuses, gates and update times."""
+    rows = [("Beta scoring", "ana", "ONGOING", "G1", 30), ("alpha chatbot", "bo", "ONGOING", "G0", 10),
+            ("Alpha vision", "ana", "COMPLETED", "G2", 50), ("Gamma_alpha", "bo", "ONGOING", "G1", 20),
+            ("delta", "ana", "PENDING", "G0", 40)]
+    return {name: store.create_project(_project(name, owner=owner, status=status, current_gate_id=gate,
+                                                updated_at=1_700_000_000 + t))
+            for name, owner, status, gate, t in rows}
+
+def _names(result):
+    page, total = result
+    return [p["name"] for p in page], total
+
+def test_query_projects_search_filters_sort_and_paging(store):
+    _portfolio(store)
+    assert _names(store.query_projects()) == (
+        ["alpha chatbot", "Alpha vision", "Beta scoring", "delta", "Gamma_alpha"], 5)
+    assert _names(store.query_projects(" ALPHA ")) == (["alpha chatbot", "Alpha vision", "Gamma_alpha"], 3)
+    assert _names(store.query_projects("alpha", prefix=True)) == (["alpha chatbot", "Alpha vision"], 2)
+    assert _names(store.query_projects("a_a")) == (["Gamma_alpha"], 1)  # LIKE wildcards are literal
+    assert _names(store.query_projects(owner="ana")) == (["Alpha vision", "Beta scoring", "delta"], 3)
+    assert _names(store.query_projects(status="ONGOING", gate_id="G1")) == (["Beta scoring", "Gamma_alpha"], 2)
+    assert _names(store.query_projects("alpha", owner="bo", gate_id="G0")) == (["alpha chatbot"], 1)
+    assert _names(store.query_projects(owner="nobody")) == ([], 0)
+    assert _names(store.query_projects(sort="updated", limit=2)) == (["Alpha vision", "delta"], 5)
+    assert _names(store.query_projects(sort="updated", limit=2, offset=2)) == (["Beta scoring", "Gamma_alpha"], 5)
+    assert _names(store.query_projects(limit=2, offset=4)) == (["Gamma_alpha"], 5)
+    with pytest.raises(ValueError):
+        store.query_projects(sort="owner")
+
+def test_sqlite_migration_matches_the_json_store(cfg, workdir):
+    db = DB()
+    pids = _portfolio(db)
+    pid = pids["Beta scoring"]
+    gate = cfg.gates[1]
+    with db.transaction():
+        for cp in gate["checkpoints"]:
+            db.save_checkpoint_decision(pid, gate["gate_id"], cp["artifact_key"], "Approve", "tester")
+        db.save_checkpoint_payload(pid, gate["gate_id"], gate["checkpoints"][0]["artifact_key"],
+                                   {"desc": "Model card", "link": "https://example.com", "notes": ""}, "tester")
+        db.save_gate_status(pids["delta"], "G0", "Reject", "caio", "out of scope")
+        db.save_ai_suggestion(pid, gate["gate_id"], gate["checkpoints"][0]["artifact_key"],
+                              {"text": "Approve", "source": "heuristic"})
+    migrate_from_json("local_db.json", "fairsight.db")
+    lite = SQLiteDB(workdir / "fairsight.db")
+
+    assert [thaw(p) for p in lite.list_projects()] == [thaw(p) for p in db.list_projects()]
+    assert lite.dashboard_summary() == db.dashboard_summary()
+    for name in ("alpha", "a"):
+        for kw in ({}, {"owner": "ana"}, {"sort": "updated"}, {"prefix": True}):
+            assert _names(lite.query_projects(name, **kw)) == _names(db.query_projects(name, **kw))
+    for status in ("Approve", "Reject", "Pending"):
+        assert ([p["id"] for p in lite.projects_with_gate_status(gate["gate_id"], status)]
+                == [p["id"] for p in db.projects_with_gate_status(gate["gate_id"], status)])
+    assert (thaw(lite.get_ai_suggestions(pid, gate["gate_id"]))
+            == thaw(db.get_ai_suggestions(pid, gate["gate_id"])))
+    assert lite.audit_page(pid, gate["gate_id"]) == db.audit_page(pid, gate["gate_id"])
+
+# ---- Audit trail ----
+
+def test_audit_pages_split_events_sharing_a_timestamp(store, monkeypatch):
+    pid = store.create_project(_project())
+    monkeypatch.setattr("time.time", lambda: 1_700_000_000.0)
+    for i in range(7):
+        store.save_gate_status(pid, "G0", "ReScope", f"user{i}", f"round {i}")
+    seen, cursor = [], None
+    while True:
+        events, cursor = store.audit_page(pid, "G0", limit=3, before=cursor)
+        seen += [ev["who"] for ev in events]
+        if cursor is None:
+            break
+    assert seen == [f"user{i}" for i in reversed(range(7))]
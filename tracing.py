@@ -0,0 +1,197 @@
+# tracing.py
+import functools, itertools, json, os, sys, threading, time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional
+
+# Lightweight timing spans for finding where a slow rerun spends its time.
+#
+#   with span("db.load"): ...          @traced("db.get_project")
+#   record("ai.stream", ms, source=...)  for durations measured elsewhere
+#
+# Every finished span feeds a per-process histogram by name (lifetime count,
+# total and max, plus p50/p95/p99 over the last WINDOW samples) that
+# Settings → Performance shows. Spans nest per thread, and Streamlit runs each
+# session's script in its own thread, so the spans of one rerun form one trace
+# under the "rerun.<page>" root opened by app.py (fragment reruns are traces of
+# their own). With FAIRSIGHT_TRACE_FILE set, each trace is appended to that
+# file as JSON lines when its root span ends; `python tracing.py <file>`
+# summarizes it offline.
+#
+# FAIRSIGHT_TRACE=0 turns tracing off: span() then returns a shared no-op
+# context manager and traced functions cost one flag check per call.
+
+WINDOW = int(os.environ.get("FAIRSIGHT_TRACE_WINDOW", 1000))
+TRACE_FILE = os.environ.get("FAIRSIGHT_TRACE_FILE", "")
+
+_LOCK = threading.Lock()
+_STATE: Dict[str, Any] = {
+    "enabled": os.environ.get("FAIRSIGHT_TRACE", "1").lower() not in ("0", "false", "off", "no"),
+    "since": time.time(),
+}
+_HIST: Dict[str, "Histogram"] = {}
+_LOCAL = threading.local()
+_IDS = itertools.count(1)
+_NULL = nullcontext()
+
+class Histogram:
+    """Durations (ms) of one span name: lifetime totals plus a window of recent samples."""
+
+    def __init__(self, window: int = WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, ms: float):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.recent.append(ms)
+
+    def summary(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+        def pct(q: float) -> float:
+            return recent[min(len(recent) - 1, int(q * len(recent)))] if recent else 0.0
+        return {"count": self.count, "total_ms": self.total, "max_ms": self.max,
+                "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+
+def enabled() -> bool:
+    return _STATE["enabled"]
+
+def set_enabled(on: bool):
+    _STATE["enabled"] = bool(on)
+
+def reset():
+    """Drop all histograms (the trace file is left alone)."""
+    with _LOCK:
+        _HIST.clear()
+        _STATE["since"] = time.time()
+
+def _finish(name: str, ms: float, event: Optional[Dict[str, Any]]):
+    with _LOCK:
+        hist = _HIST.get(name)
+        if hist is None:
+            hist = _HIST[name] = Histogram()
+        hist.add(ms)
+    if event is None:
+        return
+    buffer = getattr(_LOCAL, "buffer", None)
+    if buffer is None:
+        _write([event])
+        return
+    buffer.append(event)
+    if event["parent"] is None:
+        _LOCAL.buffer = None
+        _write(buffer)
+
+def _write(events: List[Dict[str, Any]]):
+    lines = "".join(json.dumps(e, default=str) + "\n" for e in events)
+    try:
+        with _LOCK, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+    except OSError:
+        pass  # tracing must never break the app
+
+class _Span:
+    __slots__ = ("name", "attrs", "id", "parent", "trace", "started", "wall")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name, self.attrs = name, attrs
+
+    def __enter__(self):
+        stack = getattr(_LOCAL, "stack", None)
+        if stack is None:
+            stack = _LOCAL.stack = []
+        self.id = next(_IDS)
+        self.parent = stack[-1].id if stack else None
+        self.trace = stack[0].id if stack else self.id
+        if TRACE_FILE and not stack:
+            _LOCAL.buffer = []
+        stack.append(self)
+        self.wall = time.time() if TRACE_FILE else 0.0
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.started) * 1000
+        stack = _LOCAL.stack
+        if self in stack:
+            del stack[stack.index(self):]
+        event = None
+        if TRACE_FILE:
+            event = {"ts": round(self.wall, 6), "trace": self.trace, "id": self.id, "parent": self.parent,
+                     "name": self.name, "ms": round(ms, 3), "thread": threading.current_thread().name,
+                     **self.attrs}
+            if exc_type is not None:
+                event["error"] = exc_type.__name__
+        _finish(self.name, ms, event)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes known only inside the span (written to the trace file)."""
+        self.attrs.update(attrs)
+
+def span(name: str, **attrs):
+    """Context manager timing its body as name; attrs go to the trace file."""
+    if not _STATE["enabled"]:
+        return _NULL
+    return _Span(name, attrs)
+
+def traced(name: Optional[str] = None):
+    """Decorator: time every call of the function as a span (default name: the function's)."""
+    def wrap(fn):
+        label = name or fn.__name__
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not _STATE["enabled"]:
+                return fn(*args, **kwargs)
+            with _Span(label, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def record(name: str, ms: float, **attrs):
+    """Add a duration measured elsewhere, as a span ending now under the current one."""
+    if not _STATE["enabled"]:
+        return
+    event = None
+    if TRACE_FILE:
+        stack = getattr(_LOCAL, "stack", None) or []
+        span_id = next(_IDS)
+        event = {"ts": round(time.time() - ms / 1000, 6), "trace": stack[0].id if stack else span_id,
+                 "id": span_id, "parent": stack[-1].id if stack else None, "name": name, "ms": round(ms, 3),
+                 "thread": threading.current_thread().name, **attrs}
+    _finish(name, ms, event)
+
+def report() -> Dict[str, Any]:
+    """Histogram summaries by span name, slowest total first, for the Performance panel."""
+    with _LOCK:
+        spans = {name: h.summary() for name, h in _HIST.items()}
+    ordered = dict(sorted(spans.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+    return {"enabled": _STATE["enabled"], "since": _STATE["since"], "trace_file": TRACE_FILE, "spans": ordered}
+
+def summarize(path: str) -> Dict[str, Dict[str, float]]:
+    """Histogram summaries of a JSON-lines trace file, slowest total first."""
+    hists: Dict[str, Histogram] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # torn tail from a crash mid-append
+            hists.setdefault(event["name"], Histogram(window=None)).add(event["ms"])
+    spans = {name: h.summary() for name, h in hists.items()}
+    return dict(sorted(spans.items(), key=lambda kv: kv[1]["total_ms"], reverse=True))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python tracing.py <trace.jsonl> [--top=N]")
+        sys.exit(1)
+    opts = dict(a[2:].split("=", 1) if "=" in a else (a[2:], "1") for a in sys.argv[2:] if a.startswith("--"))
+    spans = summarize(sys.argv[1])
+    print(f"{'span':<40} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total ms':>10}")
+    for name, s in list(spans.items())[:int(opts.get("top", 40))]:
+        print(f"{name:<40} {s['count']:>7} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} "
+              f"{s['max_ms']:>9.2f} {s['total_ms']:>10.1f}")
@@ -3,20 +3,23 @@ from typing import List, Dict, Any, Optional
 import time
 import streamlit as st
 
-from rbac import is_caio, is_reviewer_for
+from rbac import is_caio
 from workflow import DECISIONS, compute_gate_status
-from config_loader import get_gates
+from config_loader import CompiledConfig, get_gates
+from tracing import traced
 
 # ---------- Top / Footer ----------
 
+@traced("ui.render_topbar")
 def render_topbar():
-    from pathlib import Path
+    from startup import logo_uri
     cols = st.columns([1, 6, 2])
     with cols[0]:
         if st.session_state.get("page") != "Login":
-            logo_path = Path(__file__).parent / "assets" / "logo.png"
-            if logo_path.exists():
-                st.image(str(logo_path), use_column_width=True)
+            logo = logo_uri()
+            if logo:
+                # Inlined (cached per process) rather than st.image, which pulls in PIL
+                st.markdown(f"<img src='{logo}' style='width:100%'>", unsafe_allow_html=True)
             else:
                 # Fallback if logo missing
                 st.markdown(
@@ -30,22 +33,83 @@ def render_topbar():
         if "auth_user" in st.session_state:
             st.caption(f"Signed in as **{st.session_state.get('auth_user')}** ({st.session_state.get('role')})")
 
+@traced("ui.render_footer")
 def render_footer():
     # Styled via .app-footer in styles.css (blue background, white text)
     st.markdown("<div class='app-footer'>© Arun Gaikwad, Software Engg Manager</div>", unsafe_allow_html=True)
 
 # ---------- Home Header / Gate Tabs ----------
 
+PICKER_PAGE_SIZE = 20
+
+def _project_label(p) -> str:
+    return f"{p.get('name', '')} ({p.get('status', '')})"
+
+@st.fragment
+@traced("ui.render_project_picker")
+def _render_project_picker(db):
+    # Search-as-you-type over db.query_projects: only one page of projects is
+    # ever fetched or sent to the browser. Typing and paging rerun this
+    # fragment only; opening a project reruns the app.
+    from db import PROJECT_STATUSES
+    c1, c2 = st.columns([4, 2])
+    search = c1.text_input(
+        "Search projects", key="home_project_q", type="search", live=True,
+        placeholder="Search projects by name", label_visibility="collapsed",
+    )
+    status = c2.selectbox("Status", ["All statuses"] + PROJECT_STATUSES, key="home_project_status",
+                          label_visibility="collapsed")
+    filters = (search.strip(), status)
+    if st.session_state.get("home_project_filters") != filters:
+        st.session_state["home_project_filters"] = filters
+        st.session_state["home_project_page"] = 0
+    page_no = st.session_state.get("home_project_page", 0)
+    projects, total = db.query_projects(
+        search=filters[0], status=None if status == "All statuses" else status,
+        limit=PICKER_PAGE_SIZE, offset=page_no * PICKER_PAGE_SIZE,
+    )
+
+    open_pid = st.session_state.get("open_project")
+    current = db.get_project(open_pid) if open_pid else None
+    if current is None:
+        # Nothing (valid) open yet: open the first project, like the old full list did
+        first = projects if filters == ("", "All statuses") else db.query_projects(limit=1)[0]
+        open_pid = st.session_state["open_project"] = first[0]["id"] if first else None
+        current = first[0] if first else None
+    if not total:
+        if filters == ("", "All statuses"):
+            st.info("No projects yet. Use 'Add Project' to create one.")
+        else:
+            st.caption("No projects match.")
+        return
+
+    labels = {p["id"]: _project_label(p) for p in projects}
+    options = list(labels)
+    choice = st.selectbox(
+        "Select Project", options,
+        index=options.index(open_pid) if open_pid in labels else None,
+        format_func=labels.get,
+        placeholder=f"Open: {_project_label(current)}" if current else "Select a project",
+    )
+    if choice is not None and choice != open_pid:
+        st.session_state["open_project"] = choice
+        st.rerun()
+
+    pages = (total - 1) // PICKER_PAGE_SIZE + 1
+    c1, c2, c3 = st.columns([1, 1, 6])
+    c1.button("‹ Prev", key="home_project_prev", disabled=page_no == 0,
+              on_click=_set_state, args=("home_project_page", page_no - 1))
+    c2.button("Next ›", key="home_project_next", disabled=page_no >= pages - 1,
+              on_click=_set_state, args=("home_project_page", page_no + 1))
+    first = page_no * PICKER_PAGE_SIZE + 1
+    c3.caption(f"{first}–{first + len(projects) - 1} of {total} projects · page {page_no + 1} of {pages}")
+
+@traced("ui.render_home_header")
 def render_home_header(db):
     st.subheader("Home — Swimlane")
-    projects = db.list_projects()
-    if not projects:
-        st.info("No projects yet. Use 'Add Project' to create one.")
-        return
-    options = {f"{p['name']} ({p['status']})": p["id"] for p in projects}
-    choice = st.selectbox("Select Project", options.keys(), key="home_project_sel")
-    st.session_state["open_project"] = options[choice]
+    _render_project_picker(db)
 
+@traced("ui.render_gate_tabs")
 def render_gate_tabs(gates: List[Dict[str, Any]], db):
     # Show tabs as "G#-<GateName>" while keeping internal gate_id
     label_map = {f"{g['gate_id']}-{g['gate_name']}": g["gate_id"] for g in gates}
@@ -70,7 +134,7 @@ def render_gate_tabs(gates: List[Dict[str, Any]], db):
     st.session_state["active_gate"] = chosen_gate_id
     return chosen_gate_id, [g["gate_id"] for g in gates]
 
-# ---------- Keys for session "modals" ----------
+# ---------- Keys for session "modals" and row fragments ----------
 
 def _artifact_modal_key(gate_id: str, artifact_key: str) -> str:
     return f"artifact_modal_{gate_id}_{artifact_key}"
@@ -78,189 +142,350 @@ def _artifact_modal_key(gate_id: str, artifact_key: str) -> str:
 def _ai_modal_key(gate_id: str, artifact_key: str) -> str:
     return f"ai_modal_{gate_id}_{artifact_key}"
 
-# ---------- Swimlane Table (main home UI) ----------
+def _row_key(gate_id: str, artifact_key: str) -> str:
+    return f"row_{gate_id}_{artifact_key}"
 
-def render_swimlane_table(db, gate_obj: Dict[str, Any], CONFIG: Dict[str, Any]):
-    pid = st.session_state.get("open_project")
-    if not pid:
-        st.info("Select a project above.")
-        return
-
-    proj = db.get_project(pid)
-    role = st.session_state.get("role", "")
+def _status_key(gate_id: str) -> str:
+    return f"gate_status_{gate_id}"
 
-    # Active gate state only
-    gate_state = proj.get("gates", {}).get(gate_obj["gate_id"], {})
+# ---------- Swimlane Table (main home UI) ----------
+#
+# Each checkpoint row (with its artifact editor and AI card) and the overall
+# gate status line are keyed st.fragment's. Widgets inside a row rerun only that
+# row, so the rest of app.py does not execute. A decision callback only stores
+# the decision; when the redrawn row sees that the gate's overall status no
+# longer matches what the status line last showed, it reruns the app to bring
+# the status line up to date. The gate-wide actions (pre-review, CAIO override)
+# always rerun the whole app.
+
+def _gate_view(db, pid: str, gate_id: str):
+    """(project, gate_state, ai_suggestions) for one gate, read once per DB generation."""
+    gen = db.generation()
+    memo = st.session_state.get("_gate_view")
+    if memo is None or memo[0] != (pid, gate_id, gen):
+        proj = db.get_project(pid) or {}
+        memo = ((pid, gate_id, gen), proj, proj.get("gates", {}).get(gate_id, {}), db.get_ai_suggestions(pid, gate_id))
+        st.session_state["_gate_view"] = memo
+    return memo[1:]
+
+def _record_ms(part: str, started: float):
+    st.session_state.setdefault("swimlane_ms", {})[part] = (time.perf_counter() - started) * 1000
+
+def _overall_status(gate_state: Dict[str, Any], gate_obj: Dict[str, Any]) -> str:
+    """The gate status the status line shows: the CAIO override, else the rule-evaluated status."""
+    if gate_state.get("overridden"):
+        return gate_state.get("gate_status", "Pending")
+    cp_map = gate_state.get("checkpoints", {})
+    decisions = {cp["artifact_key"]: cp_map.get(cp["artifact_key"], {}).get("decision", "Pending")
+                 for cp in gate_obj["checkpoints"]}
+    return gate_state.get("effective_status") or compute_gate_status(decisions, gate_obj["gate_id"])
+
+def _save_decision(db, pid: str, gate_id: str, artifact_key: str, decision: Optional[str] = None):
+    """Widget callback: store a checkpoint decision (the row fragment reruns after it)."""
+    if decision is None:
+        decision = st.session_state[f"dec_{gate_id}_{artifact_key}"]
+    db.save_checkpoint_decision(pid, gate_id, artifact_key, decision, st.session_state.get("auth_user", "unknown"))
+
+def _apply_suggestion(db, pid: str, gate_id: str, artifact_key: str, suggestion: str, has_artifact: bool):
+    # Parse decision safely; never approve without artifact
+    from ai import parse_decision
+    st.session_state[_ai_modal_key(gate_id, artifact_key)] = False
+    _save_decision(db, pid, gate_id, artifact_key, parse_decision(suggestion, has_artifact))
+
+def _set_state(key: str, value: Any = None):
+    # Callback helper; None clears the key
+    if value is None:
+        st.session_state.pop(key, None)
+    else:
+        st.session_state[key] = value
+
+def _artifact_fields(gate_id: str, artifact_key: str) -> Dict[str, str]:
+    return {f: f"artifact_form_{gate_id}_{artifact_key}_{f}" for f in ("desc", "link", "notes")}
+
+def _close_artifact(gate_id: str, artifact_key: str, db=None, pid: str = ""):
+    """Form callback: optionally save the artifact payload, then close the editor."""
+    fields = {f: st.session_state.pop(k, "") for f, k in _artifact_fields(gate_id, artifact_key).items()}
+    if db is not None:
+        db.save_checkpoint_payload(pid, gate_id, artifact_key, fields, st.session_state.get("auth_user", "unknown"))
+    st.session_state[_artifact_modal_key(gate_id, artifact_key)] = False
+
+@traced("ui.render_gate_status")
+def _render_gate_status(db, pid: str, gate_obj: Dict[str, Any], CONFIG: CompiledConfig):
+    started = time.perf_counter()
+    _, gate_state, _ = _gate_view(db, pid, gate_obj["gate_id"])
     cp_map = gate_state.get("checkpoints", {})
 
-    # Overall gate status (override-aware)
-    decisions = [cp_map.get(cp["artifact_key"], {}).get("decision", "Pending") for cp in gate_obj["checkpoints"]]
+    # Overall gate status (override-aware), maintained by the storage layer on every decision
+    decisions = {cp["artifact_key"]: cp_map.get(cp["artifact_key"], {}).get("decision", "Pending")
+                 for cp in gate_obj["checkpoints"]}
+    overall = _overall_status(gate_state, gate_obj)
+    st.session_state[f"shown_status_{gate_obj['gate_id']}"] = overall
     if gate_state.get("overridden"):
-        overall = gate_state.get("gate_status", "Pending")
         st.markdown(f"**Overall Gate Status (CAIO Override):** :blue[{overall}]")
         st.caption(
             f"Overridden by {gate_state.get('override_by','CAIO')}: "
             f"{gate_state.get('override_reason','')}"
         )
     else:
-        overall = compute_gate_status(decisions)
         st.markdown(f"**Overall Gate Status:** :blue[{overall}]")
+        from gate_rules import engine
+        rule = engine(CONFIG).gate(gate_obj["gate_id"], list(decisions))
+        with st.expander(f"Approval rule: {rule.text or 'every checkpoint approved'}"):
+            for r in rule.explain(decisions):
+                mark = "✅" if r["ok"] else "⚪" if r["ok"] is None else "❌"
+                st.markdown(f"{mark} **{r['rule']}** — {r['detail']}")
+
+    timing = st.session_state.get("swimlane_ms", {})
+    if is_caio(st.session_state.get("role", "")) and "table" in timing:
+        st.caption(
+            f"Server time: full table {timing['table']:.0f} ms"
+            + (f" · last row redraw {timing['row']:.0f} ms" if "row" in timing else "")
+        )
+    _record_ms("status", started)
+
+@traced("ui.render_swimlane_row")
+def _render_swimlane_row(db, pid: str, gate_obj: Dict[str, Any], cp: Dict[str, Any], CONFIG: CompiledConfig):
+    started = time.perf_counter()
+    gid, akey = gate_obj["gate_id"], cp["artifact_key"]
+    proj, gate_state, ai_suggestions = _gate_view(db, pid, gid)
+    overall = _overall_status(gate_state, gate_obj)
+    if st.session_state.setdefault(f"shown_status_{gid}", overall) != overall:
+        st.rerun()  # this row's decision changed the gate status; redraw the status line too
+    role = st.session_state.get("role", "")
+    reviewable = CONFIG.reviewable_by(role)
+
+    row = st.columns([3, 3, 2, 2, 3])
+
+    # 0) Checkpoint (plain text, NOT clickable) — from Excel "Checkpoint"
+    row[0].write(cp.get("checkpoint", "—"))
+
+    # 1) Artifact (clickable) — from Excel "Artifacts Produced"
+    if row[1].button(
+        cp["artifact"],
+        key=f"art_{gid}_{akey}",
+        help="Open artifact details",
+    ):
+        st.session_state[_artifact_modal_key(gid, akey)] = True
+
+    # 2) Roles
+    row[2].write(cp.get("submitted_by_role", ""))
+    row[3].write(cp.get("reviewed_by_role", ""))
+
+    # ------- Decision + AI (ALWAYS create these two columns first) -------
+    dec_col, ai_col = row[4].columns([1, 1])
+
+    # Current decision and reviewer/override flags
+    cur_decision = gate_state.get("checkpoints", {}).get(akey, {}).get("decision", "Pending")
+    reviewer_only = is_caio(role) or (gid, akey) in reviewable
+    override_active = gate_state.get("overridden", False)
+    override_value = gate_state.get("gate_status", "Pending") if override_active else None
+    effective_decision = override_value if override_active else cur_decision
+    if effective_decision not in DECISIONS:
+        effective_decision = "Pending"
+
+    # Decision dropdown (non-empty label; visually collapsed). The widget is
+    # synced to the stored decision (an AI apply, override or another session
+    # may have changed it); a user change is persisted by the callback.
+    dec_key = f"dec_{gid}_{akey}"
+    if st.session_state.get(dec_key) != effective_decision:
+        st.session_state[dec_key] = effective_decision
+    with dec_col:
+        st.selectbox(
+            "Decision",
+            DECISIONS,
+            key=dec_key,
+            disabled=True if override_active else not reviewer_only,
+            label_visibility="collapsed",
+            on_change=_save_decision,
+            args=(db, pid, gid, akey),
+        )
 
-    # Table header
-    cols = st.columns([3, 3, 2, 2, 3])
-    cols[0].markdown("**Checkpoint**")
-    cols[1].markdown("**Artifact**")
-    cols[2].markdown("**Submitted By**")
-    cols[3].markdown("**Reviewed By**")
-    cols[4].markdown("**Decision / AI**")
-
-    # Rows
-    for cp in gate_obj["checkpoints"]:
-        row = st.columns([3, 3, 2, 2, 3])
-
-        # 0) Checkpoint (plain text, NOT clickable) — from Excel "Checkpoint"
-        row[0].write(cp.get("checkpoint", "—"))
-
-        # 1) Artifact (clickable) — from Excel "Artifacts Produced"
-        if row[1].button(
-            cp["artifact"],
-            key=f"art_{gate_obj['gate_id']}_{cp['artifact_key']}",
-            help="Open artifact details",
-        ):
-            st.session_state[_artifact_modal_key(gate_obj["gate_id"], cp["artifact_key"])] = True
-
-        # 2) Roles
-        row[2].write(cp.get("submitted_by_role", ""))
-        row[3].write(cp.get("reviewed_by_role", ""))
-
-        # ------- Decision + AI (ALWAYS create these two columns first) -------
-        dec_col, ai_col = row[4].columns([1, 1])
-
-        # Current decision and reviewer/override flags
-        cur_decision = cp_map.get(cp["artifact_key"], {}).get("decision", "Pending")
-        reviewer_only = is_reviewer_for(cp, role)
-        override_active = gate_state.get("overridden", False)
-        override_value = gate_state.get("gate_status", "Pending") if override_active else None
-        effective_decision = override_value if override_active else cur_decision
-
-        # Decision dropdown (non-empty label; visually collapsed)
-        with dec_col:
-            new_decision = st.selectbox(
-                "Decision",
-                DECISIONS,
-                index=DECISIONS.index(effective_decision) if effective_decision in DECISIONS else DECISIONS.index("Pending"),
-                key=f"dec_{gate_obj['gate_id']}_{cp['artifact_key']}",
-                disabled=True if override_active else not reviewer_only,
-                label_visibility="collapsed",
-            )
+    # Precompute artifact payload presence for AI gating
+    artifact_payload = db.get_artifact_payload(pid, akey) or {}
+    has_artifact = bool(artifact_payload)
 
-        # Precompute artifact payload presence for AI gating
-        artifact_payload = cp_map.get(cp["artifact_key"], {}).get("payload", {}) or db.get_artifact_payload(pid, cp["artifact_key"]) or {}
-        has_artifact = bool(artifact_payload)
+    # AI suggestion (locked if overridden)
+    with ai_col:
+        ai_click = st.button(
+            "Get AI Suggestion",
+            key=f"ai_{gid}_{akey}",
+            disabled=(not reviewer_only) or override_active,
+        )
+        if ai_click:
+            st.session_state[_ai_modal_key(gid, akey)] = True
+        stored = ai_suggestions.get(akey)
+        if stored:
+            st.caption(f"Pre-review: {stored.get('decision', 'Pending')}")
+
+    # -------- Artifact "modal" (container emulation) --------
+    if st.session_state.get(_artifact_modal_key(gid, akey)):
+        st.markdown("---")
+        st.markdown(f"### Artifact — {cp['artifact']}")
+        # Prefill from the payload shared by every gate listing this artifact
+        payload = artifact_payload
+        # Saved/closed from the submit callbacks: a payload never changes the gate status, so only this row redraws
+        fields = _artifact_fields(gid, akey)
+        with st.form(f"artifact_form_{gid}_{akey}", clear_on_submit=False):
+            st.text_area("Description / Evidence", value=payload.get("desc", ""), key=fields["desc"])
+            st.text_input("Link to evidence (optional)", value=payload.get("link", ""), key=fields["link"])
+            st.text_area("Notes", value=payload.get("notes", ""), key=fields["notes"])
+            c1, c2 = st.columns(2)
+            c1.form_submit_button("Save", type="primary", on_click=_close_artifact, args=(gid, akey, db, pid))
+            c2.form_submit_button("Close", on_click=_close_artifact, args=(gid, akey))
+
+    # -------- AI Suggestion "modal" (container emulation, new look) --------
+    if st.session_state.get(_ai_modal_key(gid, akey)):
+        st.markdown("---")
+        # Styled card
+        st.markdown(
+            """
+            <div style="
+                border:1px solid #e3e6ea;padding:16px;border-radius:10px;
+                background:#041329;">
+                <h4 style="margin:0 0 8px 0;">AI Suggestion</h4>
+            """,
+            unsafe_allow_html=True,
+        )
 
-        # AI suggestion (locked if overridden)
-        with ai_col:
-            ai_click = st.button(
-                "Get AI Suggestion",
-                key=f"ai_{gate_obj['gate_id']}_{cp['artifact_key']}",
-                disabled=(not reviewer_only) or override_active,
+        from ai import stream_for_checkpoint, suggestion_record, checkpoint_input_key, SOURCE_LABELS
+        from scorer import score_checkpoint
+        first_pass = score_checkpoint(gid, cp, artifact_payload)
+        st.caption(
+            f"Heuristic first pass: {first_pass['decision']} (score {first_pass['score']:.2f}"
+            + (", borderline)" if first_pass["borderline"] else ")")
+        )
+        stored = ai_suggestions.get(akey)
+        input_key = checkpoint_input_key(proj, gate_obj, cp, has_artifact, artifact_payload)
+        if stored and input_key and stored.get("input_key") == input_key:
+            # Precomputed (pre-review or background queue) for exactly these inputs
+            suggestion = stored["text"]
+            st.code(suggestion, language="markdown")
+            st.caption(
+                f"Precomputed by {stored.get('by', '')} · "
+                f"{SOURCE_LABELS.get(stored.get('source'), stored.get('source', ''))} · "
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(stored.get('at', 0)))}"
+            )
+        else:
+            stream = stream_for_checkpoint(
+                proj, gate_obj, cp,
+                has_artifact=has_artifact,
+                payload=artifact_payload
             )
-            if ai_click:
-                st.session_state[_ai_modal_key(gate_obj["gate_id"], cp["artifact_key"])] = True
-
-        # Persist manual decision only if NOT overridden
-        if reviewer_only and (not override_active) and new_decision != cur_decision:
-            db.save_checkpoint_decision(
-                pid,
-                gate_obj["gate_id"],
-                cp["artifact_key"],
-                new_decision,
-                st.session_state.get("auth_user", "unknown"),
+            card = st.empty()
+            with card:
+                st.write_stream(stream)
+            result = stream.result
+            suggestion = result["text"]
+            # Re-render the clamped final text in the usual code card
+            card.code(suggestion, language="markdown")
+            if result["source"] == "fallback":
+                st.warning(f"AI service unavailable ({result.get('error', '')}); showing the offline suggestion.")
+            source = SOURCE_LABELS.get(result["source"], result["source"])
+            if result["source"] == "llm":
+                source += f" {result['model']}"
+            st.caption(
+                f"Source: {source} · first token {result['ttft_ms']:.0f} ms · "
+                f"total {result['latency_ms']:.0f} ms"
+                + (f" · prompt {result['prompt_tokens']} tokens (full policy {result['prompt_tokens_full']})"
+                   if result.get("prompt_tokens") else "")
             )
-            st.rerun()
-
-        # -------- Artifact "modal" (container emulation) --------
-        if st.session_state.get(_artifact_modal_key(gate_obj["gate_id"], cp["artifact_key"])):
-            st.markdown("---")
-            st.markdown(f"### Artifact — {cp['artifact']}")
-            # Prefill from current gate or shared payload across gates
-            payload = artifact_payload
-            with st.form(f"artifact_form_{gate_obj['gate_id']}_{cp['artifact_key']}", clear_on_submit=False):
-                desc = st.text_area("Description / Evidence", value=payload.get("desc", ""))
-                link = st.text_input("Link to evidence (optional)", value=payload.get("link", ""))
-                notes = st.text_area("Notes", value=payload.get("notes", ""))
-                c1, c2 = st.columns(2)
-                save = c1.form_submit_button("Save", type="primary")
-                close = c2.form_submit_button("Close")
-            if save:
-                db.save_checkpoint_payload(
-                    pid,
-                    gate_obj["gate_id"],
-                    cp["artifact_key"],
-                    {"desc": desc, "link": link, "notes": notes},
-                    st.session_state.get("auth_user", "unknown"),
+            if result["source"] == "llm":
+                db.save_ai_suggestion(
+                    pid, gid, akey,
+                    suggestion_record(result, has_artifact, st.session_state.get("auth_user", "unknown")),
                 )
-                st.session_state[_artifact_modal_key(gate_obj["gate_id"], cp["artifact_key"])] = False
-                st.rerun()
-            if close:
-                st.session_state[_artifact_modal_key(gate_obj["gate_id"], cp["artifact_key"])] = False
-                st.rerun()
 
-        # -------- AI Suggestion "modal" (container emulation, new look) --------
-        if st.session_state.get(_ai_modal_key(gate_obj["gate_id"], cp["artifact_key"])):
-            st.markdown("---")
-            # Styled card
-            st.markdown(
-                """
-                <div style="
-                    border:1px solid #e3e6ea;padding:16px;border-radius:10px;
-                    background:#041329;">
-                    <h4 style="margin:0 0 8px 0;">AI Suggestion</h4>
-                """,
-                unsafe_allow_html=True,
-            )
+        if not has_artifact:
+            st.warning("No artifact data found. The assistant will not recommend **Approve** without evidence.")
 
-            from ai import recommend_for_checkpoint
-            suggestion = recommend_for_checkpoint(
-                proj, gate_obj, cp,
-                has_artifact=has_artifact,
-                payload=artifact_payload
+        c1, c2 = st.columns(2)
+        c1.button(
+            "Apply Suggestion", key=f"apply_{gid}_{akey}",
+            on_click=_apply_suggestion, args=(db, pid, gid, akey, suggestion, has_artifact),
+        )
+        c2.button(
+            "Dismiss", key=f"dismiss_{gid}_{akey}",
+            on_click=_set_state, args=(_ai_modal_key(gid, akey), False),
+        )
+
+        st.markdown("</div>", unsafe_allow_html=True)  # close styled card
+    _record_ms("row", started)
+
+@st.fragment
+@traced("ui.render_audit")
+def _render_audit(db, pid: str, gate_id: str):
+    # Paging (button callbacks) reruns this expander only
+    cursor_key = f"audit_cursor_{pid}_{gate_id}"
+    events, cursor = db.audit_page(pid, gate_id, limit=10, before=st.session_state.get(cursor_key))
+    if not events:
+        st.caption("No audit events yet.")
+    for ev in events:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(ev.get("ts", 0)))
+        reason = f" — _{ev['reason']}_" if ev.get("reason") else ""
+        st.markdown(f"- `{when}` **{ev.get('who', '')}**: {ev.get('action', '')}{reason}")
+    c1, c2 = st.columns(2)
+    if st.session_state.get(cursor_key) is not None:
+        c1.button("Newest", key=f"{cursor_key}_newest", on_click=_set_state, args=(cursor_key,))
+    if cursor is not None:
+        c2.button("Older", key=f"{cursor_key}_older", on_click=_set_state, args=(cursor_key, cursor))
+
+@traced("ui.render_swimlane_table")
+def render_swimlane_table(db, gate_obj: Dict[str, Any], CONFIG: CompiledConfig):
+    pid = st.session_state.get("open_project")
+    if not pid:
+        st.info("Select a project above.")
+        return
+
+    started = time.perf_counter()
+    gid = gate_obj["gate_id"]
+    _, gate_state, _ = _gate_view(db, pid, gid)
+    role = st.session_state.get("role", "")
+    reviewable = CONFIG.reviewable_by(role)
+
+    st.fragment(_render_gate_status, key=_status_key(gid))(db, pid, gate_obj, CONFIG)
+
+    # ----- Gate / project AI pre-review -----
+    gate_reviewable = any(g == gid for g, _ in reviewable)
+    if (is_caio(role) or gate_reviewable) and not gate_state.get("overridden"):
+        c1, c2, _ = st.columns([2, 2, 6])
+        run_gate = c1.button("Pre-review this gate", key=f"prereview_gate_{gid}")
+        run_project = is_caio(role) and c2.button("Pre-review this project", key=f"prereview_project_{pid}")
+        if run_gate or run_project:
+            from prereview import prereview
+            targets = list(get_gates()) if run_project else [gate_obj]
+            progress = st.progress(0.0, text="Starting AI pre-review…")
+            results = prereview(
+                db, pid, targets, st.session_state.get("auth_user", "unknown"),
+                on_result=lambda r, done, total: progress.progress(
+                    done / total, text=f"Pre-reviewed {done}/{total}: {r['gate_id']} · {r['artifact_key']}"
+                ),
             )
-            st.code(suggestion, language="markdown")
+            failed = [r for r in results if "error" in r]
+            if failed:
+                st.warning(f"{len(failed)} of {len(results)} checkpoints failed: {failed[0]['error']}")
+            else:
+                st.success(f"AI pre-review stored for {len(results)} checkpoints.")
 
-            if not has_artifact:
-                st.warning("No artifact data found. The assistant will not recommend **Approve** without evidence.")
+    # Table header
+    cols = st.columns([3, 3, 2, 2, 3])
+    cols[0].markdown("**Checkpoint**")
+    cols[1].markdown("**Artifact**")
+    cols[2].markdown("**Submitted By**")
+    cols[3].markdown("**Reviewed By**")
+    cols[4].markdown("**Decision / AI**")
 
-            c1, c2 = st.columns(2)
-            apply_click = c1.button("Apply Suggestion", key=f"apply_{gate_obj['gate_id']}_{cp['artifact_key']}")
-            dismiss_click = c2.button("Dismiss", key=f"dismiss_{gate_obj['gate_id']}_{cp['artifact_key']}")
-            if apply_click:
-                # Parse decision safely; never approve without artifact
-                parsed = (
-                    "Approve" if ("Suggested decision:** Approve" in suggestion and has_artifact)
-                    else "Reject" if "Suggested decision:** Reject" in suggestion
-                    else "ReScope" if "Suggested decision:** ReScope" in suggestion
-                    else "Pending"
-                )
-                if (parsed == "Approve") and (not has_artifact):
-                    parsed = "Pending"
-                db.save_checkpoint_decision(
-                    pid,
-                    gate_obj["gate_id"],
-                    cp["artifact_key"],
-                    parsed,
-                    st.session_state.get("auth_user", "unknown"),
-                )
-                st.session_state[_ai_modal_key(gate_obj["gate_id"], cp["artifact_key"])] = False
-                st.rerun()
-            if dismiss_click:
-                st.session_state[_ai_modal_key(gate_obj["gate_id"], cp["artifact_key"])] = False
-                st.rerun()
+    # Rows: one keyed fragment per checkpoint
+    for cp in gate_obj["checkpoints"]:
+        st.fragment(_render_swimlane_row, key=_row_key(gid, cp["artifact_key"]))(db, pid, gate_obj, cp, CONFIG)
 
-            st.markdown("</div>", unsafe_allow_html=True)  # close styled card
+    # ----- Audit history for the active gate (paged, newest first) -----
+    with st.expander("Audit history"):
+        _render_audit(db, pid, gid)
 
     # ----- CAIO override for gate status (ACTIVE GATE ONLY) -----
     if st.session_state.get("role", "") == "ChiefAIOfficer":
+        _, gate_state, _ = _gate_view(db, pid, gid)
+        overall = gate_state.get("effective_status") or gate_state.get("gate_status", "Pending")
         with st.expander("CAIO Override Gate Status"):
             choice = st.selectbox(
                 "Set gate status",
@@ -270,18 +495,23 @@ def render_swimlane_table(db, gate_obj: Dict[str, Any], CONFIG: Dict[str, Any]):
             reason = st.text_input("Reason for override")
             if st.button("Apply Override", type="primary"):
                 user = st.session_state.get("auth_user", "unknown")
-                # Save override for ACTIVE gate only
-                db.save_gate_status(pid, gate_obj["gate_id"], choice, user, reason)
-                # Apply same decision to ALL checkpoints in THIS gate only
-                for cp in gate_obj["checkpoints"]:
-                    db.save_checkpoint_decision(pid, gate_obj["gate_id"], cp["artifact_key"], choice, user)
+                # One write for the override and every checkpoint decision
+                with db.transaction():
+                    # Save override for ACTIVE gate only
+                    db.save_gate_status(pid, gid, choice, user, reason)
+                    # Apply same decision to ALL checkpoints in THIS gate only
+                    for cp in gate_obj["checkpoints"]:
+                        db.save_checkpoint_decision(pid, gid, cp["artifact_key"], choice, user)
                 st.success("Gate status overridden and checkpoint decisions updated for this gate.")
                 st.rerun()
+    _record_ms("table", started)
 
 # ---------- CXO Dashboard ----------
 
+@traced("ui.render_cxo_dashboard")
 def render_cxo_dashboard(db):
     import pandas as pd
+    from analytics import portfolio_frames, latest_activity
     st.subheader("CXO Dashboard")
 
     projects = db.list_projects()
@@ -289,36 +519,11 @@ def render_cxo_dashboard(db):
         st.info("No projects yet. Add a project to see the dashboard.")
         return
 
-    total = len(projects)
-    gate_status_counts = {"Approve": 0, "Reject": 0, "Pending": 0, "ReScope": 0}
-    proj_status_counts = {"ONGOING": 0, "COMPLETED": 0, "PENDING": 0}
-
-    latest_rows = []
-    for p in projects:
-        pst = (p.get("status", "ONGOING") or "ONGOING").upper()
-        proj_status_counts[pst] = proj_status_counts.get(pst, 0) + 1
-
-        gates = p.get("gates", {})
-        latest_gid = None
-        latest_ts = -1
-        latest_status = "Pending"
-        for gid, gs in gates.items():
-            ts = 0
-            for ev in gs.get("audit", []):
-                ts = max(ts, ev.get("ts", 0))
-            if ts > latest_ts:
-                latest_ts = ts
-                latest_gid = gid
-                latest_status = gs.get("gate_status", "Pending")
-            gate_status_counts[gs.get("gate_status", "Pending")] = gate_status_counts.get(gs.get("gate_status", "Pending"), 0) + 1
-
-        latest_rows.append({
-            "Project": p.get("name", ""),
-            "Current Gate": p.get("current_gate_id", ""),
-            "Latest Gate Touched": latest_gid or p.get("current_gate_id", ""),
-            "Latest Gate Status": latest_status,
-            "Owner": p.get("owner", "")
-        })
+    # Counters are materialized by the storage layer on every write
+    summary = db.dashboard_summary()
+    total = summary["total"]
+    gate_status_counts = summary["gate_status"]
+    proj_status_counts = summary["project_status"]
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total Projects", total)
@@ -334,15 +539,50 @@ def render_cxo_dashboard(db):
 
     st.divider()
     st.caption("Latest project activity")
-    latest_df = pd.DataFrame(latest_rows)
-    st.dataframe(latest_df, use_container_width=True, hide_index=True)
+    frames = portfolio_frames(db)
+    st.dataframe(latest_activity(frames), use_container_width=True, hide_index=True)
 
     proj_df = pd.DataFrame.from_dict(proj_status_counts, orient="index", columns=["count"]).sort_index()
     st.caption("Project status overview")
     st.bar_chart(proj_df)
 
+    # ----- Drill-down over the columnar portfolio frames -----
+    st.divider()
+    st.caption("Drill-down")
+    dims = {"Owner": "owner", "Gate": "gate_id", "Gate status": "effective_status", "Project status": "project_status"}
+    gates_df = frames.gates.df
+    c1, c2, c3 = st.columns(3)
+    dim = c1.selectbox("Group gates by", list(dims.keys()), key="cxo_drill_dim")
+    gate_filter = c2.multiselect("Gate", list(gates_df["gate_id"].cat.categories), key="cxo_drill_gate")
+    status_filter = c3.multiselect("Gate status", list(gates_df["effective_status"].cat.categories), key="cxo_drill_status")
+    selected = frames.gates.where(gate_id=gate_filter or None, effective_status=status_filter or None)
+    st.bar_chart(selected.group_count(dims[dim]).rename("gates"))
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.caption("Gates touched per week")
+        weekly = selected.time_bucket("last_ts", "W")
+        weekly.index = weekly.index.to_timestamp() if len(weekly) else weekly.index
+        st.bar_chart(weekly.rename("gates"))
+    with c2:
+        st.caption("Projects by age")
+        st.bar_chart(frames.projects.group_count("age_bucket").rename("projects"))
+
+    # ----- Projects at a gate, answered from the storage layer's status index -----
+    st.caption("Projects at a gate")
+    c1, c2 = st.columns(2)
+    at_gate = c1.selectbox("Gate", [g["gate_id"] for g in get_gates()], key="cxo_at_gate")
+    at_status = c2.selectbox("Status", ["Reject", "ReScope", "Pending", "Approve"], key="cxo_at_status")
+    if at_gate:
+        at = db.projects_with_gate_status(at_gate, at_status)
+        st.dataframe(
+            pd.DataFrame({"Project": [p.get("name", "") for p in at], "Owner": [p.get("owner", "") for p in at]}),
+            use_container_width=True, hide_index=True,
+        )
+
 # ---------- Add Project (minimal form) ----------
 
+@traced("ui.render_add_project_form")
 def render_add_project_form(db):
     import time as _t
     st.subheader("Add Project")
@@ -372,6 +612,7 @@ def render_add_project_form(db):
 
 # ---------- Help ----------
 
+@traced("ui.render_help_page")
 def render_help_page(CONFIG):
     st.subheader("Help")
     st.markdown("#### Roles and Responsibilities")
@@ -386,7 +627,7 @@ def render_help_page(CONFIG):
     st.markdown(
         """
 1. **Login** with your username/password. Your role controls access.
-2. Go to **Home** to view the swimlane. Choose a project from the dropdown.
+2. Go to **Home** to view the swimlane. Search for a project by name (filter by status) and pick it.
 3. Click an **Artifact** to open its editor. Add evidence/notes and save.
 4. **Reviewer/CAIO**: use the **Decision** dropdown or **Get AI Suggestion**.
 5. **Overall Gate Status** auto-updates; CAIO can **Override** the active gate.
@@ -398,6 +639,7 @@ def render_help_page(CONFIG):
 
 # ---------- Settings (CAIO-only) ----------
 
+@traced("ui.render_settings_page")
 def render_settings_page(db):
     st.subheader("Settings")
     role = st.session_state.get("role", "")
@@ -415,6 +657,11 @@ def render_settings_page(db):
             help="Key is stored obfuscated locally (DB). Leave blank to keep current.",
         )
         model = st.text_input("Model (e.g., gpt-4o-mini)", value=current.get("openapi_model", "gpt-4o-mini"))
+        base_url = st.text_input(
+            "API base URL (optional)",
+            value=current.get("openapi_base_url", ""),
+            help="Any OpenAI-compatible endpoint, e.g. http://localhost:8000/v1. Leave blank for the default.",
+        )
         c1, c2, c3 = st.columns(3)
         save = c1.form_submit_button("Save", type="primary")
         clear = c2.form_submit_button("Clear Key")
@@ -422,6 +669,7 @@ def render_settings_page(db):
 
     if save:
         db.save_openapi_key(api_key.strip(), model.strip() if model.strip() else None)
+        db.save_openapi_base_url(base_url.strip())
         st.success("Settings saved.")
         st.rerun()
 
@@ -437,7 +685,66 @@ def render_settings_page(db):
                 del st.session_state[k]
         # Clear any modal state keys
         for k in list(st.session_state.keys()):
-            if k.startswith("artifact_modal_") or k.startswith("ai_modal_"):
+            if k.startswith(("artifact_modal_", "ai_modal_", "audit_cursor_")):
                 del st.session_state[k]
         st.success("Session cleared.")
         st.rerun()
+
+    st.divider()
+    st.markdown("**AI suggestion cache**")
+    from ai_cache import get_cache
+    cache = get_cache()
+    stats = cache.stats()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Entries", stats["entries"])
+    c2.metric("Hits", stats["hits"])
+    c3.metric("Misses", stats["misses"])
+    c4.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+    if st.button("Clear AI cache"):
+        cache.clear()
+        st.success("AI suggestion cache cleared.")
+        st.rerun()
+    from ai import get_service
+    breaker = get_service().breaker
+    state = breaker.state()
+    st.caption(
+        f"AI service circuit: {state.replace('_', '-')}"
+        + (f" · last error: {breaker.last_error}" if state != "closed" and breaker.last_error else "")
+    )
+
+    st.divider()
+    st.markdown("**Startup**")
+    from startup import startup_report
+    report = startup_report()
+    built = " · ".join(f"{k} {v:.0f} ms" for k, v in report["timings_ms"].items()) or "none yet"
+    st.caption(
+        f"Process resources built: {built}. Heavy modules loaded so far: {', '.join(report['loaded']) or 'none'}. "
+        "Run `python startup.py` for the import-time report."
+    )
+
+    st.divider()
+    st.markdown("**Performance**")
+    from tracing import WINDOW, report, reset, set_enabled
+    perf = report()
+    on = st.toggle("Record timing spans", value=perf["enabled"],
+                   help="Per-process histograms of DB, AI, config and render_* spans. Off costs one flag check per call.")
+    if on != perf["enabled"]:
+        set_enabled(on)
+        st.rerun()
+    since = time.strftime("%Y-%m-%d %H:%M", time.localtime(perf["since"]))
+    st.caption(
+        f"Since {since} · p50/p95/p99 over the last {WINDOW} calls of each span"
+        + (f" · trace file: `{perf['trace_file']}` (`python tracing.py {perf['trace_file']}`)"
+           if perf["trace_file"] else " · set FAIRSIGHT_TRACE_FILE for a JSON-lines trace")
+    )
+    if perf["spans"]:
+        rows = ["| Span | Calls | p50 ms | p95 ms | p99 ms | Max ms | Total ms |", "|---|---:|---:|---:|---:|---:|---:|"]
+        for name, s in perf["spans"].items():
+            rows.append(f"| `{name}` | {s['count']} | {s['p50_ms']:.2f} | {s['p95_ms']:.2f} | {s['p99_ms']:.2f} "
+                        f"| {s['max_ms']:.2f} | {s['total_ms']:.0f} |")
+        st.markdown("\n".join(rows))
+    else:
+        st.caption("No spans recorded yet.")
+    if st.button("Reset timings"):
+        reset()
+        st.rerun()
@@ -1,7 +1,15 @@
 # workflow.py
 DECISIONS = ["Approve", "Reject", "ReScope", "Pending"]
 
-def compute_gate_status(checkpoint_decisions):
+def compute_gate_status(checkpoint_decisions, gate_id=None):
+    """
+    Overall gate status. With a gate_id, checkpoint_decisions is an
+    artifact_key -> decision mapping evaluated against that gate's
+    decision_rules (see gate_rules); without one, the plain any/all rule.
+    """
+    if gate_id is not None:
+        from gate_rules import gate_status
+        return gate_status(gate_id, checkpoint_decisions)
     if any(d == "Reject" for d in checkpoint_decisions):
         return "Reject"
     if checkpoint_decisions and all(d == "Approve" for d in checkpoint_decisions):